@@ -9,57 +9,34 @@ from typing import Tuple
 from src.plugin_system import BaseCommand
 from src.common.logger import get_logger
 
+from ...core.user_lock import UserLockManager
 from ...systems.actions.action_handler import ActionHandler
 from ...systems.personality.personality_system import PersonalitySystem
 from ...systems.actions.action_growth_system import ActionGrowthSystem
+from ...systems.actions.action_registry import ActionRegistry
 
 logger = get_logger("dt_action_commands")
 
 
-# 在模块级别构建动作pattern，确保在类定义前就生成好
-def _build_action_pattern() -> str:
-    """根据ActionGrowthSystem构建匹配所有动作命令的正则表达式"""
-    all_commands = []
-
-    # 从所有核心动作中提取命令
-    for action_key, action_def in ActionGrowthSystem.CORE_ACTIONS.items():
-        commands = action_def.get("command", [])
-        all_commands.extend(commands)
-
-    # 按长度降序排序，确保长命令优先匹配
-    all_commands.sort(key=len, reverse=True)
-    # 转义特殊字符并用|连接
-    escaped_commands = [re.escape(cmd) for cmd in all_commands]
-    commands_pattern = "|".join(escaped_commands)
-    return rf"^/({commands_pattern})(?:\s+(.+))?$"
-
-
-# 生成pattern字符串
-_ACTION_PATTERN = _build_action_pattern()
-
-
 class DTActionCommand(BaseCommand):
     """统一的动作命令处理器"""
 
     command_name = "dt_action"
     command_description = "执行互动动作"
 
-    # 使用模块级别生成的pattern
-    command_pattern = _ACTION_PATTERN
+    # 通配pattern，具体动作由动作注册表解析；actions.json 新增的动作无需重新注册即可匹配
+    command_pattern = r"^/(\S+)(?:\s+(.+))?$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
-        match = re.match(self.command_pattern, self.message.processed_plain_text)
-        if not match:
-            return False, "命令格式错误", False
+        # actions.json 变化时先重建动作注册表
+        ActionRegistry.reload_if_changed()
 
-        command_used = match.group(1)  # 用户输入的命令（如"早安"、"抱"等）
-        action_params = match.group(2).strip() if match.group(2) else ""
+        # 注册表一次匹配同时得到动作key、命令和参数；不是动作命令时不拦截
+        matched = ActionRegistry.match(self.message.processed_plain_text)
+        if not matched:
+            return False, "命令格式错误", False
 
-        # 根据命令找到对应的动作key
-        action_key = ActionGrowthSystem.find_action_by_command(command_used)
-        if not action_key:
-            await self.send_text(f"❌ 未找到命令: {command_used}")
-            return False, "未知命令", False
+        action_key, command_used, action_params = matched
 
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
@@ -84,8 +61,11 @@ class DTStartGameCommand(BaseCommand):
     command_pattern = r"^/(开始|start)(?:\s+(傲娇|天真|妖媚|害羞|高冷|温柔|活泼|知性|病娇|无口|姐姐系|元气|小恶魔|文静|女王|受虐|淫乱|tsundere|innocent|seductive|shy|cold|gentle|lively|intellectual|yandere|kuudere|oneesan|genki|mesugaki|dandere|sadistic|masochistic|bitch))?$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
-        from src.plugin_system.apis import database_api
-        from ...core.models import DTCharacter
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
+        from ...core.character_cache import CharacterCache
 
         match = re.match(self.command_pattern, self.message.processed_plain_text)
         if not match:
@@ -127,11 +107,7 @@ class DTStartGameCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 检查是否已有角色
-        existing = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        existing = await CharacterCache.get(user_id, chat_id)
 
         if existing:
             await self.send_text("❌ 你已经有角色了！\n使用 /重开 来重置游戏。")
@@ -169,24 +145,14 @@ class DTStartGameCommand(BaseCommand):
             "last_interaction_time": time.time(),
         }
 
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # === v2.0新增：初始化职业系统 ===
         from ...systems.career.career_system import CareerSystem
         char = CareerSystem.initialize_career(char)
 
         # 保存更新后的角色（包含职业信息）
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # === 构建增强的欢迎消息 ===
         welcome_msg = f"""
@@ -275,20 +241,23 @@ class DTRestartCommand(BaseCommand):
     command_pattern = r"^/(重开|restart|reset|确认重开)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         from src.plugin_system.apis import database_api
         from ...core.models import DTCharacter, DTEvent
+        from ...core.character_cache import CharacterCache
+        from ...systems.actions.combo_system import ComboSystem
         from ...systems.mechanics.confirmation_manager import ConfirmationManager
+        from ...systems.mechanics.consequence_scheduler import ConsequenceScheduler
 
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
         command_text = self.message.processed_plain_text
 
         # 检查是否有角色
-        existing = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        existing = await CharacterCache.get(user_id, chat_id)
 
         if not existing:
             await self.send_text("❌ 你还没有开始游戏！\n使用 /开始 <人格> 来开始")
@@ -310,6 +279,9 @@ class DTRestartCommand(BaseCommand):
                 query_type="delete",
                 filters={"user_id": user_id, "chat_id": chat_id}
             )
+            CharacterCache.invalidate(user_id, chat_id)
+            ComboSystem.reset(user_id, chat_id)
+            ConsequenceScheduler.forget(user_id, chat_id)
 
             # 删除事件记录
             await database_api.db_query(
@@ -320,10 +292,11 @@ class DTRestartCommand(BaseCommand):
 
             # 清理其他相关数据
             from ...core.models import (DTMemory, DTPreference, DTUserOutfit,
-                                      DTCurrentOutfit, DTUserInventory, DTUserAchievement)
+                                      DTCurrentOutfit, DTUserInventory, DTUserAchievement,
+                                      DTInteractionDaily)
 
             for model in [DTMemory, DTPreference, DTUserOutfit, DTCurrentOutfit,
-                         DTUserInventory, DTUserAchievement]:
+                         DTUserInventory, DTUserAchievement, DTInteractionDaily]:
                 await database_api.db_query(
                     model,
                     query_type="delete",
@@ -380,19 +353,14 @@ class DTQuickInteractCommand(BaseCommand):
     command_pattern = r"^/(快速互动|quick)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
-        from src.plugin_system.apis import database_api
-        from ...core.models import DTCharacter
+        from ...core.character_cache import CharacterCache
         import random
 
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -405,7 +373,7 @@ class DTQuickInteractCommand(BaseCommand):
         simple_actions = []
         for action_info in available_actions:
             action_key = action_info["key"]
-            action_def = ActionGrowthSystem.CORE_ACTIONS[action_key]
+            action_def = ActionRegistry.get_action(action_key)
             # 只保留不需要部位选择的动作
             if not action_def.get("has_targets", False):
                 simple_actions.append(action_key)
@@ -442,19 +410,14 @@ class DTRecommendCommand(BaseCommand):
     command_pattern = r"^/(推荐|recommend)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
-        from src.plugin_system.apis import database_api
-        from ...core.models import DTCharacter
+        from ...core.character_cache import CharacterCache
         from ...systems.time.daily_limit_system import DailyInteractionSystem
 
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -9,11 +9,16 @@ import random
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api, llm_api, send_api
+from src.plugin_system.apis import send_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter, DTEvent
+from ...core.models import DTEvent
+from ...core.character_cache import CharacterCache
+from ...core.db_executor import DBExecutor
+from ...core.user_lock import UserLockManager
 from ...utils.prompt_builder import PromptBuilder
+from ...utils.llm_gateway import LLMGateway
+from ...utils.stream_reply import StreamReply
 from ...systems.attributes.attribute_system import AttributeSystem
 
 logger = get_logger("dt_chat_command")
@@ -36,13 +41,23 @@ class DTChatCommand(BaseCommand):
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
-        # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
+        # 同一用户的聊天串行执行，重复发送的相同消息只生成一次回复
+        status, result = await UserLockManager.run(
+            user_id, chat_id, f"chat:{user_message}",
+            self._chat, user_id, chat_id, user_message
         )
 
+        if status == UserLockManager.REJECTED:
+            await self.send_text("⏳ 消息太频繁了，请等她回复完再说")
+            return False, "请求过于频繁", True
+
+        return result
+
+    async def _chat(self, user_id: str, chat_id: str, user_message: str) -> Tuple[bool, str, bool]:
+        """生成聊天回复并更新角色状态"""
+        # 获取角色
+        character = await CharacterCache.get(user_id, chat_id)
+
         if not character:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
             return False, "角色未创建", False
@@ -66,30 +81,31 @@ class DTChatCommand(BaseCommand):
             history=history
         )
 
-        # 调用 LLM 生成回复
-        models = llm_api.get_available_models()
-        replyer_model = models.get("replyer")
-
-        if not replyer_model:
-            logger.error("未找到 'replyer' 模型配置")
-            await self.send_text("❌ 系统错误：未找到回复模型配置")
-            return False, "未找到回复模型", False
-
-        success_llm, ai_response, reasoning, model_name = await llm_api.generate_with_model(
-            prompt=prompt,
-            model_config=replyer_model,
-            request_type="desire_theatre.chat"
-        )
+        # 调用 LLM 生成回复（后端支持流式输出时边生成边按句发送）
+        streamed = StreamReply.is_available()
+        if streamed:
+            success_llm, ai_response, reasoning, model_name = await StreamReply.generate_to_stream(
+                prompt=prompt,
+                request_type="desire_theatre.chat",
+                stream_id=self.message.chat_stream.stream_id
+            )
+        else:
+            success_llm, ai_response, reasoning, model_name = await LLMGateway.generate(
+                prompt=prompt,
+                request_type="desire_theatre.chat"
+            )
 
-        if success_llm and ai_response:
+        fallback = LLMGateway.is_fallback(model_name)
+        if success_llm and ai_response and not fallback:
             # 【优化】合并AI回复和属性变化为一条消息
             chat_effects = {
                 "affection": 2,
                 "trust": 1
             }
 
-            # 合并输出
-            output = f"{ai_response}\n\n〔❤️好感+2 🤝信任+1〕"
+            # 合并输出（流式模式下回复已发送，只补发属性变化）
+            feedback = "〔❤️好感+2 🤝信任+1〕"
+            output = feedback if streamed else f"{ai_response}\n\n{feedback}"
 
             await send_api.text_to_stream(
                 text=output,
@@ -107,6 +123,15 @@ class DTChatCommand(BaseCommand):
             await self._record_chat_event(user_id, chat_id, user_message, ai_response, chat_effects)
 
             return True, "聊天成功", True
+        elif fallback:
+            # 兜底文本只作为她的反应发出（流式模式下已发送），不结算属性、不记录为聊天历史
+            if not streamed:
+                await send_api.text_to_stream(
+                    text=ai_response,
+                    stream_id=self.message.chat_stream.stream_id,
+                    storage_message=False
+                )
+            return False, "生成回复失败", True
         else:
             logger.error(f"LLM生成聊天回复失败: {ai_response}")
             await self.send_text("❌ 生成回复失败，请稍后重试")
@@ -129,18 +154,13 @@ class DTChatCommand(BaseCommand):
         character["last_interaction"] = time.time()
         character["interaction_count"] = character.get("interaction_count", 0) + 1
 
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
     async def _record_chat_event(self, user_id: str, chat_id: str, user_message: str, ai_response: str, effects: dict):
         """记录聊天事件"""
         event_id = f"evt_{int(time.time() * 1000000)}_{random.randint(1000, 9999)}"
 
-        await database_api.db_save(
+        await DBExecutor.db_save(
             DTEvent,
             data={
                 "event_id": event_id,
@@ -0,0 +1,100 @@
+"""
+调试命令 - /启动分析 /渲染统计 /LLM统计
+"""
+
+from typing import Tuple
+
+from src.plugin_system import BaseCommand
+
+from ...utils.startup_profile import StartupProfile
+from ...utils.render_service import RenderService
+from ...utils.llm_gateway import LLMGateway
+from ...utils.stream_reply import StreamReply
+from ...utils.prompt_builder import PromptBuilder
+from ...systems.events.event_content import EventContent
+from ..command_registry import LazyCommandRegistry
+
+
+class DTStartupProfileCommand(BaseCommand):
+    """查看启动耗时和命令模块导入耗时"""
+
+    command_name = "dt_startup_profile"
+    command_description = "查看插件启动耗时分析"
+    command_pattern = r"^/(启动分析|startup)$"
+
+    async def execute(self) -> Tuple[bool, str, bool]:
+        report = StartupProfile.format_report(LazyCommandRegistry.get_pending_modules())
+
+        warning = StartupProfile.check_budget()
+        if warning:
+            report = f"⚠️ {warning}\n\n{report}"
+
+        await self.send_text(f"⏱️ 【启动分析】\n\n{report}")
+        return True, "启动分析", True
+
+
+class DTRenderStatsCommand(BaseCommand):
+    """查看图片渲染队列统计"""
+
+    command_name = "dt_render_stats"
+    command_description = "查看图片渲染队列统计"
+    command_pattern = r"^/(渲染统计|renderstats)$"
+
+    async def execute(self) -> Tuple[bool, str, bool]:
+        stats = RenderService.get_stats()
+
+        await self.send_text(f"""🖼️ 【渲染统计】
+
+队列: {stats['pending']}/{stats['max_queue']} (线程 {stats['workers']})
+提交: {stats['submitted']}  完成: {stats['completed']}  缓存命中: {stats['cache_hits']}
+拒绝: {stats['rejected']}  超时: {stats['timeouts']}  失败: {stats['failed']}
+
+排队等待: p50 {stats['wait_p50']:.1f}ms / p95 {stats['wait_p95']:.1f}ms / 最大 {stats['wait_max']:.1f}ms
+渲染耗时: p50 {stats['render_p50']:.1f}ms / p95 {stats['render_p95']:.1f}ms""")
+        return True, "渲染统计", True
+
+
+class DTLLMStatsCommand(BaseCommand):
+    """查看各类 LLM 请求的延迟和失败统计"""
+
+    command_name = "dt_llm_stats"
+    command_description = "查看LLM调用统计"
+    command_pattern = r"^/(LLM统计|llmstats)$"
+
+    async def execute(self) -> Tuple[bool, str, bool]:
+        stats = LLMGateway.get_stats()
+        if not stats:
+            await self.send_text("🤖 【LLM统计】\n\n暂无调用记录")
+            return True, "LLM统计", True
+
+        lines = ["🤖 【LLM统计】"]
+        for request_type, item in sorted(stats.items()):
+            lines.append(f"""
+{request_type.replace("desire_theatre.", "")}
+  调用: {item['calls']}  成功: {item['succeeded']}  失败: {item['failed']} (超时 {item['timeouts']}, 兜底 {item['fallbacks']})
+  重试: {item['retries']}  对冲: {item['hedges']} (胜出 {item['hedge_wins']})
+  延迟: p50 {item['p50_ms']:.0f}ms / p95 {item['p95_ms']:.0f}ms
+  估算token: 输入 {item['prompt_tokens']} / 输出 {item['completion_tokens']}""")
+
+        stream_stats = StreamReply.get_stats()
+        if stream_stats["streams"]:
+            lines.append(f"""
+流式回复: {stream_stats['streams']}次 / {stream_stats['chunks']}条消息
+  首句延迟: p50 {stream_stats['first_chunk_p50_ms']:.0f}ms / p95 {stream_stats['first_chunk_p95_ms']:.0f}ms""")
+
+        content_stats = EventContent.get_stats()
+        if content_stats["hits"] or content_stats["misses"]:
+            lines.append(f"""
+事件内容缓存: 命中 {content_stats['hits']} / 未命中 {content_stats['misses']} ({content_stats['variants']}个版本)
+  JSON修复: {content_stats['repaired']}  格式不符: {content_stats['invalid']}""")
+
+        prompt_stats = PromptBuilder.get_stats()
+        if prompt_stats["max_tokens"]:
+            sections = sorted(prompt_stats["sections"].items(), key=lambda item: item[1], reverse=True)
+            lines.append(f"""
+回复提示词: 构建 {prompt_stats['builds']}次  预编译模板 {prompt_stats['templates']}个  配置重载 {prompt_stats['config_reloads']}次
+  估算token: p50 {prompt_stats['p50_tokens']} / p95 {prompt_stats['p95_tokens']} / 最大 {prompt_stats['max_tokens']}
+  各段平均: {'  '.join(f'{name} {tokens}' for name, tokens in sections[:8])}""")
+
+        await self.send_text("\n".join(lines))
+        return True, "LLM统计", True
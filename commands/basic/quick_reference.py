@@ -18,7 +18,7 @@ class DTQuickReferenceCommand(BaseCommand):
     async def execute(self) -> Tuple[bool, str, bool]:
         # 尝试使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("🎯 核心命令 (8个)", [
@@ -62,8 +62,8 @@ class DTQuickReferenceCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "快速参考 - 命令速查卡", sections, width=1200
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "快速参考 - 命令速查卡", sections, width=1200
             )
 
             await self.send_image(img_base64)
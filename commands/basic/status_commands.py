@@ -7,9 +7,9 @@ import json
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
 from ...systems.personality.personality_system import PersonalitySystem
 
 
@@ -24,11 +24,7 @@ class DTQuickStatusCommand(BaseCommand):
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -52,7 +48,7 @@ class DTQuickStatusCommand(BaseCommand):
 
         # 使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             content = {
                 "基础信息": {
@@ -78,8 +74,8 @@ class DTQuickStatusCommand(BaseCommand):
                     f"{festival_info['emoji']} 今日": festival_info['name']
                 }
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_status_image(
-                "快速状态", content, width=1920
+            img_bytes, img_base64 = await RenderService.render(
+                "status", "快速状态", content, width=1920
             )
 
             await self.send_image(img_base64)
@@ -123,11 +119,7 @@ class DTStatusCommand(BaseCommand):
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -167,7 +159,7 @@ class DTStatusCommand(BaseCommand):
 
         # 使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             content = {
                 "角色信息": {
@@ -217,8 +209,8 @@ class DTStatusCommand(BaseCommand):
             if next_stage_hint and next_stage_hint.strip():
                 content["进化提示"] = {"💡 提示": next_stage_hint.replace("💡 ", "")}
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_status_image(
-                "角色状态", content, width=1920
+            img_bytes, img_base64 = await RenderService.render(
+                "status", "角色状态", content, width=1920
             )
 
             await self.send_image(img_base64)
@@ -287,7 +279,7 @@ class DTHelpCommand(BaseCommand):
     async def _show_main_help(self):
         """显示主帮助页面 - 包含所有实际可用命令"""
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("🎮 核心", [
@@ -332,8 +324,8 @@ class DTHelpCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "欲望剧场 v2.0 - 命令大全", sections, width=1400
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "欲望剧场 v2.0 - 命令大全", sections, width=1400
             )
 
             await self.send_image(img_base64)
@@ -392,7 +384,7 @@ class DTHelpCommand(BaseCommand):
     async def _show_commands_help(self):
         """显示所有核心命令的详细列表"""
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("核心管理命令", [
@@ -442,8 +434,8 @@ class DTHelpCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "命令大全", sections, width=900
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "命令大全", sections, width=900
             )
 
             await self.send_image(img_base64)
@@ -586,7 +578,7 @@ class DTHelpCommand(BaseCommand):
         """显示游戏管理帮助"""
         # 尝试使用图片模式
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("基础命令", [
@@ -646,8 +638,8 @@ class DTHelpCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "游戏系统", sections, width=900
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "游戏系统", sections, width=900
             )
 
             await self.send_image(img_base64)
@@ -718,7 +710,7 @@ class DTHelpCommand(BaseCommand):
     async def _show_actions_help(self):
         """显示所有动作的分类帮助"""
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("温柔互动 (1-3)", [
@@ -798,8 +790,8 @@ class DTHelpCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "动作命令速查", sections, width=900
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "动作命令速查", sections, width=900
             )
 
             await self.send_image(img_base64)
@@ -894,7 +886,7 @@ class DTHelpCommand(BaseCommand):
     async def _show_outfit_help(self):
         """显示服装系统帮助"""
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("命令", [
@@ -916,8 +908,8 @@ class DTHelpCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "服装系统", sections, width=800
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "服装系统", sections, width=800
             )
 
             await self.send_image(img_base64)
@@ -1142,7 +1134,7 @@ class DTHelpCommand(BaseCommand):
     async def _show_v2_help(self):
         """显示v2.0新功能总览"""
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("🎉 v2.0新功能总览", [
@@ -1206,8 +1198,8 @@ class DTHelpCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "v2.0新功能总览", sections, width=1920
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "v2.0新功能总览", sections, width=1920
             )
 
             await self.send_image(img_base64)
@@ -1539,7 +1531,7 @@ class DTGuideCommand(BaseCommand):
 
     async def execute(self) -> Tuple[bool, str, bool]:
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [
                 ("欢迎来到欲望剧场", [
@@ -1622,8 +1614,8 @@ class DTGuideCommand(BaseCommand):
                 ])
             ]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "欲望剧场 v2.0 - 游戏说明", sections, width=1920
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "欲望剧场 v2.0 - 游戏说明", sections, width=1920
             )
 
             await self.send_image(img_base64)
@@ -1737,11 +1729,7 @@ class DTExportCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色数据
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -1803,6 +1791,10 @@ class DTImportCommand(BaseCommand):
     command_pattern = r"^/(导入|import)\s+(.+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         import base64
         import re
 
@@ -1891,12 +1883,7 @@ JSON错误: {str(json_error)}
             char_data["chat_id"] = chat_id
 
             # 保存到数据库（覆盖现有数据）
-            await database_api.db_save(
-                DTCharacter,
-                data=char_data,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, char_data)
 
             await self.send_text(f"""✅ 【存档导入成功】
 
@@ -6,10 +6,10 @@ import re
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
 from ...systems.time.daily_limit_system import DailyInteractionSystem
 
 logger = get_logger("dt_time_commands")
@@ -23,15 +23,15 @@ class DTNextDayCommand(BaseCommand):
     command_pattern = r"^/(明日|明天|nextday)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -57,12 +57,7 @@ class DTNextDayCommand(BaseCommand):
         DailyInteractionSystem.advance_to_next_day(character)
 
         # 保存数据
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
         new_day = character.get("game_day", 1)
 
@@ -131,12 +126,7 @@ class DTNextDayCommand(BaseCommand):
         character, growth_messages = CareerSystem.daily_career_growth(character)
 
         # 【修复】立即保存职业数据，确保晋升检查时数据已持久化
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
         # 构建收入和成长消息
         income_msg = f"💰 【每日收入】+{daily_income}币 (余额: {character['coins']})"
@@ -152,6 +142,7 @@ class DTNextDayCommand(BaseCommand):
 
         # === 【v2.0新增】随机事件系统 - 完全动态生成随机事件 ===
         from ...systems.events.random_event_system import RandomEventSystem
+        from ...systems.events.event_pregenerator import EventPregenerator
         from ...utils.prompt_builder import PromptBuilder
         import json
 
@@ -161,10 +152,13 @@ class DTNextDayCommand(BaseCommand):
         # 30%概率触发事件
         import random
         if random.random() < 0.3:
-            dynamic_event = await RandomEventSystem.generate_dynamic_event(
-                character=character,
-                history=history
-            )
+            # 优先使用空闲时预生成的事件，状态不兼容时再实时生成
+            dynamic_event = EventPregenerator.take("event", user_id, chat_id, character)
+            if dynamic_event is None:
+                dynamic_event = await RandomEventSystem.generate_dynamic_event(
+                    character=character,
+                    history=history
+                )
 
             if dynamic_event:
                 # 成功生成动态事件
@@ -177,12 +171,7 @@ class DTNextDayCommand(BaseCommand):
                 }, ensure_ascii=False)
 
                 # 【修复】立即保存,确保用户使用 /选择 时能读取到
-                await database_api.db_save(
-                    DTCharacter,
-                    data=character,
-                    key_field="user_id",
-                    key_value=user_id
-                )
+                await CharacterCache.save(user_id, chat_id, character)
 
                 # 显示事件消息
                 event_message = RandomEventSystem.format_event_message(dynamic_event, character)
@@ -216,12 +205,7 @@ class DTNextDayCommand(BaseCommand):
                     character["active_event"] = json.dumps({"event_id": event_id}, ensure_ascii=False)
 
                     # 立即保存
-                    await database_api.db_save(
-                        DTCharacter,
-                        data=character,
-                        key_field="user_id",
-                        key_value=user_id
-                    )
+                    await CharacterCache.save(user_id, chat_id, character)
 
                     # 显示事件消息
                     event_message = RandomEventSystem.format_event_message(event_data, character)
@@ -241,12 +225,7 @@ class DTNextDayCommand(BaseCommand):
             season_msg += f"\n🎉 今天是【{festival['name']}】！"
 
         # 保存更新后的角色数据
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
         # 发送推进消息
         await self.send_text(
@@ -376,11 +355,7 @@ class DTStatusCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -7,10 +7,10 @@ import json
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
 from ...systems.time.seasonal_system import SeasonalSystem
 from ...systems.career.career_system import CareerSystem
 from ...systems.events.random_event_system import RandomEventSystem
@@ -30,11 +30,7 @@ class DTSeasonCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -124,15 +120,15 @@ class DTCareerCommand(BaseCommand):
     command_pattern = r"^/(职业|career|work)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -141,12 +137,7 @@ class DTCareerCommand(BaseCommand):
         # 如果角色还没有职业,初始化职业
         if "career" not in character or not character.get("career"):
             character = CareerSystem.initialize_career(character)
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, character)
 
         # 获取职业显示信息
         career_display = CareerSystem.get_career_display(character)
@@ -163,15 +154,15 @@ class DTPromotionCommand(BaseCommand):
     command_pattern = r"^/(晋升|promote|升职)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -203,12 +194,7 @@ class DTPromotionCommand(BaseCommand):
         character = CareerSystem.promote(character, next_career)
 
         # 保存数据
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
         await self.send_text(promotion_text)
         return True, f"晋升到{next_career}", True
@@ -222,6 +208,10 @@ class DTEventChoiceCommand(BaseCommand):
     command_pattern = r"^/(选择|choice)\s+(\d+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
@@ -234,11 +224,7 @@ class DTEventChoiceCommand(BaseCommand):
         choice_num = int(match.group(2))
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -286,12 +272,7 @@ class DTEventChoiceCommand(BaseCommand):
         character["active_event"] = None
 
         # 保存数据
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
         # 构建结果消息
         result_msg = f"""━━━━━━━━━━━━━━━━━━━
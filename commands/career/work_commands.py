@@ -6,9 +6,9 @@ import re
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
 from ...features.shop.earning_system import EarningSystem
 
 
@@ -20,15 +20,15 @@ class DTWorkCommand(BaseCommand):
     command_pattern = r"^/(打工|work|赚钱)(?:\s+(.+))?$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色数据
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -8,9 +8,9 @@ from typing import Tuple
 
 from src.plugin_system import BaseCommand
 from src.common.logger import get_logger
-from src.plugin_system.apis import database_api
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
 from ...systems.personality.dual_personality_system import DualPersonalitySystem
 from ...systems.events.choice_dilemma_system import ChoiceDilemmaSystem
 
@@ -29,11 +29,7 @@ class DTPersonalityStatusCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -85,6 +81,10 @@ class DTPersonalityChoiceCommand(BaseCommand):
     command_pattern = r"^/(选择|choice)\s+([123])$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         match = re.match(self.command_pattern, self.message.processed_plain_text)
         if not match:
             await self.send_text("❌ 格式错误\n\n使用方法: /选择 <1/2/3>")
@@ -97,11 +97,7 @@ class DTPersonalityChoiceCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！")
@@ -122,12 +118,7 @@ class DTPersonalityChoiceCommand(BaseCommand):
         )
 
         # 保存角色
-        await database_api.db_save(
-            DTCharacter,
-            data=updated_char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, updated_char)
 
         # 显示结果
         await self.send_text(result_text)
@@ -176,6 +167,10 @@ class DTDilemmaChoiceCommand(BaseCommand):
     command_pattern = r"^/(抉择|dilemma)\s+(\w+)\s+([12])$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         match = re.match(self.command_pattern, self.message.processed_plain_text)
         if not match:
             await self.send_text("❌ 格式错误\n\n使用方法: /抉择 <困境ID> <1/2>\n\n困境ID会在事件触发时显示")
@@ -188,11 +183,7 @@ class DTDilemmaChoiceCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！")
@@ -214,12 +205,7 @@ class DTDilemmaChoiceCommand(BaseCommand):
         if time.time() - dilemma_time > 300:
             # 清除过期困境
             char["pending_dilemma"] = None
-            await database_api.db_save(
-                DTCharacter,
-                data=char,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, char)
             await self.send_text("❌ 困境选择已超时（5分钟）\n\n系统已自动取消该困境")
             return False, "困境超时", False
 
@@ -246,12 +232,7 @@ class DTDilemmaChoiceCommand(BaseCommand):
         updated_char["dilemma_triggered_at"] = None
 
         # 保存角色
-        await database_api.db_save(
-            DTCharacter,
-            data=updated_char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, updated_char)
 
         # 显示结果
         result_msg = f"""⚖️ 【你做出了选择】
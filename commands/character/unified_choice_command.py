@@ -8,10 +8,10 @@ import time
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
 from ...systems.events.random_event_system import RandomEventSystem
 from ...systems.personality.dual_personality_system import DualPersonalitySystem
 from ...systems.events.choice_dilemma_system import ChoiceDilemmaSystem
@@ -27,6 +27,10 @@ class DTUnifiedChoiceCommand(BaseCommand):
     command_pattern = r"^/(选择|choice)\s+(\d+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
@@ -39,11 +43,7 @@ class DTUnifiedChoiceCommand(BaseCommand):
         choice_num = int(match.group(2))
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -134,12 +134,7 @@ class DTUnifiedChoiceCommand(BaseCommand):
         character["active_event"] = None
 
         # 保存数据
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, character)
 
         # 构建结果消息
         result_msg = f"""━━━━━━━━━━━━━━━━━━━
@@ -204,12 +199,7 @@ class DTUnifiedChoiceCommand(BaseCommand):
         )
 
         # 保存角色
-        await database_api.db_save(
-            DTCharacter,
-            data=updated_char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, updated_char)
 
         # 显示结果
         await self.send_text(result_text)
@@ -284,12 +274,7 @@ class DTUnifiedChoiceCommand(BaseCommand):
         if time.time() - dilemma_time > 300:
             # 清除过期困境
             character["pending_dilemma"] = None
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, character)
             await self.send_text("❌ 困境选择已超时（5分钟）\n\n系统已自动取消该困境")
             return False, "困境超时", False
 
@@ -315,12 +300,7 @@ class DTUnifiedChoiceCommand(BaseCommand):
         updated_char["dilemma_triggered_at"] = None
 
         # 保存角色
-        await database_api.db_save(
-            DTCharacter,
-            data=updated_char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, updated_char)
 
         # 构建结果消息
         result_msg = f"""━━━━━━━━━━━━━━━━━━━
@@ -0,0 +1,222 @@
+"""
+延迟命令注册表 - 注册时只读取命令元数据，首次分发时才导入命令实现
+
+核心机制：
+- 用 ast 静态解析命令模块源码，取出 command_name / command_description / command_pattern，
+  注册阶段不执行任何命令模块（也就不会传递导入各系统、PIL 和大型静态表）
+- 为每个命令生成一个轻量代理类交给框架注册；框架实例化代理类时，
+  代理在 __new__ 中导入真正的命令模块并返回真实命令实例
+- 元数据无法静态求值的命令通过 PATTERN_PROVIDERS 提供
+- 导入耗时记录到 StartupProfile
+"""
+
+import ast
+import importlib
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from src.plugin_system import BaseCommand
+from src.common.logger import get_logger
+
+from ..utils.startup_profile import StartupProfile
+
+logger = get_logger("dt_command_registry")
+
+COMMANDS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class LazyCommandRegistry:
+    """延迟命令注册表"""
+
+    # 从命令类中读取的元数据字段
+    META_FIELDS = ("command_name", "command_description", "command_pattern")
+
+    # 注册顺序即匹配优先级：具体命令在前，通配动作命令放在最后
+    COMMANDS: List[Tuple[str, str]] = [
+        # 核心命令（具体命令优先）
+        ("actions.action_commands", "DTStartGameCommand"),
+        ("actions.action_commands", "DTRestartCommand"),
+        ("basic.status_commands", "DTStatusCommand"),
+        ("basic.status_commands", "DTQuickStatusCommand"),
+        ("basic.status_commands", "DTHelpCommand"),
+        ("basic.status_commands", "DTGuideCommand"),
+        ("basic.quick_reference", "DTQuickReferenceCommand"),
+        ("basic.status_commands", "DTExportCommand"),
+        ("basic.status_commands", "DTImportCommand"),
+        ("actions.chat_command", "DTChatCommand"),
+        ("actions.action_commands", "DTQuickInteractCommand"),
+        ("actions.action_commands", "DTRecommendCommand"),
+
+        # 时间推进命令
+        ("basic.time_commands", "DTNextDayCommand"),
+
+        # v2.0 新增系统命令
+        ("career.v2_system_commands", "DTSeasonCommand"),
+        ("career.v2_system_commands", "DTCareerCommand"),
+        ("career.v2_system_commands", "DTPromotionCommand"),
+
+        # 统一选择命令（智能处理事件选择和人格选择）
+        ("character.unified_choice_command", "DTUnifiedChoiceCommand"),
+
+        # 结局系统命令
+        ("endings.ending_commands", "DTEndingCommand"),
+        ("endings.ending_commands", "DTConfirmEndingCommand"),
+        ("endings.ending_commands", "DTEndingPreviewCommand"),
+        ("endings.ending_commands", "DTEndingListCommand"),
+
+        # 双重人格系统命令
+        ("character.personality_commands", "DTPersonalityStatusCommand"),
+        ("character.personality_commands", "DTDilemmaChoiceCommand"),
+
+        # 扩展命令
+        ("shop.outfit_commands", "DTOutfitListCommand"),
+        ("shop.outfit_commands", "DTWearOutfitCommand"),
+        ("shop.item_commands", "DTInventoryCommand"),
+        ("shop.item_commands", "DTUseItemCommand"),
+        ("extensions.extension_commands", "DTSceneListCommand"),
+        ("extensions.extension_commands", "DTGoSceneCommand"),
+        ("extensions.extension_commands", "DTTruthCommand"),
+        ("extensions.extension_commands", "DTDareCommand"),
+        ("extensions.extension_commands", "DTDiceCommand"),
+
+        # 商店、赚钱和付费服务系统
+        ("shop.shop_commands", "DTShopCommand"),
+        ("shop.shop_commands", "DTBuyItemCommand"),
+        ("shop.shop_commands", "DTBuyOutfitCommand"),
+        ("career.work_commands", "DTWorkCommand"),
+        ("social.papa_katsu_commands", "DTPapaKatsuCommand"),
+
+        # 调试命令
+        ("basic.debug_commands", "DTStartupProfileCommand"),
+        ("basic.debug_commands", "DTRenderStatsCommand"),
+        ("basic.debug_commands", "DTLLMStatsCommand"),
+
+        # 通配动作命令（放在最后作为兜底）
+        ("actions.action_commands", "DTActionCommand"),
+    ]
+
+    # 无法静态求值的元数据 {类名: {字段: 提供函数}}
+    PATTERN_PROVIDERS: Dict[str, Dict[str, Callable[[], str]]] = {}
+
+    # 已解析的模块元数据 {模块: {类名: {字段: 值}}}
+    _module_meta: Dict[str, Dict[str, Dict]] = {}
+
+    # 已导入的真实命令类 {(模块, 类名): 类}
+    _resolved: Dict[Tuple[str, str], Type[BaseCommand]] = {}
+
+    @staticmethod
+    def get_components() -> List[Tuple[object, Type[BaseCommand]]]:
+        """生成框架注册用的组件列表（不导入命令模块）"""
+        components = []
+        for module, class_name in LazyCommandRegistry.COMMANDS:
+            command_class = LazyCommandRegistry._make_proxy(module, class_name)
+            components.append((command_class.get_command_info(), command_class))
+        return components
+
+    @staticmethod
+    def _read_meta(module: str, class_name: str) -> Optional[Dict]:
+        """静态解析命令类的元数据，无法完整解析时返回 None"""
+        if module not in LazyCommandRegistry._module_meta:
+            LazyCommandRegistry._module_meta[module] = LazyCommandRegistry._parse_module(module)
+
+        meta = dict(LazyCommandRegistry._module_meta[module].get(class_name, {}))
+        for field, provider in LazyCommandRegistry.PATTERN_PROVIDERS.get(class_name, {}).items():
+            meta[field] = provider()
+
+        if any(field not in meta for field in LazyCommandRegistry.META_FIELDS):
+            return None
+        return meta
+
+    @staticmethod
+    def _parse_module(module: str) -> Dict[str, Dict]:
+        path = os.path.join(COMMANDS_DIR, *module.split(".")) + ".py"
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+
+        classes = {}
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+
+            meta = {}
+            doc = ast.get_docstring(node)
+            if doc:
+                meta["__doc__"] = doc
+
+            for stmt in node.body:
+                if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1):
+                    continue
+                target = stmt.targets[0]
+                if not (isinstance(target, ast.Name) and target.id in LazyCommandRegistry.META_FIELDS):
+                    continue
+                try:
+                    meta[target.id] = ast.literal_eval(stmt.value)
+                except (ValueError, TypeError):
+                    pass  # 非字面量，交给 PATTERN_PROVIDERS 或回退为立即导入
+
+            classes[node.name] = meta
+        return classes
+
+    @staticmethod
+    def _make_proxy(module: str, class_name: str) -> Type[BaseCommand]:
+        """生成代理命令类；元数据无法静态解析时直接导入真实命令类"""
+        meta = LazyCommandRegistry._read_meta(module, class_name)
+        if meta is None:
+            logger.warning(f"命令 {module}.{class_name} 的元数据无法静态解析，立即导入")
+            return LazyCommandRegistry.resolve(module, class_name)
+
+        def __new__(cls, *args, **kwargs):
+            real_class = LazyCommandRegistry.resolve(module, class_name, proxy=cls)
+            return real_class(*args, **kwargs)
+
+        return type(class_name, (BaseCommand,), {
+            **meta,
+            "__new__": __new__,
+            "__module__": __name__,
+            "_lazy_target": (module, class_name),
+        })
+
+    @staticmethod
+    def resolve(module: str, class_name: str, proxy: Type = None) -> Type[BaseCommand]:
+        """导入真实命令类（只在首次调用时导入模块）"""
+        key = (module, class_name)
+        real_class = LazyCommandRegistry._resolved.get(key)
+        if real_class is not None:
+            return real_class
+
+        full_name = f"{__package__}.{module}"
+        already_loaded = full_name in sys.modules
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+
+        imported = importlib.import_module(f".{module}", __package__)
+
+        if not already_loaded:
+            StartupProfile.record_import(
+                module,
+                (time.perf_counter() - start) * 1000,
+                len(sys.modules) - modules_before,
+            )
+
+        real_class = getattr(imported, class_name)
+
+        # 框架在注册时写到代理类上的属性同步给真实类
+        if proxy is not None:
+            for attr, value in vars(proxy).items():
+                if attr.startswith("_") or attr in LazyCommandRegistry.META_FIELDS:
+                    continue
+                if attr not in vars(real_class):
+                    setattr(real_class, attr, value)
+
+        LazyCommandRegistry._resolved[key] = real_class
+        return real_class
+
+    @staticmethod
+    def get_pending_modules() -> List[str]:
+        """尚未导入的命令模块"""
+        return sorted({
+            module for module, _ in LazyCommandRegistry.COMMANDS
+            if f"{__package__}.{module}" not in sys.modules
+        })
@@ -6,10 +6,9 @@ import re
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
 from ...systems.endings.dual_ending_system import DualEndingSystem
 
 logger = get_logger("dt_ending_commands")
@@ -27,11 +26,7 @@ class DTEndingCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -86,11 +81,7 @@ class DTConfirmEndingCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -131,11 +122,7 @@ class DTEndingPreviewCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏!使用 /开始 来开始")
@@ -3,14 +3,15 @@
 """
 
 import re
-import json
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
 from src.plugin_system.apis import database_api, send_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
+from ...core.catalogue_cache import CatalogueCache
 from ...systems.attributes.attribute_system import AttributeSystem
 from ...features.outfits.outfit_system import OutfitSystem
 from ...features.items.item_system import ItemSystem
@@ -32,28 +33,28 @@ class DTOutfitListCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏！使用 /开始 来开始")
             return False, "角色不存在", False
 
         # 获取所有服装
-        from ...core.models import DTOutfit, DTUserOutfit
-        all_outfits = await database_api.db_get(DTOutfit, filters={})
+        from ...core.models import DTUserOutfit
+        all_outfits = await CatalogueCache.get_all("outfits")
         owned_outfits = await database_api.db_get(
             DTUserOutfit,
             filters={"user_id": user_id, "chat_id": chat_id}
         )
-        owned_ids = {o["outfit_id"] for o in owned_outfits}
+        owned_ids = {o["outfit_id"] for o in (owned_outfits or [])}
+
+        # 检查解锁条件（目录缓存中已编译）
+        unlock_rules = await CatalogueCache.get_rules("outfits")
+        unlockable_ids = set(unlock_rules.matching(character))
 
         # 使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             # 按类别分组
             categories = {
@@ -63,21 +64,8 @@ class DTOutfitListCommand(BaseCommand):
             }
 
             for outfit in all_outfits:
-                unlock_cond = json.loads(outfit["unlock_condition"])
                 is_owned = outfit["outfit_id"] in owned_ids
-                is_unlockable = True
-
-                # 检查解锁条件
-                for attr, required in unlock_cond.items():
-                    char_value = character.get(attr, 0)
-                    if isinstance(required, str) and required.startswith("<"):
-                        threshold = int(required[1:])
-                        if char_value >= threshold:
-                            is_unlockable = False
-                    else:
-                        threshold = int(required)
-                        if char_value < threshold:
-                            is_unlockable = False
+                is_unlockable = outfit["outfit_id"] in unlockable_ids
 
                 outfit_text = f"{outfit['outfit_name']} - {outfit['description']}"
 
@@ -98,8 +86,8 @@ class DTOutfitListCommand(BaseCommand):
             if categories["未解锁"]:
                 sections.append(("未解锁", categories["未解锁"]))
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_list_image(
-                "服装列表", sections, width=800
+            img_bytes, img_base64 = await RenderService.render(
+                "list", "服装列表", sections, width=800
             )
 
             await self.send_image(img_base64)
@@ -110,21 +98,8 @@ class DTOutfitListCommand(BaseCommand):
             lines = ["👗 【服装列表】\n"]
 
             for outfit in all_outfits:
-                unlock_cond = json.loads(outfit["unlock_condition"])
                 is_owned = outfit["outfit_id"] in owned_ids
-                is_unlockable = True
-
-                # 检查解锁条件
-                for attr, required in unlock_cond.items():
-                    char_value = character.get(attr, 0)
-                    if isinstance(required, str) and required.startswith("<"):
-                        threshold = int(required[1:])
-                        if char_value >= threshold:
-                            is_unlockable = False
-                    else:
-                        threshold = int(required)
-                        if char_value < threshold:
-                            is_unlockable = False
+                is_unlockable = outfit["outfit_id"] in unlockable_ids
 
                 # 显示状态
                 if is_owned:
@@ -148,6 +123,10 @@ class DTWearOutfitCommand(BaseCommand):
     command_pattern = r"^/穿\s+(.+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         match = re.match(self.command_pattern, self.message.processed_plain_text)
         if not match:
             await self.send_text("❌ 格式错误！使用: /穿 <服装名称>")
@@ -158,23 +137,14 @@ class DTWearOutfitCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 查找服装
-        from ...core.models import DTOutfit
-        outfit = await database_api.db_get(
-            DTOutfit,
-            filters={"outfit_name": outfit_name},
-            single_result=True
-        )
+        outfit = await CatalogueCache.find("outfits", "outfit_name", outfit_name)
 
         if not outfit:
             await self.send_text(f"❌ 未找到服装: {outfit_name}\n使用 /服装列表 查看所有服装")
             return False, "服装不存在", False
 
         # 获取角色数据(用于心理反应)
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         # 尝试穿上 (增强版 - 带心理反应)
         success, psychological_msg, instant_effects = await OutfitSystem.equip_outfit(
@@ -192,12 +162,7 @@ class DTWearOutfitCommand(BaseCommand):
             # 应用即时心理效果
             if instant_effects and character:
                 updated = AttributeSystem.apply_changes(character, instant_effects)
-                await database_api.db_save(
-                    DTCharacter,
-                    data=updated,
-                    key_field="user_id",
-                    key_value=user_id
-                )
+                await CharacterCache.save(user_id, chat_id, updated)
 
                 # 显示属性变化反馈
                 await self._send_effects_feedback(instant_effects)
@@ -244,7 +209,7 @@ class DTInventoryCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取背包
-        from ...core.models import DTUserInventory, DTItem
+        from ...core.models import DTUserInventory
         inventory = await database_api.db_get(
             DTUserInventory,
             filters={"user_id": user_id, "chat_id": chat_id}
@@ -256,15 +221,11 @@ class DTInventoryCommand(BaseCommand):
 
         # 使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = []
             for inv_item in inventory:
-                item = await database_api.db_get(
-                    DTItem,
-                    filters={"item_id": inv_item["item_id"]},
-                    single_result=True
-                )
+                item = await CatalogueCache.get("items", inv_item["item_id"])
 
                 if item:
                     item_info = [
@@ -275,8 +236,8 @@ class DTInventoryCommand(BaseCommand):
                     sections.append((item['item_name'], item_info))
 
             if sections:
-                img_bytes, img_base64 = HelpImageGenerator.generate_list_image(
-                    "道具背包", sections, width=800
+                img_bytes, img_base64 = await RenderService.render(
+                    "list", "道具背包", sections, width=800
                 )
 
                 await self.send_image(img_base64)
@@ -290,11 +251,7 @@ class DTInventoryCommand(BaseCommand):
         lines = ["🎒 【背包】\n"]
 
         for inv_item in inventory:
-            item = await database_api.db_get(
-                DTItem,
-                filters={"item_id": inv_item["item_id"]},
-                single_result=True
-            )
+            item = await CatalogueCache.get("items", inv_item["item_id"])
 
             if item:
                 lines.append(
@@ -322,11 +279,7 @@ class DTSceneListCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏！使用 /开始 来开始")
@@ -337,15 +290,15 @@ class DTSceneListCommand(BaseCommand):
 
         # 使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = [(
                 "可用场景",
                 [f"• {scene['scene_name']} - {scene['description']}" for scene in unlocked]
             )]
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_list_image(
-                "场景列表", sections, width=800
+            img_bytes, img_base64 = await RenderService.render(
+                "list", "场景列表", sections, width=800
             )
 
             await self.send_image(img_base64)
@@ -379,12 +332,7 @@ class DTGoSceneCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 查找场景
-        from ...core.models import DTScene
-        scene = await database_api.db_get(
-            DTScene,
-            filters={"scene_name": scene_name},
-            single_result=True
-        )
+        scene = await CatalogueCache.find("scenes", "scene_name", scene_name)
 
         if not scene:
             await self.send_text(f"❌ 未找到场景: {scene_name}\n使用 /场景列表 查看所有场景")
@@ -413,15 +361,15 @@ class DTTruthCommand(BaseCommand):
     command_pattern = r"^/真心话$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏！使用 /开始 来开始")
@@ -435,12 +383,7 @@ class DTTruthCommand(BaseCommand):
         if success:
             # 应用效果
             updated = AttributeSystem.apply_changes(character, effects)
-            await database_api.db_save(
-                DTCharacter,
-                data=updated,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, updated)
 
             await self.send_text(f"💬 【真心话】\n\n{question}")
             return True, "真心话游戏", True
@@ -456,15 +399,15 @@ class DTDareCommand(BaseCommand):
     command_pattern = r"^/大冒险$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏！使用 /开始 来开始")
@@ -478,12 +421,7 @@ class DTDareCommand(BaseCommand):
         if success:
             # 应用效果
             updated = AttributeSystem.apply_changes(character, effects)
-            await database_api.db_save(
-                DTCharacter,
-                data=updated,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, updated)
 
             await self.send_text(f"🎯 【大冒险】\n\n{task}")
             return True, "大冒险游戏", True
@@ -499,15 +437,15 @@ class DTDiceCommand(BaseCommand):
     command_pattern = r"^/(骰子|dice|roll)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色
-        character = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        character = await CharacterCache.get(user_id, chat_id)
 
         if not character:
             await self.send_text("❌ 你还没有开始游戏！使用 /开始 来开始")
@@ -518,12 +456,7 @@ class DTDiceCommand(BaseCommand):
 
         # 应用效果
         updated = AttributeSystem.apply_changes(character, effects)
-        await database_api.db_save(
-            DTCharacter,
-            data=updated,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, updated)
 
         await self.send_text(f"🎲 【掷骰子】\n\n点数: {result}\n{desc}")
         return True, f"掷骰子={result}", True
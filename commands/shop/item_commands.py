@@ -6,9 +6,12 @@ import re
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 
-from ...core.models import DTCharacter, DTItem, DTUserInventory
+from ...core.models import DTUserInventory
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
+from ...core.db_executor import DBExecutor
+from ...core.catalogue_cache import CatalogueCache
 from ...systems.attributes.attribute_system import AttributeSystem
 from ...features.items.item_system import ItemSystem
 
@@ -24,7 +27,7 @@ class DTInventoryCommand(BaseCommand):
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
-        inventory = await database_api.db_get(
+        inventory = await DBExecutor.db_get(
             DTUserInventory,
             filters={"user_id": user_id, "chat_id": chat_id}
         )
@@ -42,11 +45,7 @@ class DTInventoryCommand(BaseCommand):
             if inv["quantity"] <= 0:
                 continue
 
-            item = await database_api.db_get(
-                DTItem,
-                filters={"item_id": inv["item_id"]},
-                single_result=True
-            )
+            item = await CatalogueCache.get("items", inv["item_id"])
 
             if item:
                 has_items = True
@@ -72,6 +71,10 @@ class DTUseItemCommand(BaseCommand):
     command_pattern = r"^/用\s+(.+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         match = re.match(self.command_pattern, self.message.processed_plain_text)
         if not match:
             await self.send_text("使用方法: /用 <道具名>")
@@ -82,24 +85,17 @@ class DTUseItemCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 查找道具
-        all_items = await database_api.db_get(DTItem, filters={})
-        target_item = None
-
-        for item in all_items:
-            if item["item_name"] == item_name or item["item_id"] == item_name:
-                target_item = item
-                break
+        target_item = (
+            await CatalogueCache.find("items", "item_name", item_name)
+            or await CatalogueCache.get("items", item_name)
+        )
 
         if not target_item:
             await self.send_text(f"❌ 找不到道具: {item_name}")
             return False, "道具不存在", False
 
         # 获取角色信息 (在使用前)
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！")
@@ -126,17 +122,12 @@ class DTUseItemCommand(BaseCommand):
                     char[attr] = new_value
 
         # 保存角色状态
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # === 使用 LLM 生成详细回复 ===
         from ...utils.prompt_builder import PromptBuilder
         from ...systems.personality.dynamic_mood_system import DynamicMoodSystem
-        from src.plugin_system.apis import llm_api
+        from ...utils.llm_gateway import LLMGateway
         from src.common.logger import get_logger
 
         logger = get_logger("dt_use_item")
@@ -169,17 +160,8 @@ class DTUseItemCommand(BaseCommand):
         )
 
         # 调用 LLM 生成回复
-        models = llm_api.get_available_models()
-        replyer_model = models.get("replyer")
-
-        if not replyer_model:
-            logger.error("未找到 'replyer' 模型配置")
-            await self.send_text("❌ 系统错误：未找到回复模型配置")
-            return False, "未找到回复模型", False
-
-        success_llm, ai_response, reasoning, model_name = await llm_api.generate_with_model(
+        success_llm, ai_response, reasoning, model_name = await LLMGateway.generate(
             prompt=prompt,
-            model_config=replyer_model,
             request_type="desire_theatre.use_item"
         )
 
@@ -9,7 +9,10 @@ from typing import Tuple
 from src.plugin_system import BaseCommand
 from src.plugin_system.apis import database_api
 
-from ...core.models import DTCharacter, DTOutfit, DTUserOutfit
+from ...core.models import DTUserOutfit
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
+from ...core.catalogue_cache import CatalogueCache
 from ...features.outfits.outfit_system import OutfitSystem
 
 
@@ -25,11 +28,7 @@ class DTOutfitListCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色信息 (用于显示进度)
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！")
@@ -46,8 +45,9 @@ class DTOutfitListCommand(BaseCommand):
         current_id = current["outfit_id"] if current else None
 
         # 获取所有服装
-        all_outfits = await database_api.db_get(DTOutfit, filters={})
-        owned_ids = {o["outfit_id"] for o in owned} if owned else set()
+        all_outfits = await CatalogueCache.get_all("outfits")
+        owned_by_id = {o["outfit_id"]: o for o in owned} if owned else {}
+        owned_ids = set(owned_by_id)
 
         # 已拥有服装
         message = "👗 【服装列表】\n\n✅ 已拥有:\n"
@@ -61,7 +61,7 @@ class DTOutfitListCommand(BaseCommand):
                 message += f"   {outfit['description']}\n"
 
                 # 查找使用次数
-                own_data = next((o for o in owned if o["outfit_id"] == outfit["outfit_id"]), None)
+                own_data = owned_by_id.get(outfit["outfit_id"])
                 times = own_data["times_worn"] if own_data else 0
                 message += f"   穿着次数: {times}次\n\n"
 
@@ -134,6 +134,10 @@ class DTWearOutfitCommand(BaseCommand):
     command_pattern = r"^/穿\\s+(.+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         match = re.match(self.command_pattern, self.message.processed_plain_text)
         if not match:
             await self.send_text("使用方法: /穿 <服装名>")
@@ -144,24 +148,17 @@ class DTWearOutfitCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色信息 (在装备前)
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！")
             return False, "角色未创建", False
 
         # 查找服装
-        all_outfits = await database_api.db_get(DTOutfit, filters={})
-        target_outfit = None
-
-        for outfit in all_outfits:
-            if outfit["outfit_name"] == outfit_name or outfit["outfit_id"] == outfit_name:
-                target_outfit = outfit
-                break
+        target_outfit = (
+            await CatalogueCache.find("outfits", "outfit_name", outfit_name)
+            or await CatalogueCache.get("outfits", outfit_name)
+        )
 
         if not target_outfit:
             await self.send_text(f"❌ 找不到服装: {outfit_name}")
@@ -185,12 +182,7 @@ class DTWearOutfitCommand(BaseCommand):
                     char[attr] = new_value
 
             # 保存角色状态
-            await database_api.db_save(
-                DTCharacter,
-                data=char,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, char)
 
         # === 使用 LLM 生成详细回复 ===
         from ...utils.prompt_builder import PromptBuilder
@@ -6,9 +6,10 @@ import re
 from typing import Tuple
 
 from src.plugin_system import BaseCommand
-from src.plugin_system.apis import database_api
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
+from ...core.user_lock import UserLockManager
+from ...core.catalogue_cache import CatalogueCache
 from ...features.shop.shop_system import ShopSystem
 
 
@@ -24,11 +25,7 @@ class DTShopCommand(BaseCommand):
         chat_id = self.message.chat_stream.stream_id
 
         # 获取角色数据
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             await self.send_text("❌ 还没有创建角色！\n使用 /开始 <人格> 来开始游戏")
@@ -40,7 +37,7 @@ class DTShopCommand(BaseCommand):
 
         # 使用图片输出
         try:
-            from ...utils.help_image_generator import HelpImageGenerator
+            from ...utils.render_service import RenderService
 
             sections = []
 
@@ -92,8 +89,8 @@ class DTShopCommand(BaseCommand):
                 f"💰 你的爱心币: {char['coins']}"
             ]))
 
-            img_bytes, img_base64 = HelpImageGenerator.generate_help_image(
-                "商店", sections, width=900
+            img_bytes, img_base64 = await RenderService.render(
+                "help", "商店", sections, width=900, persist=False
             )
 
             await self.send_image(img_base64)
@@ -167,6 +164,10 @@ class DTBuyItemCommand(BaseCommand):
     command_pattern = r"^/(买道具|买|buy)\s+(.+?)(?:\s+(\d+))?$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
@@ -184,12 +185,7 @@ class DTBuyItemCommand(BaseCommand):
             return False, "数量无效", False
 
         # 根据名称查找道具ID
-        from ...core.models import DTItem
-        all_items = await database_api.db_get(
-            DTItem,
-            filters={"item_name": item_name},
-            single_result=True
-        )
+        all_items = await CatalogueCache.find("items", "item_name", item_name)
 
         if not all_items:
             await self.send_text(f"❌ 未找到道具: {item_name}\n\n使用 /商店 查看可购买道具")
@@ -216,6 +212,10 @@ class DTBuyOutfitCommand(BaseCommand):
     command_pattern = r"^/(买服装|买衣服)\s+(.+)$"
 
     async def execute(self) -> Tuple[bool, str, bool]:
+        # 修改角色数据，与同一用户的其他命令串行执行
+        return await UserLockManager.run_command(self, self._execute)
+
+    async def _execute(self) -> Tuple[bool, str, bool]:
         user_id = str(self.message.message_info.user_info.user_id)
         chat_id = self.message.chat_stream.stream_id
 
@@ -227,12 +227,7 @@ class DTBuyOutfitCommand(BaseCommand):
         outfit_name = match.group(2).strip()
 
         # 根据名称查找服装ID
-        from ...core.models import DTOutfit
-        outfit = await database_api.db_get(
-            DTOutfit,
-            filters={"outfit_name": outfit_name},
-            single_result=True
-        )
+        outfit = await CatalogueCache.find("outfits", "outfit_name", outfit_name)
 
         if not outfit:
             await self.send_text(f"❌ 未找到服装: {outfit_name}\n\n使用 /商店 查看可购买服装")
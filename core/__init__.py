@@ -3,6 +3,7 @@
 """
 
 from .models import *
+from .models import DTInteractionDaily
 from ..systems.attributes.attribute_system import AttributeSystem
 from ..systems.personality.personality_system import PersonalitySystem
 from ..systems.memory.memory_engine import MemoryEngine
@@ -18,6 +19,7 @@ __all__ = [
     "DTPreference",
     "DTStoryline",
     "DTEvent",
+    "DTInteractionDaily",
 
     # 扩展数据库模型
     "DTOutfit",
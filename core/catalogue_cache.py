@@ -0,0 +1,132 @@
+"""
+目录缓存 - DTItem/DTOutfit/DTScene/DTAchievement 的内存副本
+
+核心机制：
+- 插件启动时一次性加载四张静态目录表
+- 解锁条件在加载时从 JSON 解析并编译为 RuleSet，判定不再重复解析
+- 每张表有版本号，初始化/种子数据写入后调用 invalidate() 递增版本并重新加载
+- 按主键和任意字段的查找走预建的哈希索引
+- 返回的行都是副本，调用方修改不会污染缓存
+"""
+
+from typing import Dict, List, Optional
+
+from src.common.logger import get_logger
+
+from .models import DTItem, DTOutfit, DTScene, DTAchievement
+from .db_executor import DBExecutor
+from ..utils.condition_compiler import ConditionCompiler, RuleSet
+
+logger = get_logger("dt_catalogue_cache")
+
+
+class CatalogueCache:
+    """静态目录缓存"""
+
+    # 目录表定义 {名称: (模型, 主键字段, 解锁条件字段)}
+    TABLES = {
+        "items": (DTItem, "item_id", "unlock_condition"),
+        "outfits": (DTOutfit, "outfit_id", "unlock_condition"),
+        "scenes": (DTScene, "scene_id", "unlock_condition"),
+        "achievements": (DTAchievement, "achievement_id", "unlock_conditions"),
+    }
+
+    # 已加载的目录 {名称: {"rows": [...], "by_id": {...}, "rules": RuleSet, "version": int}}
+    _tables: Dict[str, Dict] = {}
+
+    # 按字段的查找索引 {(名称, 字段): {值: 行}}
+    _field_indexes: Dict[tuple, Dict] = {}
+
+    # 版本号（invalidate 时递增，重新加载后保留）
+    _versions: Dict[str, int] = {}
+
+    @staticmethod
+    def load(name: str = None):
+        """同步加载目录（启动时调用；不指定名称时加载全部）"""
+        names = [name] if name else list(CatalogueCache.TABLES)
+        for table_name in names:
+            CatalogueCache._tables[table_name] = CatalogueCache._load_table(table_name)
+            CatalogueCache._drop_field_indexes(table_name)
+
+        logger.info(
+            "目录缓存加载完成: " + ", ".join(
+                f"{table_name}={len(CatalogueCache._tables[table_name]['rows'])}" for table_name in names
+            )
+        )
+
+    @staticmethod
+    def _load_table(name: str) -> Dict:
+        """读取一张目录表并编译解锁条件"""
+        model, key_field, condition_field = CatalogueCache.TABLES[name]
+        rows = list(model.select().dicts())
+
+        return {
+            "rows": rows,
+            "by_id": {row[key_field]: row for row in rows},
+            "rules": RuleSet({
+                row[key_field]: ConditionCompiler.compile_json(row.get(condition_field), "threshold")
+                for row in rows
+            }),
+            "version": CatalogueCache._versions.get(name, 0),
+        }
+
+    @staticmethod
+    async def _ensure_loaded(name: str) -> Dict:
+        table = CatalogueCache._tables.get(name)
+        if table is None:
+            table = await DBExecutor.read(CatalogueCache._load_table, name)
+            CatalogueCache._tables[name] = table
+            CatalogueCache._drop_field_indexes(name)
+        return table
+
+    @staticmethod
+    def invalidate(name: str):
+        """目录数据变化时调用：递增版本，下次访问时重新加载"""
+        CatalogueCache._versions[name] = CatalogueCache._versions.get(name, 0) + 1
+        CatalogueCache._tables.pop(name, None)
+        CatalogueCache._drop_field_indexes(name)
+        logger.debug(f"目录缓存失效: {name} (v{CatalogueCache._versions[name]})")
+
+    @staticmethod
+    def _drop_field_indexes(name: str):
+        for index_key in [key for key in CatalogueCache._field_indexes if key[0] == name]:
+            del CatalogueCache._field_indexes[index_key]
+
+    @staticmethod
+    async def get_all(name: str) -> List[Dict]:
+        """获取整张目录（副本）"""
+        table = await CatalogueCache._ensure_loaded(name)
+        return [dict(row) for row in table["rows"]]
+
+    @staticmethod
+    async def get(name: str, key) -> Optional[Dict]:
+        """按主键获取一行（副本）"""
+        table = await CatalogueCache._ensure_loaded(name)
+        row = table["by_id"].get(key)
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    async def find(name: str, field: str, value) -> Optional[Dict]:
+        """按任意字段查找第一行（副本），字段索引首次使用时建立"""
+        table = await CatalogueCache._ensure_loaded(name)
+
+        index = CatalogueCache._field_indexes.get((name, field))
+        if index is None:
+            index = {}
+            for row in table["rows"]:
+                index.setdefault(row.get(field), row)
+            CatalogueCache._field_indexes[(name, field)] = index
+
+        row = index.get(value)
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    async def get_rules(name: str) -> RuleSet:
+        """获取目录的解锁条件规则集（规则ID为主键）"""
+        table = await CatalogueCache._ensure_loaded(name)
+        return table["rules"]
+
+    @staticmethod
+    def get_version(name: str) -> int:
+        """获取目录版本号"""
+        return CatalogueCache._versions.get(name, 0)
@@ -0,0 +1,94 @@
+"""
+目录种子数据写入器 - 幂等的批量初始化
+
+核心机制：
+- 每个目录的默认数据计算一个内容哈希，保存在 dt_seed_state 表
+- 启动时哈希与已保存的一致则整体跳过，只需一次主键查询
+- 哈希不一致时在一个事务中用 INSERT ... ON CONFLICT DO UPDATE 批量写入，
+  已存在的行按新的默认数据更新，不再逐行 db_get + db_save
+- 写入后使目录缓存失效
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, List
+
+from src.common.logger import get_logger
+
+from .models import dt_db, DTSeedState
+from .db_executor import DBExecutor
+from .catalogue_cache import CatalogueCache
+
+logger = get_logger("dt_catalogue_seeder")
+
+
+class CatalogueSeeder:
+    """目录种子数据写入器"""
+
+    # SQLite 单条语句的变量数有限，按批插入
+    BATCH_SIZE = 100
+
+    @staticmethod
+    def content_hash(rows: List[Dict]) -> str:
+        """计算默认数据的内容哈希（与字段顺序无关）"""
+        payload = json.dumps(rows, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def seed(name: str, rows: List[Dict]) -> Dict:
+        """
+        写入目录默认数据
+        返回: {"catalogue", "rows", "skipped", "elapsed_ms"}
+        """
+        start = time.perf_counter()
+        digest = CatalogueSeeder.content_hash(rows)
+
+        written = await DBExecutor.write(CatalogueSeeder._seed_sync, name, rows, digest)
+        if written:
+            CatalogueCache.invalidate(name)
+
+        report = {
+            "catalogue": name,
+            "rows": len(rows),
+            "skipped": not written,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+        logger.debug(
+            f"目录种子 {name}: {'未变化，跳过' if not written else f'写入{len(rows)}行'} "
+            f"({report['elapsed_ms']:.1f}ms)"
+        )
+        return report
+
+    @staticmethod
+    def _seed_sync(name: str, rows: List[Dict], digest: str) -> bool:
+        """在写线程中执行；内容未变化时返回 False"""
+        state = DTSeedState.get_or_none(DTSeedState.catalogue == name)
+        if state is not None and state.content_hash == digest:
+            return False
+
+        model, key_field, _ = CatalogueCache.TABLES[name]
+        key_column = getattr(model, key_field)
+
+        with dt_db.atomic():
+            for i in range(0, len(rows), CatalogueSeeder.BATCH_SIZE):
+                batch = rows[i:i + CatalogueSeeder.BATCH_SIZE]
+                update_fields = [
+                    getattr(model, field) for field in batch[0] if field != key_field
+                ]
+                model.insert_many(batch).on_conflict(
+                    conflict_target=[key_column],
+                    preserve=update_fields,
+                ).execute()
+
+            DTSeedState.insert(
+                catalogue=name,
+                content_hash=digest,
+                row_count=len(rows),
+                seeded_at=time.time(),
+            ).on_conflict(
+                conflict_target=[DTSeedState.catalogue],
+                preserve=[DTSeedState.content_hash, DTSeedState.row_count, DTSeedState.seeded_at],
+            ).execute()
+
+        return True
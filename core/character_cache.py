@@ -0,0 +1,226 @@
+"""
+角色会话缓存 - DTCharacter 前置的写回缓存
+
+核心机制：
+- 按 (user_id, chat_id) 缓存角色数据，一次命令只读一次数据库
+- put() 只标记脏数据，命令结束时 flush() 合并为一次写入
+- save() 为写穿透，供不走动作流程的命令使用，保证缓存与数据库一致
+- TTL + LRU 淘汰，插件关闭时 flush_all() 写回所有脏数据
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+from .models import DTCharacter
+from .db_executor import DBExecutor
+from .unit_of_work import UnitOfWork
+
+logger = get_logger("dt_character_cache")
+
+
+class CharacterCache:
+    """角色会话缓存"""
+
+    # 缓存条目 {(user_id, chat_id): {"data": dict, "dirty": bool, "loaded_at": float, "used_at": float}}
+    _entries: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+
+    # 缓存条目存活时间（秒）
+    TTL_SECONDS = 600
+
+    # 最大缓存角色数
+    MAX_ENTRIES = 512
+
+    # 统计数据
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "coalesced": 0}
+
+    @staticmethod
+    async def get(user_id: str, chat_id: str) -> Optional[Dict]:
+        """
+        获取角色数据（优先命中缓存）
+        返回: 角色数据副本，不存在时返回 None
+        """
+        await CharacterCache._evict()
+
+        key = (user_id, chat_id)
+        entry = CharacterCache._entries.get(key)
+        if entry is not None:
+            CharacterCache._entries.move_to_end(key)
+            entry["used_at"] = time.time()
+            CharacterCache._stats["hits"] += 1
+            return dict(entry["data"])
+
+        CharacterCache._stats["misses"] += 1
+        char = await DBExecutor.read(CharacterCache._read_row, user_id, chat_id)
+
+        if not char:
+            return None
+
+        now = time.time()
+        CharacterCache._entries[key] = {
+            "data": dict(char),
+            "dirty": False,
+            "loaded_at": now,
+            "used_at": now,
+        }
+        return dict(char)
+
+    @staticmethod
+    def put(user_id: str, chat_id: str, character: Dict):
+        """更新缓存中的角色数据并标记为脏（不立即写库）"""
+        key = (user_id, chat_id)
+        entry = CharacterCache._entries.get(key)
+
+        if entry is not None and entry["dirty"]:
+            CharacterCache._stats["coalesced"] += 1
+
+        CharacterCache._entries[key] = {
+            "data": dict(character),
+            "dirty": True,
+            "loaded_at": entry["loaded_at"] if entry else time.time(),
+            "used_at": time.time(),
+        }
+        CharacterCache._entries.move_to_end(key)
+
+    @staticmethod
+    async def save(user_id: str, chat_id: str, character: Dict):
+        """写穿透保存：更新缓存并立即写库"""
+        CharacterCache.put(user_id, chat_id, character)
+        await CharacterCache.flush(user_id, chat_id)
+
+    @staticmethod
+    async def flush(user_id: str, chat_id: str) -> bool:
+        """
+        写回单个角色的脏数据
+        返回: 是否发生了写库
+        """
+        entry = CharacterCache._entries.get((user_id, chat_id))
+        if entry is None or not entry["dirty"]:
+            return False
+
+        # 先清除脏标记，写库期间的新 put 会重新标记
+        data = entry["data"]
+        entry["dirty"] = False
+
+        # 工作单元中：随同一事务提交，回滚时丢弃缓存以免残留未提交的数据
+        uow = UnitOfWork.current()
+        if uow is not None:
+            uow.add(CharacterCache._write_row, user_id, chat_id, data)
+            uow.on_rollback(lambda: CharacterCache.invalidate(user_id, chat_id))
+            CharacterCache._stats["writes"] += 1
+            return True
+
+        try:
+            await DBExecutor.write(CharacterCache._write_row, user_id, chat_id, data)
+        except Exception:
+            entry["dirty"] = True
+            raise
+        CharacterCache._stats["writes"] += 1
+        return True
+
+    @staticmethod
+    async def flush_all() -> int:
+        """写回所有脏数据（插件关闭时调用）"""
+        flushed = 0
+        for user_id, chat_id in list(CharacterCache._entries.keys()):
+            try:
+                if await CharacterCache.flush(user_id, chat_id):
+                    flushed += 1
+            except Exception as e:
+                logger.error(f"写回角色缓存失败: {user_id} - {e}", exc_info=True)
+
+        if flushed:
+            logger.info(f"角色缓存写回完成: {flushed}个")
+        return flushed
+
+    @staticmethod
+    def flush_all_sync():
+        """同步写回所有脏数据（用于 atexit，此时线程池已不可用，直接在当前线程写库）"""
+        for (user_id, chat_id), entry in list(CharacterCache._entries.items()):
+            if not entry["dirty"]:
+                continue
+            try:
+                CharacterCache._write_row(user_id, chat_id, entry["data"])
+                entry["dirty"] = False
+            except Exception as e:
+                logger.error(f"关闭时写回角色缓存失败: {user_id} - {e}", exc_info=True)
+
+    @staticmethod
+    def _read_row(user_id: str, chat_id: str) -> Optional[Dict]:
+        """读取角色行（在数据库线程中执行）"""
+        return (
+            DTCharacter.select()
+            .where((DTCharacter.user_id == user_id) & (DTCharacter.chat_id == chat_id))
+            .dicts()
+            .first()
+        )
+
+    @staticmethod
+    def _write_row(user_id: str, chat_id: str, data: Dict):
+        """按 (user_id, chat_id) 更新或插入角色行（在数据库线程中执行）"""
+        fields = {
+            key: value for key, value in data.items()
+            if key != "id" and key in DTCharacter._meta.fields
+        }
+        fields["user_id"] = user_id
+        fields["chat_id"] = chat_id
+
+        updated = DTCharacter.update(**fields).where(
+            (DTCharacter.user_id == user_id) & (DTCharacter.chat_id == chat_id)
+        ).execute()
+
+        if not updated:
+            DTCharacter.insert(**fields).execute()
+
+    @staticmethod
+    def get_idle(idle_seconds: float) -> List[Tuple[str, str, Dict]]:
+        """
+        仍在缓存中（近期活跃）但已空闲超过 idle_seconds 的角色
+        返回: [(user_id, chat_id, 角色数据副本)]，最久未使用的在前
+        """
+        now = time.time()
+        return [
+            (user_id, chat_id, dict(entry["data"]))
+            for (user_id, chat_id), entry in CharacterCache._entries.items()
+            if now - entry.get("used_at", entry["loaded_at"]) >= idle_seconds
+        ]
+
+    @staticmethod
+    def invalidate(user_id: str, chat_id: str):
+        """丢弃缓存（角色被删除或外部修改时调用）"""
+        CharacterCache._entries.pop((user_id, chat_id), None)
+
+    @staticmethod
+    async def _evict():
+        """淘汰过期和超出容量的条目（脏条目先写回）"""
+        now = time.time()
+
+        expired = [
+            key for key, entry in CharacterCache._entries.items()
+            if now - entry["loaded_at"] > CharacterCache.TTL_SECONDS
+        ]
+        overflow = len(CharacterCache._entries) - len(expired) - CharacterCache.MAX_ENTRIES
+        if overflow > 0:
+            # OrderedDict 头部为最久未使用
+            expired_set = set(expired)
+            lru_keys = [key for key in CharacterCache._entries if key not in expired_set]
+            expired.extend(lru_keys[:overflow])
+
+        for key in expired:
+            entry = CharacterCache._entries.get(key)
+            if entry is None:
+                continue
+            if entry["dirty"]:
+                await CharacterCache.flush(*key)
+
+            # 写回期间可能有新的 put，只淘汰干净的条目
+            current = CharacterCache._entries.get(key)
+            if current is not None and not current["dirty"]:
+                CharacterCache._entries.pop(key, None)
+
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """获取缓存统计"""
+        return {**CharacterCache._stats, "size": len(CharacterCache._entries)}
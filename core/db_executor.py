@@ -0,0 +1,130 @@
+"""
+数据库执行器 - 把同步的 peewee 调用移出事件循环
+
+核心机制：
+- 单写线程：所有写操作串行执行，避免 SQLite 写锁竞争
+- 读线程池：WAL 模式下读操作可与写操作并发
+- peewee 的连接按线程隔离，每个工作线程持有自己的连接
+- db_get / db_save 与 database_api 同名方法语义一致，热点路径直接替换即可
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.common.logger import get_logger
+
+from .models import dt_db
+
+logger = get_logger("dt_db_executor")
+
+
+class DBExecutor:
+    """数据库读写执行器"""
+
+    # 读线程数
+    READER_THREADS = 4
+
+    _writer: ThreadPoolExecutor = None
+    _readers: ThreadPoolExecutor = None
+
+    @staticmethod
+    def _get_writer() -> ThreadPoolExecutor:
+        if DBExecutor._writer is None:
+            DBExecutor._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dt_db_writer")
+        return DBExecutor._writer
+
+    @staticmethod
+    def _get_readers() -> ThreadPoolExecutor:
+        if DBExecutor._readers is None:
+            DBExecutor._readers = ThreadPoolExecutor(
+                max_workers=DBExecutor.READER_THREADS, thread_name_prefix="dt_db_reader"
+            )
+        return DBExecutor._readers
+
+    @staticmethod
+    async def read(func: Callable, *args, **kwargs) -> Any:
+        """在读线程池中执行查询"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            DBExecutor._get_readers(), functools.partial(DBExecutor._run, func, *args, **kwargs)
+        )
+
+    @staticmethod
+    async def write(func: Callable, *args, **kwargs) -> Any:
+        """在写线程中执行写操作"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            DBExecutor._get_writer(), functools.partial(DBExecutor._run, func, *args, **kwargs)
+        )
+
+    @staticmethod
+    async def db_get(
+        model,
+        filters: Dict = None,
+        order_by: Union[str, List[str]] = None,
+        limit: int = None,
+        single_result: bool = False
+    ) -> Union[List[Dict], Optional[Dict]]:
+        """
+        查询（在读线程池中执行）
+        order_by 字段名前加 - 表示降序；single_result 时返回单行或 None
+        """
+        return await DBExecutor.read(DBExecutor.select_rows, model, filters, order_by, limit, single_result)
+
+    @staticmethod
+    async def db_save(model, data: Dict, key_field: str = None, key_value=None):
+        """按键更新，不存在则插入（在写线程中执行）"""
+        await DBExecutor.write(DBExecutor.upsert_row, model, data, key_field, key_value)
+
+    @staticmethod
+    def select_rows(model, filters: Dict = None, order_by=None, limit: int = None, single_result: bool = False):
+        """同步查询，返回字典"""
+        query = model.select()
+        for key, value in (filters or {}).items():
+            query = query.where(getattr(model, key) == value)
+
+        if order_by:
+            fields = [order_by] if isinstance(order_by, str) else order_by
+            query = query.order_by(*(
+                getattr(model, name[1:]).desc() if name.startswith("-") else getattr(model, name)
+                for name in fields
+            ))
+
+        if single_result:
+            return query.limit(1).dicts().first()
+        if limit:
+            query = query.limit(limit)
+        return list(query.dicts())
+
+    @staticmethod
+    def upsert_row(model, data: Dict, key_field: str = None, key_value=None):
+        """与 database_api.db_save 相同的语义：按键更新，不存在则插入"""
+        fields = {key: value for key, value in data.items() if key in model._meta.fields and key != "id"}
+
+        if key_field and key_value is not None:
+            existing = model.get_or_none(getattr(model, key_field) == key_value)
+            if existing is not None:
+                for key, value in fields.items():
+                    setattr(existing, key, value)
+                existing.save()
+                return
+
+        model.create(**fields)
+
+    @staticmethod
+    def _run(func: Callable, *args, **kwargs) -> Any:
+        """在工作线程中执行，确保当前线程已有连接"""
+        dt_db.connect(reuse_if_open=True)
+        return func(*args, **kwargs)
+
+    @staticmethod
+    def shutdown():
+        """关闭执行器（等待已提交的任务完成）"""
+        for executor in (DBExecutor._writer, DBExecutor._readers):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        DBExecutor._writer = None
+        DBExecutor._readers = None
+        logger.info("数据库执行器已关闭")
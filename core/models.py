@@ -12,7 +12,18 @@ logger = get_logger("dt_models")
 # 创建独立的数据库实例
 PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(PLUGIN_DIR, "desire_theatre.db")
-dt_db = SqliteDatabase(DB_PATH)
+
+# SQLite 连接参数：WAL 允许读写并发，NORMAL 同步在 WAL 下仍保证崩溃一致性
+DB_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": 1,             # NORMAL
+    "cache_size": -16 * 1024,     # 16MB 页缓存（负数单位为KB）
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,         # 写锁等待 5 秒
+    "temp_store": 2,              # MEMORY
+}
+
+dt_db = SqliteDatabase(DB_PATH, pragmas=DB_PRAGMAS)
 
 
 class DTCharacter(Model):
@@ -224,6 +235,27 @@ class DTEvent(Model):
         table_name = "dt_event"
 
 
+class DTInteractionDaily(Model):
+    """互动日汇总表 - 旧互动事件压缩后的按日统计"""
+
+    user_id = TextField(index=True)
+    chat_id = TextField(index=True)
+    day = TextField()         # 日期 YYYY-MM-DD
+    event_name = TextField()  # 动作名
+
+    count = IntegerField(default=0)
+    attribute_changes = TextField(default="{}")  # 当日属性变化合计 JSON
+    first_timestamp = FloatField()
+    last_timestamp = FloatField()
+
+    class Meta:
+        database = dt_db
+        table_name = "dt_interaction_daily"
+        indexes = (
+            (("user_id", "chat_id", "day", "event_name"), True),
+        )
+
+
 # ========================================================================
 # 扩展数据库模型
 # ========================================================================
@@ -383,6 +415,34 @@ class DTGameRecord(Model):
         table_name = "dt_game_record"
 
 
+class DTCooldown(Model):
+    """动作冷却表 - SQLite 冷却存储后端使用"""
+    user_id = TextField()
+    chat_id = TextField()
+    action_name = TextField()
+    last_use = FloatField()
+    expires_at = FloatField(index=True)
+
+    class Meta:
+        database = dt_db
+        table_name = "dt_cooldown"
+        indexes = (
+            (("user_id", "chat_id", "action_name"), True),
+        )
+
+
+class DTSeedState(Model):
+    """目录种子数据状态 - 记录每个目录最近一次写入的内容哈希"""
+    catalogue = TextField(unique=True, index=True)
+    content_hash = TextField()
+    row_count = IntegerField(default=0)
+    seeded_at = FloatField(default=time.time)
+
+    class Meta:
+        database = dt_db
+        table_name = "dt_seed_state"
+
+
 def _migrate_career_fields():
     """数据库迁移：添加职业系统字段"""
     try:
@@ -429,6 +489,107 @@ def _migrate_career_fields():
 
 
 
+# 复合索引定义 {索引名: (表名, 列)}
+# 热点查询都按 (user_id, chat_id, 类型) 过滤并按时间/重要性排序
+COMPOSITE_INDEXES = {
+    "idx_dt_event_user_chat_type_ts": ("dt_event", "user_id, chat_id, event_type, timestamp"),
+    "idx_dt_event_type_outcome_ts": ("dt_event", "event_type, outcome, timestamp"),
+    "idx_dt_memory_user_chat_type_ts": ("dt_memory", "user_id, chat_id, memory_type, timestamp"),
+    "idx_dt_memory_user_chat_type_importance": ("dt_memory", "user_id, chat_id, memory_type, importance"),
+}
+
+# 索引验证用的代表性查询 {索引名: SQL}
+INDEX_PROBE_QUERIES = {
+    "idx_dt_event_user_chat_type_ts": (
+        "SELECT * FROM dt_event WHERE user_id = 'u' AND chat_id = 'c' "
+        "AND event_type = 'interaction' ORDER BY timestamp DESC LIMIT 10"
+    ),
+    "idx_dt_event_type_outcome_ts": (
+        "SELECT * FROM dt_event WHERE event_type = 'delayed_consequence' "
+        "AND outcome = 'pending' AND timestamp <= 0"
+    ),
+    "idx_dt_memory_user_chat_type_ts": (
+        "SELECT * FROM dt_memory WHERE user_id = 'u' AND chat_id = 'c' "
+        "AND memory_type = 'promise' ORDER BY timestamp DESC LIMIT 10"
+    ),
+    "idx_dt_memory_user_chat_type_importance": (
+        "SELECT * FROM dt_memory WHERE user_id = 'u' AND chat_id = 'c' "
+        "AND memory_type = 'habit' ORDER BY importance DESC LIMIT 3"
+    ),
+}
+
+
+def _migrate_composite_indexes():
+    """数据库迁移：为 DTEvent/DTMemory 热点查询添加复合索引"""
+    try:
+        cursor = dt_db.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+
+        created_count = 0
+        for index_name, (table_name, columns) in COMPOSITE_INDEXES.items():
+            if index_name in existing_indexes:
+                continue
+            try:
+                # 不在事务中时 peewee 以自动提交模式执行，无需手动 commit
+                dt_db.execute_sql(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})")
+                logger.info(f"添加复合索引: {index_name}")
+                created_count += 1
+            except Exception as e:
+                logger.error(f"添加索引 {index_name} 失败: {e}")
+
+        if created_count > 0:
+            # 更新统计信息，让查询规划器选用新索引
+            dt_db.execute_sql("ANALYZE")
+            logger.info(f"索引迁移完成，添加了 {created_count} 个复合索引")
+
+        verify_query_plans()
+
+    except Exception as e:
+        logger.error(f"索引迁移失败: {e}", exc_info=True)
+
+
+# 表行数（按 ANALYZE 统计）低于该值时不验证：数据很少时规划器选择全表扫描是正确的
+PROBE_MIN_ROWS = 1000
+
+
+def _analyzed_row_count(cursor, table_name: str):
+    """读取 ANALYZE 记录的表行数，未统计过返回 None"""
+    try:
+        cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table_name,))
+    except Exception:
+        # 从未执行过 ANALYZE 时 sqlite_stat1 不存在
+        return None
+    row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
+
+
+def verify_query_plans() -> dict:
+    """
+    用 EXPLAIN QUERY PLAN 验证热点查询是否命中复合索引
+    返回: {索引名: 是否命中}，表数据太少而跳过验证的为 None
+    """
+    results = {}
+    cursor = dt_db.cursor()
+
+    for index_name, sql in INDEX_PROBE_QUERIES.items():
+        table_name = COMPOSITE_INDEXES[index_name][0]
+        row_count = _analyzed_row_count(cursor, table_name)
+        if row_count is not None and row_count < PROBE_MIN_ROWS:
+            results[index_name] = None
+            continue
+
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = " | ".join(str(row[-1]) for row in cursor.fetchall())
+        results[index_name] = index_name in plan
+
+        if not results[index_name]:
+            logger.warning(f"查询未命中索引 {index_name}: {plan}")
+
+    return results
+
+
 def init_dt_database():
     """初始化欲望剧场数据库表"""
     with dt_db:
@@ -439,6 +600,7 @@ def init_dt_database():
             DTPreference,
             DTStoryline,
             DTEvent,
+            DTInteractionDaily,
             # 扩展表
             DTOutfit,
             DTUserOutfit,
@@ -450,7 +612,15 @@ def init_dt_database():
             DTScene,
             DTVisitedScene,
             DTGameRecord,
+            DTCooldown,
+            DTSeedState,
         ], safe=True)
 
         # 【迁移】添加职业系统字段（如果不存在）
         _migrate_career_fields()
+
+    # 【迁移】添加复合索引（如果不存在）
+    # 在 with dt_db 的事务之外执行：CREATE INDEX/ANALYZE 以自动提交方式生效，
+    # 不能在外层事务中途提交，否则退出 with 时会回滚失败
+    with dt_db.connection_context():
+        _migrate_composite_indexes()
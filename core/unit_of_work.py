@@ -0,0 +1,148 @@
+"""
+工作单元 - 把一次命令产生的所有写操作合并为一个 SQLite 事务
+
+核心机制：
+- UnitOfWork.begin() 在当前协程上下文中开启工作单元
+- 工作单元内的 UnitOfWork.save() 只登记写操作，不立即写库
+- 正常结束时在数据库写线程中用一个事务提交全部写操作（一次 fsync）
+- 出现异常或调用 set_rollback_only() 时丢弃全部写操作，
+  并执行登记的回滚回调（例如丢弃角色缓存中的脏数据）
+- 没有开启工作单元时，UnitOfWork.save() 等同于 DBExecutor.db_save()
+"""
+
+import contextvars
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+from .models import dt_db
+from .db_executor import DBExecutor
+
+logger = get_logger("dt_unit_of_work")
+
+_current_uow: contextvars.ContextVar = contextvars.ContextVar("dt_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """工作单元"""
+
+    def __init__(self):
+        # 待执行的写操作 [(函数, 参数)]，在同一事务中按顺序执行
+        self._operations: List[Tuple[Callable, tuple]] = []
+        # 已登记的保存数据 [(模型, 数据)]，用于读取本次尚未提交的写入
+        self._pending: List[Tuple[type, Dict]] = []
+        self._after_commit: List[Callable] = []
+        self._after_rollback: List[Callable] = []
+        self._rollback_only = False
+        self.closed = False
+
+    @staticmethod
+    def current() -> Optional["UnitOfWork"]:
+        """获取当前上下文中仍在进行的工作单元"""
+        uow = _current_uow.get()
+        if uow is None or uow.closed:
+            return None
+        return uow
+
+    @staticmethod
+    @asynccontextmanager
+    async def begin():
+        """开启工作单元；已有工作单元时复用外层"""
+        outer = UnitOfWork.current()
+        if outer is not None:
+            yield outer
+            return
+
+        uow = UnitOfWork()
+        token = _current_uow.set(uow)
+        try:
+            yield uow
+        except BaseException:
+            uow.rollback()
+            raise
+        else:
+            if uow._rollback_only:
+                uow.rollback()
+            else:
+                await uow.commit()
+        finally:
+            _current_uow.reset(token)
+
+    def add(self, func: Callable, *args):
+        """登记一个在提交事务中执行的同步写函数"""
+        self._operations.append((func, args))
+
+    def on_commit(self, callback: Callable):
+        """登记提交成功后的回调"""
+        self._after_commit.append(callback)
+
+    def on_rollback(self, callback: Callable):
+        """登记回滚后的回调"""
+        self._after_rollback.append(callback)
+
+    def set_rollback_only(self):
+        """标记本次工作单元只能回滚（例如 LLM 生成失败）"""
+        self._rollback_only = True
+
+    async def commit(self):
+        """在一个事务中提交全部写操作"""
+        self.closed = True
+        if self._operations:
+            await DBExecutor.write(self._apply)
+            logger.debug(f"工作单元提交: {len(self._operations)}个写操作")
+
+        for callback in self._after_commit:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"提交回调执行失败: {e}", exc_info=True)
+
+    def rollback(self):
+        """丢弃全部写操作"""
+        self.closed = True
+        discarded = len(self._operations)
+        self._operations.clear()
+        self._pending.clear()
+
+        for callback in self._after_rollback:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"回滚回调执行失败: {e}", exc_info=True)
+
+        if discarded:
+            logger.info(f"工作单元回滚: 丢弃{discarded}个写操作")
+
+    def _apply(self):
+        """执行全部写操作（在数据库写线程中执行）"""
+        with dt_db.atomic():
+            for func, args in self._operations:
+                func(*args)
+
+    @staticmethod
+    async def save(model, data: Dict, key_field: str = None, key_value=None):
+        """
+        保存一行数据
+        有工作单元时登记到事务中，否则立即在数据库写线程中写库
+        """
+        uow = UnitOfWork.current()
+        if uow is None:
+            await DBExecutor.db_save(model, data=data, key_field=key_field, key_value=key_value)
+            return
+
+        data = dict(data)
+        uow.add(DBExecutor.upsert_row, model, data, key_field, key_value)
+        uow._pending.append((model, data))
+
+    @staticmethod
+    def pending_rows(model, **match) -> List[Dict]:
+        """获取当前工作单元中尚未提交的匹配数据（按登记顺序倒序，最新在前）"""
+        uow = UnitOfWork.current()
+        if uow is None:
+            return []
+
+        return [
+            data for pending_model, data in reversed(uow._pending)
+            if pending_model is model and all(data.get(k) == v for k, v in match.items())
+        ]
@@ -0,0 +1,123 @@
+"""
+用户锁管理器 - 按 (user_id, chat_id) 串行化同一用户的命令
+
+核心机制：
+- 每个 (user_id, chat_id) 一把 asyncio.Lock，不同用户之间完全并行
+- 锁在没有命令使用时自动回收，不会随用户数增长
+- 请求合并：相同的命令（签名相同）正在排队或执行时，
+  重复的请求直接等待并复用第一次的结果，不再单独调用 LLM
+- 同一用户排队的命令超过上限时直接拒绝，避免刷屏堆积
+- 所有修改角色数据的命令都通过 run / run_command 进入同一把锁，
+  避免 读缓存 -> 修改 -> 写回 的过程被同一用户的其他命令交错覆盖
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_user_lock")
+
+
+class UserLockManager:
+    """用户锁管理器"""
+
+    # 执行结果状态
+    EXECUTED = "executed"      # 本次请求实际执行
+    COALESCED = "coalesced"    # 与正在进行的相同请求合并
+    REJECTED = "rejected"      # 排队已满，被拒绝
+
+    # 每个用户同时排队+执行的命令上限
+    MAX_QUEUED = 3
+
+    # 会话 {(user_id, chat_id): {"lock": Lock, "refs": 占用数, "inflight": {签名: Future}}}
+    _sessions: Dict[Tuple[str, str], Dict] = {}
+
+    # 统计数据
+    _stats: Dict[str, int] = {"executed": 0, "coalesced": 0, "rejected": 0}
+
+    @staticmethod
+    async def run(
+        user_id: str,
+        chat_id: str,
+        signature: str,
+        func: Callable,
+        *args,
+        **kwargs
+    ) -> Tuple[str, Any]:
+        """
+        在用户锁内执行协程函数
+        返回: (状态, 结果)，状态为 EXECUTED / COALESCED / REJECTED，被拒绝时结果为 None
+        """
+        key = (user_id, chat_id)
+        session = UserLockManager._sessions.get(key)
+        if session is None:
+            session = {"lock": asyncio.Lock(), "refs": 0, "inflight": {}}
+            UserLockManager._sessions[key] = session
+
+        # 相同请求正在排队或执行，等待并复用其结果
+        inflight = session["inflight"].get(signature)
+        if inflight is not None:
+            UserLockManager._stats["coalesced"] += 1
+            logger.debug(f"合并重复请求: {user_id} - {signature}")
+            return UserLockManager.COALESCED, await asyncio.shield(inflight)
+
+        if session["refs"] >= UserLockManager.MAX_QUEUED:
+            UserLockManager._stats["rejected"] += 1
+            logger.debug(f"排队已满，拒绝请求: {user_id} - {signature}")
+            return UserLockManager.REJECTED, None
+
+        future = asyncio.get_running_loop().create_future()
+        session["inflight"][signature] = future
+        session["refs"] += 1
+
+        try:
+            async with session["lock"]:
+                result = await func(*args, **kwargs)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # 没有合并请求等待时，避免"异常未被获取"的警告
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            UserLockManager._stats["executed"] += 1
+            return UserLockManager.EXECUTED, result
+        finally:
+            session["inflight"].pop(signature, None)
+            session["refs"] -= 1
+            if session["refs"] <= 0:
+                UserLockManager._sessions.pop(key, None)
+
+    @staticmethod
+    async def run_command(command, func: Callable) -> Tuple[bool, str, bool]:
+        """
+        在命令发送者的用户锁内执行命令处理函数（与动作、聊天共用同一把锁）
+        签名为 命令名:消息文本，重复发送的同一条命令只执行一次
+        """
+        message = command.message
+        user_id = str(message.message_info.user_info.user_id)
+        chat_id = message.chat_stream.stream_id
+
+        status, result = await UserLockManager.run(
+            user_id, chat_id, f"{command.command_name}:{message.processed_plain_text}", func
+        )
+
+        if status == UserLockManager.REJECTED:
+            await command.send_text("⏳ 操作太频繁了，请等上一个操作完成后再试")
+            return False, "请求过于频繁", True
+
+        return result
+
+    @staticmethod
+    def is_busy(user_id: str, chat_id: str) -> bool:
+        """该用户是否有命令正在执行或排队"""
+        return (user_id, chat_id) in UserLockManager._sessions
+
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """获取统计数据"""
+        return {**UserLockManager._stats, "active_sessions": len(UserLockManager._sessions)}
@@ -6,10 +6,13 @@ import json
 import time
 from typing import List, Dict
 
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTAchievement, DTUserAchievement
+from ...core.models import DTUserAchievement
+from ...core.unit_of_work import UnitOfWork
+from ...core.db_executor import DBExecutor
+from ...core.catalogue_cache import CatalogueCache
+from ...core.catalogue_seeder import CatalogueSeeder
 
 logger = get_logger("dt_achievement_system")
 
@@ -54,35 +57,28 @@ class AchievementSystem:
     ]
 
     @staticmethod
-    async def initialize_achievements():
-        """初始化成就"""
-        for ach_data in AchievementSystem.DEFAULT_ACHIEVEMENTS:
-            existing = await database_api.db_get(
-                DTAchievement,
-                filters={"achievement_id": ach_data["achievement_id"]},
-                single_result=True
-            )
-
-            if not existing:
-                await database_api.db_save(
-                    DTAchievement,
-                    data={
-                        "achievement_id": ach_data["achievement_id"],
-                        "achievement_name": ach_data["name"],
-                        "achievement_category": ach_data["category"],
-                        "description": ach_data["description"],
-                        "hint": ach_data["hint"],
-                        "unlock_conditions": json.dumps(ach_data["conditions"]),
-                        "is_hidden": ach_data["is_hidden"],
-                        "reward_points": ach_data["reward_points"],
-                        "reward_items": "[]",
-                        "rarity": ach_data["rarity"]
-                    },
-                    key_field="achievement_id",
-                    key_value=ach_data["achievement_id"]
-                )
+    async def initialize_achievements() -> Dict:
+        """初始化成就（内容未变化时跳过，变化时一个事务批量写入）"""
+        rows = [
+            {
+                "achievement_id": ach_data["achievement_id"],
+                "achievement_name": ach_data["name"],
+                "achievement_category": ach_data["category"],
+                "description": ach_data["description"],
+                "hint": ach_data["hint"],
+                "unlock_conditions": json.dumps(ach_data["conditions"]),
+                "is_hidden": ach_data["is_hidden"],
+                "reward_points": ach_data["reward_points"],
+                "reward_items": "[]",
+                "rarity": ach_data["rarity"]
+            }
+            for ach_data in AchievementSystem.DEFAULT_ACHIEVEMENTS
+        ]
+
+        report = await CatalogueSeeder.seed("achievements", rows)
 
         logger.info("成就系统初始化完成")
+        return report
 
     @staticmethod
     async def check_achievements(
@@ -91,43 +87,31 @@ class AchievementSystem:
         character: Dict
     ) -> List[Dict]:
         """检查可解锁的成就"""
-        # 获取所有成就
-        all_achievements = await database_api.db_get(DTAchievement, filters={})
+        # 获取所有成就（目录缓存）
+        all_achievements = await CatalogueCache.get_all("achievements")
 
         # 获取已解锁的成就
-        unlocked = await database_api.db_get(
+        unlocked = await DBExecutor.db_get(
             DTUserAchievement,
             filters={"user_id": user_id, "chat_id": chat_id}
         )
-        unlocked_ids = [a["achievement_id"] for a in unlocked] if unlocked else []
+        unlocked_ids = {a["achievement_id"] for a in unlocked} if unlocked else set()
 
         newly_unlocked = []
 
+        # 一次判定所有成就的解锁条件
+        unlock_rules = await CatalogueCache.get_rules("achievements")
+        matched = set(unlock_rules.matching(character))
+
         for ach in all_achievements:
             if ach["achievement_id"] in unlocked_ids:
                 continue
 
-            # 检查条件
-            conditions = json.loads(ach["unlock_conditions"])
-            all_met = True
-
-            for attr, requirement in conditions.items():
-                char_value = character.get(attr, 0)
-
-                if ">=" in requirement:
-                    threshold = int(requirement.replace(">=", ""))
-                    if char_value < threshold:
-                        all_met = False
-                        break
-                elif "<=" in requirement:
-                    threshold = int(requirement.replace("<=", ""))
-                    if char_value > threshold:
-                        all_met = False
-                        break
+            all_met = ach["achievement_id"] in matched
 
             if all_met:
                 # 解锁成就
-                await database_api.db_save(
+                await UnitOfWork.save(
                     DTUserAchievement,
                     data={
                         "user_id": user_id,
@@ -7,10 +7,11 @@ import time
 import json
 from typing import Dict, Tuple, Optional
 
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
 from ...core.models import DTMemory
+from ...core.unit_of_work import UnitOfWork
+from ...core.db_executor import DBExecutor
 
 logger = get_logger("dt_item_enhanced")
 
@@ -168,7 +169,7 @@ class ItemPsychologySystem:
         # 保存记忆
         memory_id = f"item_{item_id}_{int(time.time())}"
 
-        await database_api.db_save(
+        await DBExecutor.db_save(
             DTMemory,
             data={
                 "memory_id": memory_id,
@@ -205,7 +206,7 @@ class ItemSystem:
         from ...core.models import DTUserInventory
 
         # 检查是否已有该道具
-        existing = await database_api.db_get(
+        existing = await DBExecutor.db_get(
             DTUserInventory,
             filters={"user_id": user_id, "chat_id": chat_id, "item_id": item_id},
             single_result=True
@@ -214,7 +215,7 @@ class ItemSystem:
         if existing:
             # 增加数量
             existing["quantity"] = existing.get("quantity", 0) + quantity
-            await database_api.db_save(
+            await UnitOfWork.save(
                 DTUserInventory,
                 data=existing,
                 key_field="user_id",
@@ -222,7 +223,7 @@ class ItemSystem:
             )
         else:
             # 新增道具
-            await database_api.db_save(
+            await UnitOfWork.save(
                 DTUserInventory,
                 data={
                     "user_id": user_id,
@@ -202,7 +202,8 @@ class OutfitSystem:
     @staticmethod
     async def equip_outfit(user_id: str, chat_id: str, outfit_id: str, character: Dict):
         """穿上服装（带心理反应）"""
-        from ...core.models import DTUserOutfit, DTOutfit
+        from ...core.models import DTUserOutfit
+        from ...core.catalogue_cache import CatalogueCache
 
         # 检查是否已解锁
         owned = await database_api.db_get(
@@ -215,11 +216,7 @@ class OutfitSystem:
             return False, None, None
 
         # 获取服装信息
-        outfit = await database_api.db_get(
-            DTOutfit,
-            filters={"outfit_id": outfit_id},
-            single_result=True
-        )
+        outfit = await CatalogueCache.get("outfits", outfit_id)
 
         if not outfit:
             return False, None, None
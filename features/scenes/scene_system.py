@@ -10,7 +10,9 @@ from typing import Optional, Dict, List
 from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTScene, DTVisitedScene
+from ...core.models import DTVisitedScene
+from ...core.catalogue_cache import CatalogueCache
+from ...core.catalogue_seeder import CatalogueSeeder
 
 logger = get_logger("dt_scene_system")
 
@@ -89,65 +91,38 @@ class SceneSystem:
     ]
 
     @staticmethod
-    async def initialize_scenes():
-        """初始化默认场景"""
-        for scene_data in SceneSystem.DEFAULT_SCENES:
-            existing = await database_api.db_get(
-                DTScene,
-                filters={"scene_id": scene_data["scene_id"]},
-                single_result=True
-            )
-
-            if not existing:
-                await database_api.db_save(
-                    DTScene,
-                    data={
-                        "scene_id": scene_data["scene_id"],
-                        "scene_name": scene_data["scene_name"],
-                        "scene_category": scene_data["category"],
-                        "description": scene_data["description"],
-                        "unlock_condition": json.dumps(scene_data["unlock_condition"]),
-                        "available_actions": json.dumps(scene_data["available_actions"]),
-                        "attribute_modifiers": json.dumps(scene_data["attribute_modifiers"]),
-                        "special_effects": json.dumps(scene_data["special_effects"]),
-                        "is_unlocked_by_default": scene_data["is_default"]
-                    },
-                    key_field="scene_id",
-                    key_value=scene_data["scene_id"]
-                )
+    async def initialize_scenes() -> Dict:
+        """初始化默认场景（内容未变化时跳过，变化时一个事务批量写入）"""
+        rows = [
+            {
+                "scene_id": scene_data["scene_id"],
+                "scene_name": scene_data["scene_name"],
+                "scene_category": scene_data["category"],
+                "description": scene_data["description"],
+                "unlock_condition": json.dumps(scene_data["unlock_condition"]),
+                "available_actions": json.dumps(scene_data["available_actions"]),
+                "attribute_modifiers": json.dumps(scene_data["attribute_modifiers"]),
+                "special_effects": json.dumps(scene_data["special_effects"]),
+                "is_unlocked_by_default": scene_data["is_default"]
+            }
+            for scene_data in SceneSystem.DEFAULT_SCENES
+        ]
+
+        report = await CatalogueSeeder.seed("scenes", rows)
 
         logger.info("场景系统初始化完成")
+        return report
 
     @staticmethod
     async def get_unlocked_scenes(user_id: str, chat_id: str, character: Dict) -> List[Dict]:
         """获取已解锁的场景列表"""
-        all_scenes = await database_api.db_get(DTScene, filters={})
+        all_scenes = await CatalogueCache.get_all("scenes")
+        unlock_rules = await CatalogueCache.get_rules("scenes")
+        matched = set(unlock_rules.matching(character))
         unlocked = []
 
         for scene in all_scenes:
-            if scene["is_unlocked_by_default"]:
-                unlocked.append(scene)
-                continue
-
-            # 检查解锁条件
-            unlock_cond = json.loads(scene["unlock_condition"])
-            meets_requirements = True
-
-            for attr, required in unlock_cond.items():
-                char_value = character.get(attr, 0)
-
-                if isinstance(required, str) and required.startswith("<"):
-                    threshold = int(required[1:])
-                    if char_value >= threshold:
-                        meets_requirements = False
-                        break
-                else:
-                    threshold = int(required)
-                    if char_value < threshold:
-                        meets_requirements = False
-                        break
-
-            if meets_requirements:
+            if scene["is_unlocked_by_default"] or scene["scene_id"] in matched:
                 unlocked.append(scene)
 
         return unlocked
@@ -156,11 +131,7 @@ class SceneSystem:
     async def visit_scene(user_id: str, chat_id: str, scene_id: str) -> Optional[Dict]:
         """访问场景"""
         # 获取场景信息
-        scene = await database_api.db_get(
-            DTScene,
-            filters={"scene_id": scene_id},
-            single_result=True
-        )
+        scene = await CatalogueCache.get("scenes", scene_id)
 
         if not scene:
             return None
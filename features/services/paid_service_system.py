@@ -5,10 +5,9 @@
 import random
 from typing import Tuple, Dict
 
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
 from ...systems.attributes.attribute_system import AttributeSystem
 
 logger = get_logger("dt_paid_service")
@@ -120,11 +119,7 @@ class PaidServiceSystem:
         service_config = PaidServiceSystem.PAPA_KATSU_SERVICES[service_type]
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             return False, "角色不存在", {}
@@ -173,12 +168,7 @@ class PaidServiceSystem:
             char["trust"] = AttributeSystem.clamp(char.get("trust", 0) - 20)
             char["shame"] = AttributeSystem.clamp(char.get("shame", 0) + 50)
 
-            await database_api.db_save(
-                DTCharacter,
-                data=char,
-                key_field="user_id",
-                key_value=user_id
-            )
+            await CharacterCache.save(user_id, chat_id, char)
 
             arrest_message = random.choice(service_config["arrest_messages"])
 
@@ -208,12 +198,7 @@ class PaidServiceSystem:
         for attr, change in effects.items():
             char[attr] = AttributeSystem.clamp(char.get(attr, 0) + change)
 
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # 构建效果文本
         effect_parts = []
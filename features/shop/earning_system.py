@@ -6,10 +6,9 @@ import random
 import time
 from typing import Tuple, Dict
 
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter
+from ...core.character_cache import CharacterCache
 
 logger = get_logger("dt_earning_system")
 
@@ -158,11 +157,7 @@ class EarningSystem:
         work_config = EarningSystem.WORK_TYPES[work_type]
 
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             return False, "角色不存在", 0
@@ -224,12 +219,7 @@ class EarningSystem:
             for attr, change in side_effects.items():
                 char[attr] = AttributeSystem.clamp(char.get(attr, 0) + change)
 
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # 记录打工时间
         EarningSystem._last_work_time[work_key] = current_time
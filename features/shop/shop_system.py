@@ -2,13 +2,14 @@
 商店系统 - 道具和服装购买
 """
 
-import json
 from typing import Tuple, List, Dict, Optional
 
 from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter, DTItem, DTOutfit, DTUserInventory, DTUserOutfit
+from ...core.models import DTUserInventory, DTUserOutfit
+from ...core.character_cache import CharacterCache
+from ...core.catalogue_cache import CatalogueCache
 from ..items.item_system import ItemSystem
 from ..outfits.outfit_system import OutfitSystem
 
@@ -22,23 +23,19 @@ class ShopSystem:
     async def get_available_items(user_id: str, chat_id: str) -> List[Dict]:
         """获取可购买的道具列表"""
         # 获取角色数据
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             return []
 
-        # 获取所有道具
-        all_items = await database_api.db_get(DTItem)
-        available_items = []
+        # 解锁条件已在目录缓存中编译，一次取值判定所有道具
+        unlock_rules = await CatalogueCache.get_rules("items")
+        unlocked_ids = unlock_rules.matching(char)
 
-        for item in all_items:
-            # 检查解锁条件
-            unlock_condition = json.loads(item.get("unlock_condition", "{}"))
-            if ShopSystem._check_unlock_condition(char, unlock_condition):
+        available_items = []
+        for item_id in unlocked_ids:
+            item = await CatalogueCache.get("items", item_id)
+            if item:
                 available_items.append(item)
 
         return available_items
@@ -47,89 +44,52 @@ class ShopSystem:
     async def get_available_outfits(user_id: str, chat_id: str) -> List[Dict]:
         """获取可购买的服装列表"""
         # 获取角色数据
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             return []
 
-        # 获取所有服装
-        all_outfits = await database_api.db_get(DTOutfit)
+        # 一次查询取出已拥有的服装
+        owned_outfits = await database_api.db_get(
+            DTUserOutfit,
+            filters={"user_id": user_id, "chat_id": chat_id}
+        )
+        owned_ids = {o["outfit_id"] for o in (owned_outfits or [])}
+
+        unlock_rules = await CatalogueCache.get_rules("outfits")
         available_outfits = []
 
-        for outfit in all_outfits:
+        for outfit_id in unlock_rules.matching(char):
+            if outfit_id in owned_ids:
+                continue  # 已拥有，不显示
+
+            outfit = await CatalogueCache.get("outfits", outfit_id)
             # 跳过默认免费服装
-            if outfit.get("is_unlocked_by_default", False):
+            if not outfit or outfit.get("is_unlocked_by_default", False):
                 continue
 
-            # 检查是否已拥有
-            owned = await database_api.db_get(
-                DTUserOutfit,
-                filters={"user_id": user_id, "chat_id": chat_id, "outfit_id": outfit["outfit_id"]},
-                single_result=True
-            )
-
-            if owned:
-                continue  # 已拥有，不显示
-
-            # 检查解锁条件
-            unlock_condition = json.loads(outfit.get("unlock_condition", "{}"))
-            if ShopSystem._check_unlock_condition(char, unlock_condition):
-                available_outfits.append(outfit)
+            available_outfits.append(outfit)
 
         return available_outfits
 
-    @staticmethod
-    def _check_unlock_condition(character: Dict, condition: Dict) -> bool:
-        """检查解锁条件"""
-        if not condition:
-            return True  # 无条件限制
-
-        for attr, value in condition.items():
-            char_value = character.get(attr, 0)
-
-            if isinstance(value, str) and value.startswith("<"):
-                # 小于条件
-                threshold = int(value[1:])
-                if char_value >= threshold:
-                    return False
-            else:
-                # 大于等于条件
-                threshold = int(value)
-                if char_value < threshold:
-                    return False
-
-        return True
-
     @staticmethod
     async def buy_item(user_id: str, chat_id: str, item_id: str, quantity: int = 1) -> Tuple[bool, str]:
         """购买道具"""
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             return False, "角色不存在"
 
         # 获取道具信息
-        item = await database_api.db_get(
-            DTItem,
-            filters={"item_id": item_id},
-            single_result=True
-        )
+        item = await CatalogueCache.get("items", item_id)
 
         if not item:
             return False, "道具不存在"
 
         # 检查解锁条件
-        unlock_condition = json.loads(item.get("unlock_condition", "{}"))
-        if not ShopSystem._check_unlock_condition(char, unlock_condition):
+        unlock_rules = await CatalogueCache.get_rules("items")
+        if not unlock_rules.check(item_id, char):
             return False, "未满足解锁条件"
 
         # 计算总价
@@ -142,12 +102,7 @@ class ShopSystem:
         # 扣除金币
         char["coins"] = char["coins"] - total_price
 
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # 添加道具到背包
         await ItemSystem.add_item(user_id, chat_id, item_id, quantity)
@@ -159,21 +114,13 @@ class ShopSystem:
     async def buy_outfit(user_id: str, chat_id: str, outfit_id: str) -> Tuple[bool, str]:
         """购买服装"""
         # 获取角色
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             return False, "角色不存在"
 
         # 获取服装信息
-        outfit = await database_api.db_get(
-            DTOutfit,
-            filters={"outfit_id": outfit_id},
-            single_result=True
-        )
+        outfit = await CatalogueCache.get("outfits", outfit_id)
 
         if not outfit:
             return False, "服装不存在"
@@ -189,8 +136,8 @@ class ShopSystem:
             return False, "你已经拥有这件服装了"
 
         # 检查解锁条件
-        unlock_condition = json.loads(outfit.get("unlock_condition", "{}"))
-        if not ShopSystem._check_unlock_condition(char, unlock_condition):
+        unlock_rules = await CatalogueCache.get_rules("outfits")
+        if not unlock_rules.check(outfit_id, char):
             return False, "未满足解锁条件"
 
         # 获取价格
@@ -203,12 +150,7 @@ class ShopSystem:
         # 扣除金币
         char["coins"] = char["coins"] - price
 
-        await database_api.db_save(
-            DTCharacter,
-            data=char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        await CharacterCache.save(user_id, chat_id, char)
 
         # 解锁服装
         await OutfitSystem.unlock_outfit(user_id, chat_id, outfit_id)
@@ -37,6 +37,12 @@ class DesireTheatrePlugin(BasePlugin):
     config_section_descriptions = {
         "plugin": "插件配置",
         "custom_prompts": "自定义提示词配置",
+        "retention": "数据保留与压缩配置",
+        "cooldown": "动作冷却存储配置",
+        "render": "图片渲染配置",
+        "pregeneration": "事件预生成配置",
+        "event_content": "事件生成内容缓存配置",
+        "llm": "LLM调用配置",
     }
 
     config_schema = {
@@ -46,6 +52,7 @@ class DesireTheatrePlugin(BasePlugin):
             "default_personality": ConfigField(
                 type=str, default="tsundere", description="默认人格类型(tsundere/innocent/seductive/shy/cold)"
             ),
+            "startup_budget_ms": ConfigField(type=int, default=500, description="冷启动耗时预算(毫秒)"),
         },
         "custom_prompts": {
             "enabled": ConfigField(type=bool, default=False, description="是否启用自定义提示词"),
@@ -53,15 +60,131 @@ class DesireTheatrePlugin(BasePlugin):
             "extra_response_requirements": ConfigField(type=str, default="", description="额外的回复要求"),
             "extra_format_requirements": ConfigField(type=str, default="", description="额外的格式要求"),
             "full_custom_template": ConfigField(type=str, default="", description="完全自定义的提示词模板"),
-        }
+        },
+        "retention": {
+            "enabled": ConfigField(type=bool, default=True, description="是否启用后台数据保留任务"),
+            "interval_hours": ConfigField(type=int, default=6, description="执行间隔(小时)"),
+            "memory_ttl_base_days": ConfigField(
+                type=int, default=3, description="记忆保留基准天数(实际天数=基准/衰减率)"
+            ),
+            "interaction_rollup_days": ConfigField(
+                type=int, default=7, description="超过该天数的互动记录压缩为日汇总"
+            ),
+            "keep_recent_interactions": ConfigField(type=int, default=20, description="每个角色保留的最近互动数"),
+            "triggered_consequence_days": ConfigField(type=int, default=7, description="已触发延迟后果的保留天数"),
+            "archive_enabled": ConfigField(type=bool, default=True, description="删除前是否归档到压缩文件"),
+        },
+        "cooldown": {
+            "backend": ConfigField(
+                type=str, default="memory", description="冷却存储后端(memory/sqlite/shared)"
+            ),
+            "shared_name": ConfigField(type=str, default="dt_cooldowns", description="shared 后端的共享内存名称"),
+            "shared_slots": ConfigField(type=int, default=65536, description="shared 后端的槽位数"),
+        },
+        "render": {
+            "workers": ConfigField(type=int, default=2, description="渲染线程数"),
+            "max_queue": ConfigField(type=int, default=8, description="排队+执行中的渲染任务上限，超出时退回文本输出"),
+            "timeout": ConfigField(type=float, default=15.0, description="单个渲染任务的最长等待时间(秒)"),
+        },
+        "pregeneration": {
+            "enabled": ConfigField(type=bool, default=True, description="是否在角色空闲时预生成动态事件和困境"),
+            "interval_seconds": ConfigField(type=int, default=30, description="扫描间隔(秒)"),
+            "idle_seconds": ConfigField(type=int, default=20, description="角色空闲多久后才为其预生成(秒)"),
+            "max_per_round": ConfigField(type=int, default=4, description="每轮最多发起的LLM生成次数"),
+            "attribute_tolerance": ConfigField(
+                type=int, default=8, description="属性差值不超过该值时仍使用预生成内容"
+            ),
+            "slot_ttl_minutes": ConfigField(type=int, default=30, description="预生成内容有效期(分钟)"),
+        },
+        "event_content": {
+            "cache_enabled": ConfigField(type=bool, default=True, description="同一玩家同一游戏日内角色状态处于同一档位时复用已生成的事件/困境内容"),
+            "variants_per_key": ConfigField(type=int, default=3, description="每个档位保留的内容版本数"),
+            "max_uses": ConfigField(type=int, default=3, description="每个版本最多使用次数，用满后重新生成"),
+            "ttl_minutes": ConfigField(type=int, default=180, description="缓存有效期(分钟)"),
+            "max_keys": ConfigField(type=int, default=256, description="最多缓存的档位数"),
+        },
+        "llm": {
+            "reply_timeout": ConfigField(type=float, default=30.0, description="角色回复的总时限(秒)，超时发送兜底回复"),
+            "reply_concurrency": ConfigField(type=int, default=4, description="每类角色回复同时在途的请求数"),
+            "generation_timeout": ConfigField(type=float, default=60.0, description="事件/困境生成的总时限(秒)"),
+            "generation_concurrency": ConfigField(type=int, default=2, description="每类事件/困境生成同时在途的请求数"),
+            "retries": ConfigField(type=int, default=1, description="失败后的重试次数"),
+            "hedge_percentile": ConfigField(
+                type=float, default=0.95, description="角色回复超过该延迟分位数仍未返回时发送对冲请求(0为关闭)"
+            ),
+            "stream_replies": ConfigField(
+                type=bool, default=True, description="模型支持流式输出时，动作和聊天回复边生成边按句发送"
+            ),
+        },
     }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        from .utils.startup_profile import StartupProfile
+        StartupProfile.configure(budget_ms=self.get_config("plugin.startup_budget_ms", 500))
+
         # 初始化数据库
-        from .core.models import init_dt_database
-        init_dt_database()
+        with StartupProfile.timed("数据库"):
+            from .core.models import init_dt_database
+            init_dt_database()
+
+        # 进程退出时写回角色缓存中的脏数据
+        import atexit
+        from .core.character_cache import CharacterCache
+        atexit.register(CharacterCache.flush_all_sync)
+
+        # 加载延迟后果调度堆
+        with StartupProfile.timed("延迟后果调度堆"):
+            from .systems.mechanics.consequence_scheduler import ConsequenceScheduler
+            ConsequenceScheduler.load()
+
+        # 加载静态目录缓存（道具/服装/场景/成就）
+        with StartupProfile.timed("目录缓存"):
+            from .core.catalogue_cache import CatalogueCache
+            CatalogueCache.load()
+
+        # 配置冷却存储后端
+        with StartupProfile.timed("冷却存储"):
+            self._configure_cooldown()
+
+        # 配置图片渲染线程池
+        from .utils.render_service import RenderService
+        RenderService.configure(
+            workers=self.get_config("render.workers", 2),
+            max_queue=self.get_config("render.max_queue", 8),
+            timeout=self.get_config("render.timeout", 15.0),
+        )
+
+        # 配置 LLM 网关
+        from .utils.llm_gateway import LLMGateway
+        LLMGateway.configure(
+            reply={
+                "timeout": self.get_config("llm.reply_timeout", 30.0),
+                "concurrency": self.get_config("llm.reply_concurrency", 4),
+            },
+            generation={
+                "timeout": self.get_config("llm.generation_timeout", 60.0),
+                "concurrency": self.get_config("llm.generation_concurrency", 2),
+            },
+            retries=self.get_config("llm.retries", 1),
+            hedge_percentile=self.get_config("llm.hedge_percentile", 0.95),
+        )
+
+        from .utils.stream_reply import StreamReply
+        StreamReply.configure(enabled=self.get_config("llm.stream_replies", True))
+
+        from .systems.events.event_content import EventContent
+        EventContent.configure(**{
+            key: self.get_config(f"event_content.{key}", default)
+            for key, default in EventContent.CONFIG.items()
+        })
+
+        # 启动数据保留后台任务
+        self._start_retention()
+
+        # 启动事件预生成后台任务
+        self._start_pregeneration()
 
         # 初始化扩展系统（异步）
         self._init_extensions_async()
@@ -77,14 +200,35 @@ class DesireTheatrePlugin(BasePlugin):
             from .features.items.item_system import ItemSystem
             from .features.achievements.achievement_system import AchievementSystem
             from .features.scenes.scene_system import SceneSystem
-            from .features.games.game_system import GameSystem
+            from .utils.startup_profile import StartupProfile
 
             await OutfitSystem.initialize_outfits()
             await ItemSystem.initialize_items()
-            await AchievementSystem.initialize_achievements()
-            await SceneSystem.initialize_scenes()
+            for report in (
+                await AchievementSystem.initialize_achievements(),
+                await SceneSystem.initialize_scenes(),
+            ):
+                StartupProfile.record(
+                    f"种子数据/{report['catalogue']}",
+                    report["elapsed_ms"],
+                    "未变化，跳过" if report["skipped"] else f"写入{report['rows']}行",
+                )
             logger.info("扩展系统初始化完成")
 
+            # 在后台线程预渲染静态帮助图片
+            try:
+                from .utils.help_image_generator import HelpImageGenerator
+                with StartupProfile.timed("帮助图片预渲染"):
+                    await asyncio.get_running_loop().run_in_executor(None, HelpImageGenerator.prerender)
+            except Exception as e:
+                logger.warning(f"帮助图片预渲染失败: {e}")
+
+            # 输出启动耗时报告
+            logger.info(StartupProfile.format_report())
+            warning = StartupProfile.check_budget()
+            if warning:
+                logger.warning(warning)
+
         # 创建任务
         try:
             loop = asyncio.get_event_loop()
@@ -95,135 +239,53 @@ class DesireTheatrePlugin(BasePlugin):
         except Exception as e:
             logger.error(f"扩展系统初始化失败: {e}", exc_info=True)
 
-    def get_plugin_components(self) -> List[Tuple[ComponentInfo, Type]]:
-        # Actions commands
-        from .commands.actions.action_commands import (
-            DTActionCommand,
-            DTStartGameCommand,
-            DTRestartCommand,
-            DTQuickInteractCommand,
-            DTRecommendCommand,
-        )
-        from .commands.actions.chat_command import DTChatCommand
-
-        # Basic commands
-        from .commands.basic.status_commands import (
-            DTStatusCommand,
-            DTQuickStatusCommand,
-            DTHelpCommand,
-            DTGuideCommand,
-            DTExportCommand,
-            DTImportCommand,
-        )
-        from .commands.basic.quick_reference import DTQuickReferenceCommand
-        from .commands.basic.time_commands import DTNextDayCommand
+    def _configure_cooldown(self):
+        """按配置选择冷却存储后端"""
+        from .systems.time.cooldown_manager import CooldownManager
 
-        # Character commands
-        from .commands.character.personality_commands import (
-            DTPersonalityStatusCommand,
-            DTDilemmaChoiceCommand,
-        )
-        from .commands.character.unified_choice_command import DTUnifiedChoiceCommand
-
-        # Career commands
-        from .commands.career.work_commands import DTWorkCommand
-        from .commands.career.v2_system_commands import (
-            DTSeasonCommand,
-            DTCareerCommand,
-            DTPromotionCommand,
-        )
+        try:
+            CooldownManager.configure(
+                backend=self.get_config("cooldown.backend", "memory"),
+                shared_name=self.get_config("cooldown.shared_name", "dt_cooldowns"),
+                shared_slots=self.get_config("cooldown.shared_slots", 65536),
+            )
+        except Exception as e:
+            logger.error(f"冷却存储后端初始化失败，使用进程内存储: {e}", exc_info=True)
 
-        # Shop commands
-        from .commands.shop.shop_commands import (
-            DTShopCommand,
-            DTBuyItemCommand,
-            DTBuyOutfitCommand,
-        )
-        from .commands.shop.item_commands import (
-            DTInventoryCommand,
-            DTUseItemCommand,
-        )
-        from .commands.shop.outfit_commands import (
-            DTOutfitListCommand,
-            DTWearOutfitCommand,
-        )
+    def _start_retention(self):
+        """按配置启动数据保留后台任务"""
+        from .systems.memory.retention_engine import RetentionEngine
 
-        # Social commands
-        from .commands.social.papa_katsu_commands import DTPapaKatsuCommand
+        RetentionEngine.configure(**{
+            key: self.get_config(f"retention.{key}", default)
+            for key, default in RetentionEngine.CONFIG.items()
+        })
 
-        # Endings commands
-        from .commands.endings.ending_commands import (
-            DTEndingCommand,
-            DTConfirmEndingCommand,
-            DTEndingPreviewCommand,
-            DTEndingListCommand,
-        )
+        try:
+            RetentionEngine.start_background()
+        except Exception as e:
+            logger.error(f"数据保留任务启动失败: {e}", exc_info=True)
 
-        # Extensions commands
-        from .commands.extensions.extension_commands import (
-            DTSceneListCommand,
-            DTGoSceneCommand,
-            DTTruthCommand,
-            DTDareCommand,
-            DTDiceCommand,
-        )
+    def _start_pregeneration(self):
+        """按配置启动事件预生成后台任务"""
+        from .systems.events.event_pregenerator import EventPregenerator
+
+        EventPregenerator.configure(**{
+            key: self.get_config(f"pregeneration.{key}", default)
+            for key, default in EventPregenerator.CONFIG.items()
+        })
+
+        try:
+            EventPregenerator.start_background()
+        except Exception as e:
+            logger.error(f"事件预生成任务启动失败: {e}", exc_info=True)
+
+    def get_plugin_components(self) -> List[Tuple[ComponentInfo, Type]]:
+        # 只注册命令元数据，命令模块在首次分发时才导入
+        from .commands.command_registry import LazyCommandRegistry
+        from .utils.startup_profile import StartupProfile
 
-        components = [
-            # 核心命令（具体命令优先）
-            (DTStartGameCommand.get_command_info(), DTStartGameCommand),
-            (DTRestartCommand.get_command_info(), DTRestartCommand),
-            (DTStatusCommand.get_command_info(), DTStatusCommand),
-            (DTQuickStatusCommand.get_command_info(), DTQuickStatusCommand),
-            (DTHelpCommand.get_command_info(), DTHelpCommand),
-            (DTGuideCommand.get_command_info(), DTGuideCommand),
-            (DTQuickReferenceCommand.get_command_info(), DTQuickReferenceCommand),
-            (DTExportCommand.get_command_info(), DTExportCommand),
-            (DTImportCommand.get_command_info(), DTImportCommand),
-            (DTChatCommand.get_command_info(), DTChatCommand),
-            (DTQuickInteractCommand.get_command_info(), DTQuickInteractCommand),
-            (DTRecommendCommand.get_command_info(), DTRecommendCommand),
-
-            # 时间推进命令
-            (DTNextDayCommand.get_command_info(), DTNextDayCommand),
-
-            # v2.0 新增系统命令
-            (DTSeasonCommand.get_command_info(), DTSeasonCommand),
-            (DTCareerCommand.get_command_info(), DTCareerCommand),
-            (DTPromotionCommand.get_command_info(), DTPromotionCommand),
-
-            # 统一选择命令（智能处理事件选择和人格选择）
-            (DTUnifiedChoiceCommand.get_command_info(), DTUnifiedChoiceCommand),
-
-            # 结局系统命令
-            (DTEndingCommand.get_command_info(), DTEndingCommand),
-            (DTConfirmEndingCommand.get_command_info(), DTConfirmEndingCommand),
-            (DTEndingPreviewCommand.get_command_info(), DTEndingPreviewCommand),
-            (DTEndingListCommand.get_command_info(), DTEndingListCommand),
-
-            # 双重人格系统命令
-            (DTPersonalityStatusCommand.get_command_info(), DTPersonalityStatusCommand),
-            (DTDilemmaChoiceCommand.get_command_info(), DTDilemmaChoiceCommand),
-
-            # 扩展命令
-            (DTOutfitListCommand.get_command_info(), DTOutfitListCommand),
-            (DTWearOutfitCommand.get_command_info(), DTWearOutfitCommand),
-            (DTInventoryCommand.get_command_info(), DTInventoryCommand),
-            (DTUseItemCommand.get_command_info(), DTUseItemCommand),
-            (DTSceneListCommand.get_command_info(), DTSceneListCommand),
-            (DTGoSceneCommand.get_command_info(), DTGoSceneCommand),
-            (DTTruthCommand.get_command_info(), DTTruthCommand),
-            (DTDareCommand.get_command_info(), DTDareCommand),
-            (DTDiceCommand.get_command_info(), DTDiceCommand),
-
-            # 商店、赚钱和付费服务系统
-            (DTShopCommand.get_command_info(), DTShopCommand),
-            (DTBuyItemCommand.get_command_info(), DTBuyItemCommand),
-            (DTBuyOutfitCommand.get_command_info(), DTBuyOutfitCommand),
-            (DTWorkCommand.get_command_info(), DTWorkCommand),
-            (DTPapaKatsuCommand.get_command_info(), DTPapaKatsuCommand),
-
-            # 通配动作命令（放在最后作为兜底）
-            (DTActionCommand.get_command_info(), DTActionCommand),
-        ]
+        with StartupProfile.timed("命令注册"):
+            components = LazyCommandRegistry.get_components()
 
         return components
@@ -422,15 +422,15 @@ class ActionGrowthSystem:
 
         返回: (是否可用, 动作配置, 阶段名称)
         """
-        if action_key not in ActionGrowthSystem.CORE_ACTIONS:
-            return False, {}, ""
+        from .action_registry import ActionRegistry
+        from ..time.daily_limit_system import DailyInteractionSystem
 
         # 获取关系阶段
-        from ..time.daily_limit_system import DailyInteractionSystem
         stage = DailyInteractionSystem.get_relationship_stage(character)
 
-        action_def = ActionGrowthSystem.CORE_ACTIONS[action_key]
-        stage_config = action_def.get(stage, {})
+        stage_config = ActionRegistry.get_stage_config(action_key, stage)
+        if stage_config is None:
+            return False, {}, ""
 
         # 检查该阶段是否被阻止
         if stage_config.get("blocked", False):
@@ -441,35 +441,24 @@ class ActionGrowthSystem:
     @staticmethod
     def get_commands_for_action(action_key: str) -> list:
         """获取动作的所有命令别名"""
-        if action_key not in ActionGrowthSystem.CORE_ACTIONS:
+        from .action_registry import ActionRegistry
+
+        action_def = ActionRegistry.get_action(action_key)
+        if action_def is None:
             return []
-        return ActionGrowthSystem.CORE_ACTIONS[action_key].get("command", [])
+        return action_def.get("command", [])
 
     @staticmethod
     def find_action_by_command(command: str) -> str:
         """根据命令找到对应的动作key"""
-        for action_key, action_def in ActionGrowthSystem.CORE_ACTIONS.items():
-            if command in action_def.get("command", []):
-                return action_key
-        return None
+        from .action_registry import ActionRegistry
+        return ActionRegistry.find_action(command)
 
     @staticmethod
     def get_all_available_actions(character: Dict) -> list:
         """获取当前阶段所有可用的动作"""
+        from .action_registry import ActionRegistry
         from ..time.daily_limit_system import DailyInteractionSystem
-        stage = DailyInteractionSystem.get_relationship_stage(character)
 
-        available = []
-        for action_key, action_def in ActionGrowthSystem.CORE_ACTIONS.items():
-            stage_config = action_def.get(stage, {})
-            if not stage_config.get("blocked", False):
-                commands = action_def.get("command", [])
-                if commands:
-                    available.append({
-                        "key": action_key,
-                        "command": commands[0],  # 使用第一个命令作为主命令
-                        "type": action_def.get("type", "unknown"),
-                        "intensity": stage_config.get("intensity", 5)
-                    })
-
-        return sorted(available, key=lambda x: x["intensity"])
+        stage = DailyInteractionSystem.get_relationship_stage(character)
+        return ActionRegistry.get_available_actions(stage)
@@ -8,14 +8,21 @@ import random
 import os
 from typing import Dict, Tuple, Optional, List
 
-from src.plugin_system.apis import database_api, llm_api, send_api
+from src.plugin_system.apis import send_api
 from src.common.logger import get_logger
 
-from ...core.models import DTCharacter, DTEvent
+from ...core.models import DTEvent
+from ...core.character_cache import CharacterCache
+from ...core.catalogue_cache import CatalogueCache
+from ...core.unit_of_work import UnitOfWork
+from ...core.user_lock import UserLockManager
 from ..attributes.attribute_system import AttributeSystem
 from ..personality.personality_system import PersonalitySystem
 from ...utils.prompt_builder import PromptBuilder
+from ...utils.llm_gateway import LLMGateway
+from ...utils.stream_reply import StreamReply
 from .action_growth_system import ActionGrowthSystem
+from .action_registry import ActionRegistry
 
 logger = get_logger("dt_action_handler")
 
@@ -34,7 +41,94 @@ class ActionHandler:
         """
         执行动作
         返回: (是否成功, 结果消息, 是否拦截后续消息)
+
+        角色数据在整个动作流程中只读取一次，中途的修改只写入缓存；
+        角色、事件、记忆、物品、成就等写入在工作单元中登记，
+        命令结束时用一个事务统一提交，出错或回复生成失败时整体回滚。
+        同一用户的动作按顺序串行执行，重复的相同动作与正在进行的合并
         """
+        # actions.json 变化时重建动作注册表
+        ActionRegistry.reload_if_changed()
+
+        status, result = await UserLockManager.run(
+            user_id, chat_id, f"action:{action_name}:{action_params}",
+            ActionHandler._execute_in_unit_of_work,
+            action_name, action_params, user_id, chat_id, message_obj
+        )
+
+        if status == UserLockManager.REJECTED:
+            await send_api.text_to_stream(
+                text="⏳ 你的动作太频繁了，请等上一个动作完成后再试",
+                stream_id=message_obj.chat_stream.stream_id,
+                storage_message=False
+            )
+            return False, "请求过于频繁", True
+
+        return result
+
+    @staticmethod
+    async def _execute_in_unit_of_work(
+        action_name: str,
+        action_params: str,
+        user_id: str,
+        chat_id: str,
+        message_obj
+    ) -> Tuple[bool, str, bool]:
+        """在工作单元中执行动作，结束时统一提交"""
+        await ActionHandler._trigger_due_consequences(user_id, chat_id, message_obj)
+
+        async with UnitOfWork.begin():
+            result = await ActionHandler._execute_action(
+                action_name, action_params, user_id, chat_id, message_obj
+            )
+            await CharacterCache.flush(user_id, chat_id)
+            return result
+
+    @staticmethod
+    async def _trigger_due_consequences(user_id: str, chat_id: str, message_obj):
+        """
+        认领并结算到期的延迟后果
+        使用独立的工作单元，先于动作提交，提交成功后才发送后果消息：
+        动作随后因 LLM 失败等原因回滚时，已经展示过的后果不会重新入队再触发一次
+        """
+        from ..mechanics.delayed_consequence_system import DelayedConsequenceSystem
+
+        messages = []
+        async with UnitOfWork.begin():
+            character = await CharacterCache.get(user_id, chat_id)
+            if not character:
+                return
+
+            pending_consequences = await DelayedConsequenceSystem.check_pending_consequences(user_id, chat_id)
+            if not pending_consequences:
+                return
+
+            for consequence in pending_consequences:
+                character, consequence_message = await DelayedConsequenceSystem.trigger_consequence(
+                    user_id, chat_id, consequence, character
+                )
+                messages.append(consequence_message)
+                logger.info(f"触发延迟后果: {user_id} - {consequence['type']}")
+
+            # 后果的认领和属性变化在同一个事务中提交
+            await CharacterCache.save(user_id, chat_id, character)
+
+        for consequence_message in messages:
+            await send_api.text_to_stream(
+                text=consequence_message,
+                stream_id=message_obj.chat_stream.stream_id,
+                storage_message=True
+            )
+
+    @staticmethod
+    async def _execute_action(
+        action_name: str,
+        action_params: str,
+        user_id: str,
+        chat_id: str,
+        message_obj
+    ) -> Tuple[bool, str, bool]:
+        """执行动作的具体流程（角色写入由 execute_action 统一提交）"""
         # 1. 获取角色（需要先获取角色才能判断阶段）
         character = await ActionHandler._get_or_create_character(user_id, chat_id)
 
@@ -55,7 +149,7 @@ class ActionHandler:
             return False, block_reason, False
 
         # 2.2 构建兼容旧系统的 action_config（用于后续逻辑）
-        action_def = ActionGrowthSystem.CORE_ACTIONS[action_name]
+        action_def = ActionRegistry.get_action(action_name)
         action_config = {
             "type": action_def.get("type", "gentle"),
             "effects": stage_config.get("effects", {}),
@@ -80,12 +174,7 @@ class ActionHandler:
                 storage_message=True
             )
             # 保存可能的自动推进更新
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+            CharacterCache.put(user_id, chat_id, character)
             return False, "今日互动已用完", False
 
         # 2.6. 【新增】检查行动点
@@ -105,35 +194,7 @@ class ActionHandler:
         # 3. 应用衰减
         character = await ActionHandler._apply_decay(character)
 
-        # 3.5. 【新增】检查并触发待发生的延迟后果
-        from ..mechanics.delayed_consequence_system import DelayedConsequenceSystem
-
-        pending_consequences = await DelayedConsequenceSystem.check_pending_consequences(user_id, chat_id)
-
-        if pending_consequences:
-            for consequence in pending_consequences:
-                # 触发延迟后果
-                updated_character, consequence_message = await DelayedConsequenceSystem.trigger_consequence(
-                    user_id, chat_id, consequence, character
-                )
-                character = updated_character
-
-                # 显示后果消息
-                await send_api.text_to_stream(
-                    text=consequence_message,
-                    stream_id=message_obj.chat_stream.stream_id,
-                    storage_message=True
-                )
-
-                logger.info(f"触发延迟后果: {user_id} - {consequence['type']}")
-
-            # 保存更新后的角色状态
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+        # 3.5. 到期的延迟后果已在 _trigger_due_consequences 中单独结算
 
         # 4. 检查前置条件
         can_execute, reason = ActionHandler._check_requirements(
@@ -486,26 +547,23 @@ class ActionHandler:
             surprise_message=None  # 【移除】移除复杂的惊喜系统
         )
 
-        # 11. 使用 llm_api 直接调用回复模型生成回复
-        models = llm_api.get_available_models()
-        replyer_model = models.get("replyer")
-
-        if not replyer_model:
-            logger.error("未找到 'replyer' 模型配置")
-            await send_api.text_to_stream(
-                text="❌ 系统错误：未找到回复模型配置",
-                stream_id=message_obj.chat_stream.stream_id,
-                storage_message=True
+        # 11. 通过 LLM 网关调用回复模型生成回复（限流/超时/重试/兜底）
+        # 后端支持流式输出时边生成边按句发送，否则整段生成后与反馈合并发送
+        streamed = StreamReply.is_available()
+        if streamed:
+            success_llm, ai_response, reasoning, model_name = await StreamReply.generate_to_stream(
+                prompt=prompt,
+                request_type="desire_theatre.response",
+                stream_id=message_obj.chat_stream.stream_id
+            )
+        else:
+            success_llm, ai_response, reasoning, model_name = await LLMGateway.generate(
+                prompt=prompt,
+                request_type="desire_theatre.response"
             )
-            return False, "未找到回复模型", False
-
-        success_llm, ai_response, reasoning, model_name = await llm_api.generate_with_model(
-            prompt=prompt,
-            model_config=replyer_model,
-            request_type="desire_theatre.response"
-        )
 
-        if success_llm and ai_response:
+        fallback = LLMGateway.is_fallback(model_name)
+        if success_llm and ai_response and not fallback:
             # === 【优化】合并所有输出为一条消息 ===
             from ..personality.dual_personality_system import DualPersonalitySystem
             from ..events.post_action_events import PostActionEventSystem
@@ -513,8 +571,9 @@ class ActionHandler:
             # 收集所有输出部分
             output_parts = []
 
-            # 1. AI生成的主要回复
-            output_parts.append(ai_response)
+            # 1. AI生成的主要回复（流式模式下已逐句发送）
+            if not streamed:
+                output_parts.append(ai_response)
 
             # 2. 内心独白和身体反应
             _, inner_voice, body_reaction = DualPersonalitySystem.generate_dual_response(
@@ -546,12 +605,14 @@ class ActionHandler:
             if feedback_parts:
                 output_parts.append(f"\n〔{' '.join(feedback_parts)}〕")
 
-            # 发送合并后的主消息
-            await send_api.text_to_stream(
-                text="\n".join(output_parts),
-                stream_id=message_obj.chat_stream.stream_id,
-                storage_message=True
-            )
+            # 发送合并后的主消息（流式模式下为回复之后的收尾消息）
+            final_text = "\n".join(output_parts).strip()
+            if final_text:
+                await send_api.text_to_stream(
+                    text=final_text,
+                    stream_id=message_obj.chat_stream.stream_id,
+                    storage_message=True
+                )
 
             # === 检查并触发动作后事件 ===
             simple_mood_for_events = {
@@ -576,12 +637,21 @@ class ActionHandler:
                 updated_char, mood_change, "互动成功"
             )
         else:
-            logger.error(f"LLM生成回复失败: {ai_response}")
+            if fallback:
+                # 兜底文本只作为她的反应发出（流式模式下已发送），不计入回复历史
+                notice = "💤 本次互动没有生效，不消耗互动次数和行动点，请稍后重试"
+                text = notice if streamed else f"{ai_response}\n\n{notice}"
+            else:
+                logger.error(f"LLM生成回复失败: {ai_response}")
+                text = "❌ 生成回复失败，请稍后重试"
             await send_api.text_to_stream(
-                text="❌ 生成回复失败，请稍后重试",
+                text=text,
                 stream_id=message_obj.chat_stream.stream_id,
-                storage_message=True
+                storage_message=not fallback
             )
+            # 回复失败时放弃本次互动的所有写入，不消耗互动次数和行动点
+            UnitOfWork.current().set_rollback_only()
+            return False, "生成回复失败", False
 
         # 11.5. 【新增】消耗每日互动次数
         from ..time.daily_limit_system import DailyInteractionSystem
@@ -599,18 +669,13 @@ class ActionHandler:
         coin_reward = EarningSystem.calculate_action_reward(action_config)
         updated_char["coins"] = updated_char.get("coins", 100) + coin_reward
 
-        await database_api.db_save(
-            DTCharacter,
-            data=updated_char,
-            key_field="user_id",
-            key_value=user_id
-        )
+        CharacterCache.put(user_id, chat_id, updated_char)
 
         # 12.1. 设置冷却时间
         cooldown_seconds = action_config.get("cooldown", 0)
         if cooldown_seconds > 0:
             from ..time.cooldown_manager import CooldownManager
-            CooldownManager.set_cooldown(user_id, chat_id, action_name)
+            CooldownManager.set_cooldown(user_id, chat_id, action_name, cooldown_seconds)
 
         # 12.5. 检查进化阶段升级
         from ..relationship.evolution_system import EvolutionSystem
@@ -939,11 +1004,7 @@ class ActionHandler:
     @staticmethod
     async def _get_or_create_character(user_id: str, chat_id: str) -> Dict:
         """获取或创建角色"""
-        char = await database_api.db_get(
-            DTCharacter,
-            filters={"user_id": user_id, "chat_id": chat_id},
-            single_result=True
-        )
+        char = await CharacterCache.get(user_id, chat_id)
 
         if not char:
             # 创建新角色（默认傲娇人格）
@@ -979,12 +1040,7 @@ class ActionHandler:
                 "mood_gauge": 50,  # 初始心情值
             }
 
-            await database_api.db_save(
-                DTCharacter,
-                data=char,
-                key_field="user_id",
-                key_value=user_id
-            )
+            CharacterCache.put(user_id, chat_id, char)
 
             logger.info(f"创建新角色: {user_id}")
 
@@ -1026,12 +1082,7 @@ class ActionHandler:
         character["last_interaction"] = now
         character["interaction_count"] = character.get("interaction_count", 0) + 1
 
-        await database_api.db_save(
-            DTCharacter,
-            data=character,
-            key_field="user_id",
-            key_value=user_id
-        )
+        CharacterCache.put(user_id, chat_id, character)
 
         return is_daily_first
 
@@ -1039,8 +1090,9 @@ class ActionHandler:
     async def _record_event(user_id: str, chat_id: str, action_name: str, effects: Dict, ai_response: str = ""):
         """记录事件（用于历史记忆和统计）"""
         event_id = f"evt_{int(time.time() * 1000000)}_{random.randint(1000, 9999)}"
+        timestamp = time.time()
 
-        await database_api.db_save(
+        await UnitOfWork.save(
             DTEvent,
             data={
                 "event_id": event_id,
@@ -1048,7 +1100,7 @@ class ActionHandler:
                 "chat_id": chat_id,
                 "event_type": "interaction",
                 "event_name": action_name,
-                "timestamp": time.time(),
+                "timestamp": timestamp,
                 "event_data": json.dumps({
                     "action": action_name,
                     "ai_response": ai_response
@@ -1059,6 +1111,14 @@ class ActionHandler:
             key_value=event_id
         )
 
+        # 事件提交后同步更新连击滑动窗口
+        from .combo_system import ComboSystem
+        uow = UnitOfWork.current()
+        if uow is not None:
+            uow.on_commit(lambda: ComboSystem.record_interaction(user_id, chat_id, timestamp))
+        else:
+            ComboSystem.record_interaction(user_id, chat_id, timestamp)
+
     @staticmethod
     async def _post_action_checks(message_obj, user_id: str, chat_id: str, character: Dict):
         """互动后的检查（解锁、掉落等）"""
@@ -1093,12 +1153,7 @@ class ActionHandler:
 
             # 记录触发次数
             character["personality_war_triggered"] = character.get("personality_war_triggered", 0) + 1
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+            CharacterCache.put(user_id, chat_id, character)
 
             # 注意：这里不处理玩家选择，需要通过另一个命令处理
             logger.info(f"触发人格战争事件: {user_id}")
@@ -1114,12 +1169,7 @@ class ActionHandler:
 
             # 记录崩塌时间
             character["last_mask_crack"] = time.time()
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+            CharacterCache.put(user_id, chat_id, character)
 
             logger.info(f"触发面具事件: {user_id}")
 
@@ -1146,12 +1196,7 @@ class ActionHandler:
 
             # 应用危机惩罚
             character = AttributeSystem.apply_changes(character, crisis_event['penalty'])
-            await database_api.db_save(
-                DTCharacter,
-                data=character,
-                key_field="user_id",
-                key_value=user_id
-            )
+            CharacterCache.put(user_id, chat_id, character)
 
             logger.warning(f"触发关系危机: {user_id} - {crisis_event['crisis_type']}")
 
@@ -1166,6 +1211,7 @@ class ActionHandler:
 
         # === 【新增】检查选择困境事件（完全动态生成） ===
         from ..events.choice_dilemma_system import ChoiceDilemmaSystem
+        from ..events.event_pregenerator import EventPregenerator
 
         # 【新增】尝试使用 LLM 完全动态生成困境
         # 获取最近历史用于生成上下文
@@ -1173,10 +1219,13 @@ class ActionHandler:
 
         # 30%概率触发困境
         if random.random() < 0.3:
-            dynamic_dilemma = await ChoiceDilemmaSystem.generate_dynamic_dilemma(
-                character=character,
-                history=history
-            )
+            # 优先使用空闲时预生成的困境，状态不兼容时再实时生成
+            dynamic_dilemma = EventPregenerator.take("dilemma", user_id, chat_id, character)
+            if dynamic_dilemma is None:
+                dynamic_dilemma = await ChoiceDilemmaSystem.generate_dynamic_dilemma(
+                    character=character,
+                    history=history
+                )
 
             if dynamic_dilemma:
                 # 成功生成动态困境
@@ -1186,12 +1235,7 @@ class ActionHandler:
                     "dilemma_data": dynamic_dilemma  # 完整的困境数据
                 }, ensure_ascii=False)
                 character["dilemma_triggered_at"] = time.time()
-                await database_api.db_save(
-                    DTCharacter,
-                    data=character,
-                    key_field="user_id",
-                    key_value=user_id
-                )
+                CharacterCache.put(user_id, chat_id, character)
 
                 logger.info(f"触发完全动态困境: {user_id} - {dynamic_dilemma['dilemma_name']}")
 
@@ -1245,12 +1289,7 @@ class ActionHandler:
                     # 先保存数据，再发送消息（避免时序问题）
                     character["pending_dilemma"] = dilemma_data['dilemma_id']
                     character["dilemma_triggered_at"] = time.time()
-                    await database_api.db_save(
-                        DTCharacter,
-                        data=character,
-                        key_field="user_id",
-                        key_value=user_id
-                    )
+                    CharacterCache.put(user_id, chat_id, character)
 
                     logger.info(f"触发选择困境: {user_id} - {dilemma_data['dilemma_id']}")
 
@@ -1280,29 +1319,17 @@ class ActionHandler:
         # 随机掉落道具（15%概率）
         if random.random() < 0.15:
             from ...features.items.item_system import ItemSystem
-            from ..core.models import DTItem
 
-            # 获取所有道具
-            all_items = await database_api.db_get(DTItem)
+            # 获取所有道具（目录缓存，解锁条件已预编译）
+            all_items = await CatalogueCache.get_all("items")
 
             if all_items:
                 # 根据角色属性筛选可掉落的道具
+                unlock_rules = await CatalogueCache.get_rules("items")
+                unlocked_ids = set(unlock_rules.matching(character))
                 available_drops = []
                 for item in all_items:
-                    # 检查解锁条件
-                    unlock_condition = json.loads(item.get("unlock_condition", "{}"))
-                    unlocked = True
-
-                    for attr, value in unlock_condition.items():
-                        char_value = character.get(attr, 0)
-                        if isinstance(value, str) and value.startswith("<"):
-                            if char_value >= int(value[1:]):
-                                unlocked = False
-                                break
-                        else:
-                            if char_value < int(value):
-                                unlocked = False
-                                break
+                    unlocked = item["item_id"] in unlocked_ids
 
                     if unlocked:
                         # 根据强度等级设置掉落权重（强度越低越容易掉落）
@@ -0,0 +1,209 @@
+"""
+动作注册表 - 预编译的动作查找表
+
+核心机制：
+- 导入时根据 ActionGrowthSystem.CORE_ACTIONS 构建一次
+- 命令别名 → 动作key 的哈希表，命令路由 O(1)
+- (动作key, 关系阶段) → 阶段配置的效果表
+- 每个关系阶段的可用动作列表（已按强度排序）
+- 预编译的命令正则（长命令优先），动作命令注册的是通配正则，由此解析具体动作
+- actions.json 的 "actions" 段（以命令为键）中带关系阶段配置（stranger/friend/close/lover）的条目
+  可覆盖内置动作的阶段配置或新增动作；只有扁平字段的旧条目不参与注册。文件变化时自动重建
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+from .action_growth_system import ActionGrowthSystem
+
+logger = get_logger("dt_action_registry")
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ActionRegistry:
+    """动作注册表"""
+
+    ACTIONS_FILE = os.path.join(PLUGIN_DIR, "actions.json")
+
+    # 关系阶段
+    STAGES = ("stranger", "friend", "close", "lover")
+
+    # 当前生效的动作定义 {动作key: 动作定义}
+    _actions: Dict[str, Dict] = {}
+
+    # 命令别名表 {命令: 动作key}
+    _alias_map: Dict[str, str] = {}
+
+    # 阶段效果表 {(动作key, 阶段): 阶段配置}
+    _stage_table: Dict[Tuple[str, str], Dict] = {}
+
+    # 各阶段可用动作 {阶段: [动作信息]}（按强度排序）
+    _available_by_stage: Dict[str, List[Dict]] = {}
+
+    # 命令正则
+    _pattern: str = ""
+    _regex: Optional[re.Pattern] = None
+
+    # actions.json 的修改时间（None 表示文件不存在）
+    _source_mtime: Optional[float] = None
+
+    @staticmethod
+    def build(actions: Dict[str, Dict] = None):
+        """构建所有查找表"""
+        if actions is None:
+            actions = ActionRegistry._load_actions()
+
+        alias_map: Dict[str, str] = {}
+        stage_table: Dict[Tuple[str, str], Dict] = {}
+        available_by_stage: Dict[str, List[Dict]] = {stage: [] for stage in ActionRegistry.STAGES}
+
+        for action_key, action_def in actions.items():
+            commands = action_def.get("command", [])
+            for command in commands:
+                if command in alias_map and alias_map[command] != action_key:
+                    logger.warning(f"命令别名冲突: {command} ({alias_map[command]} / {action_key})")
+                    continue
+                alias_map[command] = action_key
+
+            for stage in ActionRegistry.STAGES:
+                stage_config = action_def.get(stage, {})
+                stage_table[(action_key, stage)] = stage_config
+
+                if commands and not stage_config.get("blocked", False):
+                    available_by_stage[stage].append({
+                        "key": action_key,
+                        "command": commands[0],  # 使用第一个命令作为主命令
+                        "type": action_def.get("type", "unknown"),
+                        "intensity": stage_config.get("intensity", 5)
+                    })
+
+        for stage_actions in available_by_stage.values():
+            stage_actions.sort(key=lambda x: x["intensity"])
+
+        # 按长度降序，确保长命令优先匹配
+        all_commands = sorted(alias_map, key=len, reverse=True)
+        commands_pattern = "|".join(re.escape(cmd) for cmd in all_commands)
+        pattern = rf"^/({commands_pattern})(?:\s+(.+))?$"
+
+        ActionRegistry._actions = actions
+        ActionRegistry._alias_map = alias_map
+        ActionRegistry._stage_table = stage_table
+        ActionRegistry._available_by_stage = available_by_stage
+        ActionRegistry._pattern = pattern
+        ActionRegistry._regex = re.compile(pattern)
+
+        logger.debug(f"动作注册表构建完成: {len(actions)}个动作, {len(alias_map)}个命令")
+
+    @staticmethod
+    def _load_actions() -> Dict[str, Dict]:
+        """读取动作定义：内置 CORE_ACTIONS + actions.json 中带阶段配置的条目"""
+        actions = {key: dict(action_def) for key, action_def in ActionGrowthSystem.CORE_ACTIONS.items()}
+        ActionRegistry._source_mtime = ActionRegistry._get_mtime()
+
+        if ActionRegistry._source_mtime is None:
+            return actions
+
+        try:
+            with open(ActionRegistry.ACTIONS_FILE, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("actions", {})
+        except (OSError, ValueError) as e:
+            logger.error(f"读取 actions.json 失败，使用内置动作: {e}")
+            return actions
+
+        alias_map = {
+            command: action_key
+            for action_key, action_def in actions.items()
+            for command in action_def.get("command", [])
+        }
+
+        applied = 0
+        for command, entry in entries.items():
+            if not isinstance(entry, dict):
+                continue
+            stages = {stage: entry[stage] for stage in ActionRegistry.STAGES if isinstance(entry.get(stage), dict)}
+            if not stages:
+                continue
+
+            # 命令已属于内置动作时覆盖该动作（影响它的所有别名），否则以命令为键新增动作
+            action_key = alias_map.get(command, command)
+            if action_key not in actions:
+                # 新增动作未配置的关系阶段不可用
+                blocked = {"blocked": True, "reason": "现在的关系还不适合这样做"}
+                actions[action_key] = {"command": [command], **{stage: dict(blocked) for stage in ActionRegistry.STAGES}}
+            action_def = actions[action_key]
+            if "type" in entry:
+                action_def["type"] = entry["type"]
+            for stage, stage_config in stages.items():
+                base = action_def.get(stage, {})
+                if base.get("blocked") and "blocked" not in stage_config:
+                    base = {}
+                action_def[stage] = {**base, **stage_config}
+            applied += 1
+
+        if applied:
+            logger.info(f"从 actions.json 加载动作阶段配置: {applied}个")
+        return actions
+
+    @staticmethod
+    def _get_mtime() -> Optional[float]:
+        try:
+            return os.path.getmtime(ActionRegistry.ACTIONS_FILE)
+        except OSError:
+            return None
+
+    @staticmethod
+    def reload_if_changed() -> bool:
+        """actions.json 变化时重建注册表"""
+        if ActionRegistry._get_mtime() == ActionRegistry._source_mtime:
+            return False
+
+        ActionRegistry.build()
+        logger.info("actions.json 已变化，动作注册表已重建")
+        return True
+
+    @staticmethod
+    def find_action(command: str) -> Optional[str]:
+        """根据命令别名查找动作key"""
+        return ActionRegistry._alias_map.get(command)
+
+    @staticmethod
+    def get_action(action_key: str) -> Optional[Dict]:
+        """获取动作定义"""
+        return ActionRegistry._actions.get(action_key)
+
+    @staticmethod
+    def get_stage_config(action_key: str, stage: str) -> Optional[Dict]:
+        """获取动作在某个关系阶段的配置，动作不存在时返回 None"""
+        return ActionRegistry._stage_table.get((action_key, stage))
+
+    @staticmethod
+    def get_available_actions(stage: str) -> List[Dict]:
+        """获取某个关系阶段的可用动作（副本）"""
+        return [dict(info) for info in ActionRegistry._available_by_stage.get(stage, [])]
+
+    @staticmethod
+    def get_pattern() -> str:
+        """获取匹配所有动作命令的正则表达式"""
+        return ActionRegistry._pattern
+
+    @staticmethod
+    def match(text: str) -> Optional[Tuple[str, str, str]]:
+        """
+        匹配动作命令
+        返回: (动作key, 使用的命令, 参数)，不匹配时返回 None
+        """
+        match = ActionRegistry._regex.match(text)
+        if not match:
+            return None
+
+        command = match.group(1)
+        params = match.group(2).strip() if match.group(2) else ""
+        return ActionRegistry._alias_map[command], command, params
+
+
+ActionRegistry.build()
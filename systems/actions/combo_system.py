@@ -3,48 +3,128 @@
 """
 
 import time
-from typing import Tuple
-from src.plugin_system.apis import database_api
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
 from ...core.models import DTEvent
+from ...core.db_executor import DBExecutor
 
 
 class ComboSystem:
     """连击系统 - 连续互动获得加成"""
 
+    # 连击时间窗口（秒）
+    COMBO_WINDOW = 300
+
+    # 每个用户窗口最多保留的时间戳数（倍率在10连击封顶）
+    MAX_WINDOW_SIZE = 64
+
+    # 同时跟踪的窗口数量上限，超出时清理已空闲的窗口
+    MAX_TRACKED_WINDOWS = 2048
+
+    # 连击加成倍率 [(最低连击数, 倍率)]，从高到低
+    COMBO_TIERS = [
+        (10, 2.0),   # 10连击: 2倍效果
+        (7, 1.7),    # 7连击: 1.7倍
+        (5, 1.5),    # 5连击: 1.5倍
+        (3, 1.3),    # 3连击: 1.3倍
+    ]
+
+    # 滑动窗口 {(user_id, chat_id): 互动时间戳队列（升序）}
+    _windows: Dict[Tuple[str, str], Deque[float]] = {}
+
     @staticmethod
     async def calculate_combo_bonus(user_id: str, chat_id: str) -> Tuple[int, float]:
         """
         计算连击数和加成倍率
         返回: (连击数, 加成倍率)
         """
-        # 获取最近5分钟内的互动次数
-        recent_time = time.time() - 300  # 5分钟前
-
-        recent_interactions = await database_api.db_get(
-            DTEvent,
-            filters={
-                "user_id": user_id,
-                "chat_id": chat_id,
-                "event_type": "interaction"
-            }
-        )
+        now = time.time()
+        window = await ComboSystem._get_window(user_id, chat_id, now)
+        ComboSystem._trim(window, now)
 
-        # 筛选5分钟内的
-        if recent_interactions:
-            recent_interactions = [e for e in recent_interactions if e.get("timestamp", 0) >= recent_time]
+        combo_count = len(window)
 
-        combo_count = len(recent_interactions) if recent_interactions else 0
-
-        # 连击加成倍率
-        if combo_count >= 10:
-            multiplier = 2.0      # 10连击: 2倍效果
-        elif combo_count >= 7:
-            multiplier = 1.7      # 7连击: 1.7倍
-        elif combo_count >= 5:
-            multiplier = 1.5      # 5连击: 1.5倍
-        elif combo_count >= 3:
-            multiplier = 1.3      # 3连击: 1.3倍
-        else:
-            multiplier = 1.0      # 无连击
+        multiplier = 1.0      # 无连击
+        for min_count, tier_multiplier in ComboSystem.COMBO_TIERS:
+            if combo_count >= min_count:
+                multiplier = tier_multiplier
+                break
 
         return combo_count, multiplier
+
+    @staticmethod
+    def record_interaction(user_id: str, chat_id: str, timestamp: Optional[float] = None):
+        """记录一次互动（由动作处理器在写入 interaction 事件时调用）"""
+        window = ComboSystem._windows.get((user_id, chat_id))
+        if window is None:
+            # 窗口未加载时无需记录，冷启动重建会从数据库读到这条事件
+            return
+
+        now = timestamp if timestamp is not None else time.time()
+        window.append(now)
+        ComboSystem._trim(window, now)
+
+    @staticmethod
+    def reset(user_id: str, chat_id: str):
+        """清除连击窗口（重开游戏时调用）"""
+        ComboSystem._windows.pop((user_id, chat_id), None)
+
+    @staticmethod
+    async def _get_window(user_id: str, chat_id: str, now: float) -> Deque[float]:
+        """获取滑动窗口，冷启动时从数据库按时间范围重建"""
+        key = (user_id, chat_id)
+        window = ComboSystem._windows.get(key)
+        if window is not None:
+            return window
+
+        if len(ComboSystem._windows) >= ComboSystem.MAX_TRACKED_WINDOWS:
+            ComboSystem._prune_idle_windows(now)
+
+        since = now - ComboSystem.COMBO_WINDOW
+        timestamps = await DBExecutor.read(ComboSystem._load_timestamps, user_id, chat_id, since)
+
+        # 查询期间可能已有其他协程完成加载
+        window = ComboSystem._windows.get(key)
+        if window is not None:
+            return window
+
+        window = deque(timestamps, maxlen=ComboSystem.MAX_WINDOW_SIZE)
+        ComboSystem._windows[key] = window
+        return window
+
+    @staticmethod
+    def _load_timestamps(user_id: str, chat_id: str, since: float) -> List[float]:
+        """查询时间窗口内的互动时间戳（在数据库线程中执行）"""
+        # 命中 (user_id, chat_id, event_type, timestamp) 复合索引
+        rows = (
+            DTEvent.select(DTEvent.timestamp)
+            .where(
+                (DTEvent.user_id == user_id)
+                & (DTEvent.chat_id == chat_id)
+                & (DTEvent.event_type == "interaction")
+                & (DTEvent.timestamp >= since)
+            )
+            .order_by(DTEvent.timestamp.desc())
+            .limit(ComboSystem.MAX_WINDOW_SIZE)
+        )
+
+        return sorted(row.timestamp for row in rows)
+
+    @staticmethod
+    def _trim(window: Deque[float], now: float):
+        """移出超出时间窗口的时间戳"""
+        cutoff = now - ComboSystem.COMBO_WINDOW
+        while window and window[0] < cutoff:
+            window.popleft()
+
+    @staticmethod
+    def _prune_idle_windows(now: float):
+        """清理已经没有有效互动的窗口"""
+        cutoff = now - ComboSystem.COMBO_WINDOW
+        idle_keys = [
+            key for key, window in ComboSystem._windows.items()
+            if not window or window[-1] < cutoff
+        ]
+        for key in idle_keys:
+            del ComboSystem._windows[key]
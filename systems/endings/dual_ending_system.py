@@ -17,6 +17,8 @@
 from typing import Dict, Tuple, Optional, List
 from src.common.logger import get_logger
 
+from .ending_resolver import EndingResolver
+
 logger = get_logger("dt_dual_ending")
 
 
@@ -245,70 +247,36 @@ class DualEndingSystem:
     @staticmethod
     def check_emotion_ending(character: Dict) -> Optional[Tuple[str, Dict]]:
         """检查感情路线结局"""
-        sorted_endings = sorted(
-            DualEndingSystem.EMOTION_ENDINGS.items(),
-            key=lambda x: x[1]["priority"],
-            reverse=True
-        )
-
-        for ending_id, ending_data in sorted_endings:
-            if DualEndingSystem._check_conditions(character, ending_data["conditions"]):
-                return ending_id, ending_data
-
-        return None
+        ending_id = DualEndingSystem._EMOTION_RESOLVER.resolve(character)
+        if ending_id is None:
+            return None
+        return ending_id, DualEndingSystem.EMOTION_ENDINGS[ending_id]
 
     @staticmethod
     def check_sexual_ending(character: Dict) -> Optional[Tuple[str, Dict]]:
         """检查性向路线结局"""
-        sorted_endings = sorted(
-            DualEndingSystem.SEXUAL_ENDINGS.items(),
-            key=lambda x: x[1]["priority"],
-            reverse=True
-        )
-
-        for ending_id, ending_data in sorted_endings:
-            if DualEndingSystem._check_conditions(character, ending_data["conditions"]):
-                return ending_id, ending_data
-
-        return None
-
-    @staticmethod
-    def _check_conditions(character: Dict, conditions: Dict) -> bool:
-        """检查是否满足条件"""
-        for attr, required in conditions.items():
-            if isinstance(required, tuple):
-                min_val, max_val = required
-                char_value = character.get(attr, 0)
-                if not (min_val <= char_value <= max_val):
-                    return False
-            else:
-                # 单个数值条件（大于等于）
-                char_value = character.get(attr, 0)
-                if char_value < required:
-                    return False
-        return True
+        ending_id = DualEndingSystem._SEXUAL_RESOLVER.resolve(character)
+        if ending_id is None:
+            return None
+        return ending_id, DualEndingSystem.SEXUAL_ENDINGS[ending_id]
 
     @staticmethod
     def get_all_possible_emotion_endings(character: Dict) -> List[Tuple[str, Dict]]:
         """获取所有可能的感情结局"""
-        possible = []
-        for ending_id, ending_data in DualEndingSystem.EMOTION_ENDINGS.items():
-            if DualEndingSystem._check_conditions(character, ending_data["conditions"]):
-                possible.append((ending_id, ending_data))
-
-        possible.sort(key=lambda x: x[1]["priority"], reverse=True)
-        return possible
+        # 判定结果已按优先级排序
+        return [
+            (ending_id, DualEndingSystem.EMOTION_ENDINGS[ending_id])
+            for ending_id in DualEndingSystem._EMOTION_RESOLVER.matching(character)
+        ]
 
     @staticmethod
     def get_all_possible_sexual_endings(character: Dict) -> List[Tuple[str, Dict]]:
         """获取所有可能的性向结局"""
-        possible = []
-        for ending_id, ending_data in DualEndingSystem.SEXUAL_ENDINGS.items():
-            if DualEndingSystem._check_conditions(character, ending_data["conditions"]):
-                possible.append((ending_id, ending_data))
-
-        possible.sort(key=lambda x: x[1]["priority"], reverse=True)
-        return possible
+        # 判定结果已按优先级排序
+        return [
+            (ending_id, DualEndingSystem.SEXUAL_ENDINGS[ending_id])
+            for ending_id in DualEndingSystem._SEXUAL_RESOLVER.matching(character)
+        ]
 
     @staticmethod
     def format_dual_ending_message(
@@ -355,3 +323,8 @@ class DualEndingSystem:
 """
 
         return message.strip()
+
+
+# 双线结局判定器在加载时构建一次
+DualEndingSystem._EMOTION_RESOLVER = EndingResolver(DualEndingSystem.EMOTION_ENDINGS, "threshold")
+DualEndingSystem._SEXUAL_RESOLVER = EndingResolver(DualEndingSystem.SEXUAL_ENDINGS, "threshold")
@@ -0,0 +1,166 @@
+"""
+结局判定器 - 预排序 + 区间索引 + 结果缓存
+
+核心机制：
+- 结局按优先级只排序一次，第 i 个结局对应位掩码的第 i 位（位越低优先级越高）
+- 每个属性把所有条件阈值切成若干基本区间，预先算好每个区间内满足该属性条件的结局掩码
+- 判定时每个属性二分查找一次，所有属性掩码按位与即为满足属性条件的结局集合，
+  代价只与属性数和阈值数相关，与结局数量基本无关
+- 以相关属性值为键缓存判定结果，属性未变化时直接复用
+- 职业、季节等非属性条件只对命中的候选结局检查
+"""
+
+import bisect
+from collections import OrderedDict
+from numbers import Number
+from typing import Dict, List, Optional, Tuple
+
+from ...utils.condition_compiler import ConditionCompiler, get_value
+
+
+class EndingResolver:
+    """结局判定器（每个结局目录一个实例）"""
+
+    # 缓存的属性组合数上限
+    CACHE_SIZE = 512
+
+    def __init__(self, endings: Dict[str, Dict], dialect: str):
+        self._endings = endings
+
+        # 按优先级从高到低排序一次（优先级相同时保持定义顺序）
+        self._order: List[str] = [
+            ending_id for ending_id, _ in
+            sorted(endings.items(), key=lambda x: x[1].get("priority", 0), reverse=True)
+        ]
+        self._all_mask = (1 << len(self._order)) - 1
+
+        conditions = {
+            ending_id: ConditionCompiler.compile(endings[ending_id].get("conditions", {}), dialect)
+            for ending_id in self._order
+        }
+
+        # 阈值不是数值的子句无法建区间索引，命中后再逐条校验
+        self._residual_mask = 0
+        clauses_by_attr: Dict[str, List[Tuple[int, object, object]]] = {}
+        for bit, ending_id in enumerate(self._order):
+            for attr, compare, threshold in conditions[ending_id].clauses:
+                if isinstance(threshold, Number) and not isinstance(threshold, bool):
+                    clauses_by_attr.setdefault(attr, []).append((bit, compare, threshold))
+                else:
+                    self._residual_mask |= 1 << bit
+
+        self._conditions = conditions
+        self._attrs = tuple(clauses_by_attr)
+        # {属性: (阈值断点, 各基本区间的掩码)}
+        self._indexes = {
+            attr: self._build_index(clauses)
+            for attr, clauses in clauses_by_attr.items()
+        }
+
+        self._cache: "OrderedDict[tuple, Tuple[str, ...]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _build_index(self, clauses: List[Tuple[int, object, object]]) -> Tuple[List, List[int]]:
+        """
+        为一个属性建立区间索引
+        断点 b0 < b1 < ... < bk 把数轴分成 2k+1 个基本区间：
+        (-inf, b0), [b0], (b0, b1), [b1], ..., [bk], (bk, +inf)
+        每个区间内各条件的真假不变，用区间内任一代表值计算掩码
+        """
+        points = sorted({threshold for _, _, threshold in clauses})
+
+        representatives = []
+        for i, point in enumerate(points):
+            if i == 0:
+                representatives.append(point - 1)
+            else:
+                representatives.append((points[i - 1] + point) / 2)
+            representatives.append(point)
+        representatives.append(points[-1] + 1)
+
+        constrained = 0
+        for bit, _, _ in clauses:
+            constrained |= 1 << bit
+        # 对该属性没有条件的结局在所有区间都满足
+        unconstrained = self._all_mask & ~constrained
+
+        masks = []
+        for value in representatives:
+            failed = 0
+            for bit, compare, threshold in clauses:
+                if not compare(value, threshold):
+                    failed |= 1 << bit
+            masks.append((constrained & ~failed) | unconstrained)
+
+        return points, masks
+
+    def _segment_mask(self, attr: str, value) -> int:
+        points, masks = self._indexes[attr]
+        i = bisect.bisect_left(points, value)
+        if i < len(points) and points[i] == value:
+            return masks[2 * i + 1]
+        return masks[2 * i]
+
+    def matching(self, character) -> Tuple[str, ...]:
+        """返回满足属性条件的结局ID（按优先级从高到低）"""
+        values = tuple(get_value(character, attr) for attr in self._attrs)
+
+        cached = self._cache.get(values)
+        if cached is not None:
+            self._cache.move_to_end(values)
+            self._stats["hits"] += 1
+            return cached
+
+        self._stats["misses"] += 1
+
+        mask = self._all_mask
+        for attr, value in zip(self._attrs, values):
+            mask &= self._segment_mask(attr, value)
+            if not mask:
+                break
+
+        result = []
+        while mask:
+            low_bit = mask & -mask
+            bit = low_bit.bit_length() - 1
+            mask ^= low_bit
+            ending_id = self._order[bit]
+            if (self._residual_mask & low_bit) and not self._conditions[ending_id].check(character):
+                continue
+            result.append(ending_id)
+
+        # 含非数值条件的结果依赖角色的其他字段，不缓存
+        matched = tuple(result)
+        if not self._residual_mask:
+            self._cache[values] = matched
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return matched
+
+    def resolve(self, character) -> Optional[str]:
+        """返回优先级最高的满足条件的结局ID（包括职业、季节要求）"""
+        season_id = None
+
+        for ending_id in self.matching(character):
+            ending_data = self._endings[ending_id]
+
+            # 检查职业要求（如果有）
+            if "career_required" in ending_data:
+                if character.get("career", "") not in ending_data["career_required"]:
+                    continue
+
+            # 检查季节条件（如果有），每次判定只计算一次季节
+            if "season_condition" in ending_data:
+                if season_id is None:
+                    from ..time.seasonal_system import SeasonalSystem
+                    season_id = SeasonalSystem.get_season_info(character.get("game_day", 1))["id"]
+                if season_id != ending_data["season_condition"]:
+                    continue
+
+            return ending_id
+
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓存统计"""
+        return {**self._stats, "size": len(self._cache), "endings": len(self._order)}
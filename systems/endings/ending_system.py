@@ -15,6 +15,8 @@
 from typing import Dict, Tuple, Optional, List
 from src.common.logger import get_logger
 
+from .ending_resolver import EndingResolver
+
 logger = get_logger("dt_ending")
 
 
@@ -937,67 +939,27 @@ class EndingSystem:
         检查当前是否满足某个结局条件
         返回: (结局ID, 结局数据) 或 None
         """
-        from ..time.seasonal_system import SeasonalSystem
-
-        # 按优先级从高到低检查
-        sorted_endings = sorted(
-            EndingSystem.ENDINGS.items(),
-            key=lambda x: x[1]["priority"],
-            reverse=True
-        )
-
-        for ending_id, ending_data in sorted_endings:
-            # 检查基础属性条件
-            if not EndingSystem._check_conditions(character, ending_data["conditions"]):
-                continue
-
-            # 检查职业要求（如果有）
-            if "career_required" in ending_data:
-                current_career = character.get("career", "")
-                required_careers = ending_data["career_required"]
-                if current_career not in required_careers:
-                    continue
-
-            # 检查季节条件（如果有）
-            if "season_condition" in ending_data:
-                game_day = character.get("game_day", 1)
-                season_info = SeasonalSystem.get_season_info(game_day)
-                required_season = ending_data["season_condition"]
-                if season_info["id"] != required_season:
-                    continue
-
-            # 所有条件都满足
+        # 预排序 + 区间索引判定，属性未变化时直接复用结果
+        ending_id = EndingSystem._RESOLVER.resolve(character)
+        if ending_id is not None:
+            ending_data = EndingSystem.ENDINGS[ending_id]
             logger.info(f"触发结局: {ending_id} - {ending_data['name']}")
             return ending_id, ending_data
 
         # 如果没有任何结局匹配，返回默认结局
         return "ordinary_love", EndingSystem.ENDINGS["ordinary_love"]
 
-    @staticmethod
-    def _check_conditions(character: Dict, conditions: Dict) -> bool:
-        """检查是否满足所有条件"""
-        for attr, (min_val, max_val) in conditions.items():
-            char_value = character.get(attr, 0)
-            if not (min_val <= char_value <= max_val):
-                return False
-        return True
-
     @staticmethod
     def get_all_possible_endings(character: Dict) -> List[Tuple[str, Dict]]:
         """
         获取当前所有可能的结局（用于预览）
         返回所有满足条件的结局列表
         """
-        possible_endings = []
-
-        for ending_id, ending_data in EndingSystem.ENDINGS.items():
-            if EndingSystem._check_conditions(character, ending_data["conditions"]):
-                possible_endings.append((ending_id, ending_data))
-
-        # 按优先级排序
-        possible_endings.sort(key=lambda x: x[1]["priority"], reverse=True)
-
-        return possible_endings
+        # 判定结果已按优先级排序
+        return [
+            (ending_id, EndingSystem.ENDINGS[ending_id])
+            for ending_id in EndingSystem._RESOLVER.matching(character)
+        ]
 
     @staticmethod
     def format_ending_message(ending_id: str, ending_data: Dict, character: Dict) -> str:
@@ -1033,3 +995,7 @@ class EndingSystem:
 """
 
         return message.strip()
+
+
+# 结局判定器在加载时构建一次
+EndingSystem._RESOLVER = EndingResolver(EndingSystem.ENDINGS, "range")
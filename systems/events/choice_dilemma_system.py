@@ -8,11 +8,12 @@
 """
 
 import random
-import json
 from typing import Dict, Tuple, Optional, List
 
 from src.common.logger import get_logger
 
+from ...utils.condition_compiler import ConditionCompiler
+
 logger = get_logger("dt_choice_dilemma")
 
 
@@ -283,46 +284,21 @@ class ChoiceDilemmaSystem:
         Returns:
             (是否触发, 困境数据)
         """
-        # 遍历所有困境类型
-        for dilemma_id, dilemma_def in ChoiceDilemmaSystem.DILEMMA_EVENTS.items():
-            # 检查触发条件
-            if ChoiceDilemmaSystem._check_conditions(character, dilemma_def.get("trigger_conditions", {})):
-                # 随机触发（避免过于频繁）
-                if random.random() < 0.3:  # 30%概率触发
-                    return True, {
-                        "dilemma_id": dilemma_id,
-                        "title": dilemma_def["title"],
-                        "description": dilemma_def["description"],
-                        "choices": dilemma_def["choices"],
-                        "name": dilemma_def["name"]
-                    }
+        # 一次判定所有困境的触发条件
+        for dilemma_id in ChoiceDilemmaSystem._TRIGGER_RULES.matching(character):
+            dilemma_def = ChoiceDilemmaSystem.DILEMMA_EVENTS[dilemma_id]
+            # 随机触发（避免过于频繁）
+            if random.random() < 0.3:  # 30%概率触发
+                return True, {
+                    "dilemma_id": dilemma_id,
+                    "title": dilemma_def["title"],
+                    "description": dilemma_def["description"],
+                    "choices": dilemma_def["choices"],
+                    "name": dilemma_def["name"]
+                }
 
         return False, None
 
-    @staticmethod
-    def _check_conditions(character: Dict, conditions: Dict) -> bool:
-        """检查触发条件是否满足"""
-        for attr, (operator, threshold) in conditions.items():
-            char_value = character.get(attr, 0)
-
-            if operator == ">":
-                if char_value <= threshold:
-                    return False
-            elif operator == "<":
-                if char_value >= threshold:
-                    return False
-            elif operator == "==":
-                if char_value != threshold:
-                    return False
-            elif operator == ">=":
-                if char_value < threshold:
-                    return False
-            elif operator == "<=":
-                if char_value > threshold:
-                    return False
-
-        return True
-
     @staticmethod
     def apply_choice_consequences(character: Dict, dilemma_id: str, choice_id: str) -> Tuple[Dict, str, str]:
         """
@@ -412,7 +388,8 @@ class ChoiceDilemmaSystem:
             如果生成失败返回 None
         """
         try:
-            from src.plugin_system.apis import llm_api
+            from ...utils.llm_gateway import LLMGateway
+            from ..events.event_content import EventContent
             from ..events.event_generation_prompt import EventGenerationPrompt
 
             # 获取困境元信息
@@ -429,64 +406,34 @@ class ChoiceDilemmaSystem:
             }
             dilemma_theme = theme_map.get(dilemma_id, "关键的选择时刻")
 
-            # 构建 Prompt
-            prompt = EventGenerationPrompt.build_dilemma_prompt(
-                dilemma_name=dilemma_name,
-                dilemma_theme=dilemma_theme,
-                character=character,
-                history=history,
-                num_choices=num_choices
-            )
-
-            # 调用 LLM
-            models = llm_api.get_available_models()
-            replyer_model = models.get("replyer")
-
-            if not replyer_model:
-                logger.error("未找到 'replyer' 模型配置")
-                return None
-
-            success, ai_response, reasoning, model_name = await llm_api.generate_with_model(
-                prompt=prompt,
-                model_config=replyer_model,
-                request_type="desire_theatre.generate_dilemma"
-            )
-
-            if not success or not ai_response:
-                logger.error(f"LLM生成困境失败: {ai_response}")
-                return None
-
-            # 解析 LLM 返回的 JSON
-            response_text = ai_response.strip()
-
-            # 提取 JSON 内容
-            if "```json" in response_text:
-                start = response_text.find("```json") + len("```json")
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + len("```")
-                end = response_text.rfind("```")
-                response_text = response_text[start:end].strip()
-
-            # 解析 JSON
-            generated_content = json.loads(response_text)
-
-            # 验证格式
-            if not isinstance(generated_content, dict):
-                logger.error("LLM返回的不是字典格式")
-                return None
+            async def generate() -> Optional[Dict]:
+                # 构建 Prompt
+                prompt = EventGenerationPrompt.build_dilemma_prompt(
+                    dilemma_name=dilemma_name,
+                    dilemma_theme=dilemma_theme,
+                    character=character,
+                    history=history,
+                    num_choices=num_choices
+                )
+
+                # 调用 LLM
+                success, ai_response, reasoning, model_name = await LLMGateway.generate(
+                    prompt=prompt,
+                    request_type="desire_theatre.generate_dilemma"
+                )
+
+                if not success or not ai_response:
+                    logger.error(f"LLM生成困境失败: {ai_response}")
+                    return None
 
-            if "description" not in generated_content or "choices" not in generated_content:
-                logger.error("LLM返回缺少必要字段")
-                return None
+                return EventContent.parse("dilemma", ai_response)
 
-            logger.info(f"成功生成困境内容: {dilemma_id} - {dilemma_name}")
+            # 同一档位的角色状态复用已生成的内容
+            generated_content = await EventContent.get_or_generate(f"dilemma:{dilemma_id}", character, generate)
+            if generated_content:
+                logger.info(f"成功生成困境内容: {dilemma_id} - {dilemma_name}")
             return generated_content
 
-        except json.JSONDecodeError as e:
-            logger.error(f"解析LLM返回的JSON失败: {e}\n原始内容: {ai_response}")
-            return None
         except Exception as e:
             logger.error(f"生成困境内容失败: {e}", exc_info=True)
             return None
@@ -534,7 +481,8 @@ class ChoiceDilemmaSystem:
     @staticmethod
     async def generate_dynamic_dilemma(
         character: Dict,
-        history: List[Dict] = None
+        history: List[Dict] = None,
+        use_cache: bool = True
     ) -> Optional[Dict]:
         """
         生成完全动态的选择困境（包括困境类型、选项、效果）
@@ -542,67 +490,44 @@ class ChoiceDilemmaSystem:
         Args:
             character: 角色数据
             history: 对话历史
+            use_cache: 是否经过生成内容缓存（预生成传 False，结果只放入自己的槽位）
 
         Returns:
             完整的困境数据字典，包含所有字段
             如果生成失败返回 None
         """
         try:
-            from src.plugin_system.apis import llm_api
+            from ...utils.llm_gateway import LLMGateway
+            from ..events.event_content import EventContent
             from ..events.event_generation_prompt import EventGenerationPrompt
 
-            # 构建动态困境生成 Prompt
-            prompt = EventGenerationPrompt.build_dynamic_dilemma_prompt(
-                character=character,
-                history=history
-            )
-
-            # 调用 LLM
-            models = llm_api.get_available_models()
-            replyer_model = models.get("replyer")
-
-            if not replyer_model:
-                logger.error("未找到 'replyer' 模型配置")
-                return None
-
-            success, ai_response, reasoning, model_name = await llm_api.generate_with_model(
-                prompt=prompt,
-                model_config=replyer_model,
-                request_type="desire_theatre.generate_dynamic_dilemma"
-            )
+            async def generate() -> Optional[Dict]:
+                # 构建动态困境生成 Prompt
+                prompt = EventGenerationPrompt.build_dynamic_dilemma_prompt(
+                    character=character,
+                    history=history
+                )
+
+                # 调用 LLM
+                success, ai_response, reasoning, model_name = await LLMGateway.generate(
+                    prompt=prompt,
+                    request_type="desire_theatre.generate_dynamic_dilemma"
+                )
+
+                if not success or not ai_response:
+                    logger.error(f"LLM生成动态困境失败: {ai_response}")
+                    return None
 
-            if not success or not ai_response:
-                logger.error(f"LLM生成动态困境失败: {ai_response}")
-                return None
+                return EventContent.parse("dynamic_dilemma", ai_response)
 
-            # 解析 LLM 返回的 JSON
-            response_text = ai_response.strip()
-
-            # 提取 JSON 内容
-            if "```json" in response_text:
-                start = response_text.find("```json") + len("```json")
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + len("```")
-                end = response_text.rfind("```")
-                response_text = response_text[start:end].strip()
-
-            # 解析 JSON
-            generated_dilemma = json.loads(response_text)
-
-            # 验证格式
-            if not isinstance(generated_dilemma, dict):
-                logger.error("LLM返回的不是字典格式")
+            if use_cache:
+                generated_dilemma = await EventContent.get_or_generate("dynamic_dilemma", character, generate)
+            else:
+                generated_dilemma = await generate()
+            if not generated_dilemma:
                 return None
 
-            required_fields = ["dilemma_name", "title", "description", "choices"]
-            for field in required_fields:
-                if field not in generated_dilemma:
-                    logger.error(f"LLM返回缺少必要字段: {field}")
-                    return None
-
-            # 生成唯一的困境ID
+            # 生成唯一的困境ID（缓存复用的内容也分配新ID）
             import time
             dilemma_id = f"dynamic_{int(time.time())}_{random.randint(1000, 9999)}"
 
@@ -613,10 +538,13 @@ class ChoiceDilemmaSystem:
             logger.info(f"成功生成动态困境: {generated_dilemma['dilemma_name']} (ID: {dilemma_id})")
             return generated_dilemma
 
-        except json.JSONDecodeError as e:
-            logger.error(f"解析LLM返回的JSON失败: {e}\n原始内容: {ai_response}")
-            return None
         except Exception as e:
             logger.error(f"生成动态困境失败: {e}", exc_info=True)
             return None
 
+# 困境触发条件在加载时编译一次
+ChoiceDilemmaSystem._TRIGGER_RULES = ConditionCompiler.compile_rules(
+    {dilemma_id: dilemma_def.get("trigger_conditions", {})
+     for dilemma_id, dilemma_def in ChoiceDilemmaSystem.DILEMMA_EVENTS.items()},
+    "operator"
+)
@@ -0,0 +1,202 @@
+"""
+事件内容 - LLM 生成的事件/困境内容的解析、校验与缓存
+
+核心机制：
+- 四种生成内容（模板事件文本、模板困境文本、动态事件、动态困境）共用 LLMJson 的提取和校验，
+  各自只声明结构描述；截断和多余逗号可修复，校验失败才丢弃
+- 生成结果按 (模板ID, 玩家, 会话, 游戏日, 人格, 职业, 阶段档位) 缓存，阶段档位 = 关系阶段 + 堕落度区间，
+  同一档位的角色状态视为等价，直接复用缓存内容而不再调用 LLM；
+  生成 Prompt 中带有玩家的互动历史，缓存只在同一玩家、同一游戏日内复用，不跨玩家共享
+- 每个键保留若干个不同版本，数量不足时继续生成补充，凑齐后随机取用；
+  每个版本使用一定次数后淘汰，由下次生成替换，避免玩家反复看到同一段内容
+"""
+
+import copy
+import random
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+from ...utils.llm_json import LLMJson, NUMBER
+from ..time.daily_limit_system import DailyInteractionSystem
+
+logger = get_logger("dt_event_content")
+
+# 选项的属性变化/前置条件：任意属性名 -> 数值
+_NUMERIC_MAP = {"*": NUMBER}
+
+
+class EventContent:
+    """事件内容解析与缓存"""
+
+    # 默认配置（可通过 configure() 覆盖，对应 config.toml 的 [event_content]）
+    CONFIG = {
+        "cache_enabled": True,
+        # 每个键保留的内容版本数
+        "variants_per_key": 3,
+        # 每个版本最多使用次数，用满后淘汰
+        "max_uses": 3,
+        # 缓存有效期(分钟)
+        "ttl_minutes": 180,
+        # 最多缓存的键数
+        "max_keys": 256,
+    }
+
+    # 各类生成内容的结构描述
+    SCHEMAS = {
+        "event": {
+            "story_text": str,
+            "choices": [{"text": str, "result_text?": str}],
+        },
+        "dilemma": {
+            "description": str,
+            "choices": [{"text": str, "description?": str, "consequence_text?": str, "long_term?": str}],
+        },
+        "dynamic_event": {
+            "event_name": str,
+            "event_category": str,
+            "event_emoji": str,
+            "story_text": str,
+            "choices": [{
+                "text": str,
+                "result_text": str,
+                "effects?": _NUMERIC_MAP,
+                "requirements?": _NUMERIC_MAP,
+            }],
+        },
+        "dynamic_dilemma": {
+            "dilemma_name": str,
+            "title": str,
+            "description": str,
+            "choices": [{
+                "text": str,
+                "description": str,
+                "effects?": _NUMERIC_MAP,
+                "consequence_text?": str,
+                "long_term?": str,
+            }],
+        },
+    }
+
+    # 动态内容至少需要的选项数（/选择 <1/2>）
+    MIN_DYNAMIC_CHOICES = 2
+
+    # 堕落度区间宽度
+    CORRUPTION_BAND = 25
+
+    # {键: [{"payload": dict, "created_at": float, "uses": int}]}
+    _cache: "OrderedDict[Tuple, List[Dict]]" = OrderedDict()
+
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "repaired": 0, "invalid": 0}
+
+    @staticmethod
+    def configure(**options):
+        """覆盖默认配置"""
+        for key, value in options.items():
+            if key in EventContent.CONFIG and value is not None:
+                EventContent.CONFIG[key] = value
+
+    @staticmethod
+    def parse(kind: str, text: str) -> Optional[Dict]:
+        """
+        解析 LLM 输出并按 kind 对应的结构校验
+        返回: 通过校验的内容，失败返回 None
+        """
+        data, repaired = LLMJson.parse(text, EventContent.SCHEMAS[kind], label=f"生成{kind}")
+        if repaired:
+            EventContent._stats["repaired"] += 1
+
+        if data is not None and kind.startswith("dynamic_") and len(data["choices"]) < EventContent.MIN_DYNAMIC_CHOICES:
+            logger.error(f"生成{kind}: 选项不足{EventContent.MIN_DYNAMIC_CHOICES}个")
+            data = None
+
+        if data is None:
+            EventContent._stats["invalid"] += 1
+        return data
+
+    @staticmethod
+    def stage_bucket(character: Dict) -> Tuple[str, int]:
+        """阶段档位：关系阶段 + 堕落度区间"""
+        corruption = int(character.get("corruption", 0) or 0)
+        band = min(max(corruption, 0) // EventContent.CORRUPTION_BAND, 100 // EventContent.CORRUPTION_BAND - 1)
+        return DailyInteractionSystem.get_relationship_stage(character), band
+
+    @staticmethod
+    def cache_key(template_id: str, character: Dict) -> Tuple:
+        return (
+            template_id,
+            character.get("user_id"),
+            character.get("chat_id"),
+            character.get("game_day", 1),
+            character.get("personality_type"),
+            character.get("career"),
+            EventContent.stage_bucket(character),
+        )
+
+    @staticmethod
+    async def get_or_generate(
+        template_id: str,
+        character: Dict,
+        generate: Callable[[], Awaitable[Optional[Dict]]]
+    ) -> Optional[Dict]:
+        """
+        取缓存内容，版本数不足时调用 generate() 生成并加入缓存
+        返回: 内容副本（调用方可以自由修改），生成失败返回 None
+        """
+        if not EventContent.CONFIG["cache_enabled"]:
+            return await generate()
+
+        key = EventContent.cache_key(template_id, character)
+        variants = EventContent._live_variants(key)
+
+        if len(variants) >= EventContent.CONFIG["variants_per_key"]:
+            variant = random.choice(variants)
+            variant["uses"] += 1
+            EventContent._cache.move_to_end(key)
+            EventContent._stats["hits"] += 1
+            logger.debug(f"使用缓存的生成内容: {template_id}")
+            return copy.deepcopy(variant["payload"])
+
+        EventContent._stats["misses"] += 1
+        payload = await generate()
+        if payload:
+            EventContent._store(key, payload)
+        return payload
+
+    @staticmethod
+    def _live_variants(key: Tuple) -> List[Dict]:
+        """去掉过期和用满的版本"""
+        variants = EventContent._cache.get(key)
+        if not variants:
+            return []
+
+        deadline = time.time() - EventContent.CONFIG["ttl_minutes"] * 60
+        variants[:] = [
+            v for v in variants
+            if v["created_at"] >= deadline and v["uses"] < EventContent.CONFIG["max_uses"]
+        ]
+        return variants
+
+    @staticmethod
+    def _store(key: Tuple, payload: Dict):
+        variants = EventContent._cache.setdefault(key, [])
+        variants.append({"payload": copy.deepcopy(payload), "created_at": time.time(), "uses": 1})
+        EventContent._cache.move_to_end(key)
+        while len(EventContent._cache) > EventContent.CONFIG["max_keys"]:
+            EventContent._cache.popitem(last=False)
+
+    @staticmethod
+    def clear():
+        """清空缓存"""
+        EventContent._cache.clear()
+
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """获取解析与缓存统计"""
+        return {
+            **EventContent._stats,
+            "keys": len(EventContent._cache),
+            "variants": sum(len(v) for v in EventContent._cache.values()),
+        }
@@ -0,0 +1,228 @@
+"""
+事件预生成 - 把动态事件/困境的 LLM 调用移出命令的关键路径
+
+核心机制：
+- 后台定时扫描角色缓存中近期活跃、当前空闲的角色，
+  为每个角色预先生成「下一天的随机事件」和「下一次可能触发的困境」
+- 预生成内容带有生成时的角色状态指纹：人格、职业、游戏日精确匹配，
+  各项属性差值不超过容差即视为兼容（爱心币只影响措辞，不参与比较）
+- /明日 和动作后的困境检查触发时先取预生成内容，兼容则直接使用，
+  不兼容、过期或尚未生成时照常实时调用 LLM
+- 每份预生成内容只使用一次，取走后在角色下次空闲时补齐
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from src.common.logger import get_logger
+
+from ...core.character_cache import CharacterCache
+from ...utils.prompt_builder import PromptBuilder
+
+logger = get_logger("dt_event_pregenerator")
+
+
+class EventPregenerator:
+    """事件预生成"""
+
+    # 默认配置（可通过 configure() 覆盖，对应 config.toml 的 [pregeneration]）
+    CONFIG = {
+        "enabled": True,
+        # 扫描间隔(秒)
+        "interval_seconds": 30,
+        # 角色空闲多久后才为其预生成(秒)，避免与正在进行的对话争抢 LLM
+        "idle_seconds": 20,
+        # 每轮最多发起的 LLM 生成次数
+        "max_per_round": 4,
+        # 属性差值容差
+        "attribute_tolerance": 8,
+        # 预生成内容有效期(分钟)
+        "slot_ttl_minutes": 30,
+    }
+
+    # 参与指纹比较的属性（生成 Prompt 中使用的数值属性）
+    STATE_ATTRIBUTES = (
+        "affection", "intimacy", "trust", "submission",
+        "corruption", "desire", "shame", "resistance",
+    )
+
+    # 游戏最后一天，之后不再有下一天的事件
+    LAST_DAY = 42
+
+    # 预生成内容 {(user_id, chat_id, 类型): {"fingerprint": tuple, "payload": dict, "created_at": float}}
+    _slots: Dict[Tuple[str, str, str], Dict] = {}
+
+    # 正在生成中的槽位
+    _inflight: Set[Tuple[str, str, str]] = set()
+
+    _task = None
+    _stats: Dict[str, int] = {"generated": 0, "failed": 0, "served": 0, "stale": 0, "missed": 0}
+
+    @staticmethod
+    def configure(**options):
+        """覆盖默认配置"""
+        for key, value in options.items():
+            if key in EventPregenerator.CONFIG and value is not None:
+                EventPregenerator.CONFIG[key] = value
+
+    @staticmethod
+    def fingerprint(character: Dict, day_offset: int = 0) -> Tuple:
+        """
+        角色状态指纹
+        day_offset: 预测推进天数（下一天的事件传 1）
+        """
+        return (
+            character.get("personality_type"),
+            character.get("career"),
+            character.get("game_day", 1) + day_offset,
+            tuple(int(character.get(attr, 0) or 0) for attr in EventPregenerator.STATE_ATTRIBUTES),
+        )
+
+    @staticmethod
+    def is_compatible(stored: Tuple, current: Tuple) -> bool:
+        """两个指纹是否兼容"""
+        if stored[:3] != current[:3]:
+            return False
+        tolerance = EventPregenerator.CONFIG["attribute_tolerance"]
+        return all(abs(a - b) <= tolerance for a, b in zip(stored[3], current[3]))
+
+    @staticmethod
+    def take(kind: str, user_id: str, chat_id: str, character: Dict) -> Optional[Dict]:
+        """
+        取出预生成内容（kind: event / dilemma），character 为使用时的角色状态
+        返回: 兼容时返回事件/困境数据，否则返回 None（调用方照常实时生成）
+        """
+        slot = EventPregenerator._slots.pop((user_id, chat_id, kind), None)
+        if slot is None:
+            EventPregenerator._stats["missed"] += 1
+            return None
+
+        if (
+            EventPregenerator._is_expired(slot)
+            or not EventPregenerator.is_compatible(slot["fingerprint"], EventPregenerator.fingerprint(character))
+        ):
+            EventPregenerator._stats["stale"] += 1
+            return None
+
+        EventPregenerator._stats["served"] += 1
+        logger.info(
+            f"使用预生成{'事件' if kind == 'event' else '困境'}: {user_id} "
+            f"(提前{time.time() - slot['created_at']:.0f}秒生成)"
+        )
+        return slot["payload"]
+
+    @staticmethod
+    def _is_expired(slot: Dict) -> bool:
+        return time.time() - slot["created_at"] > EventPregenerator.CONFIG["slot_ttl_minutes"] * 60
+
+    @staticmethod
+    def _needs_refill(key: Tuple[str, str, str], fingerprint: Tuple) -> bool:
+        if key in EventPregenerator._inflight:
+            return False
+        slot = EventPregenerator._slots.get(key)
+        return (
+            slot is None
+            or EventPregenerator._is_expired(slot)
+            or not EventPregenerator.is_compatible(slot["fingerprint"], fingerprint)
+        )
+
+    @staticmethod
+    async def pregenerate(user_id: str, chat_id: str, character: Dict, budget: int = 2) -> int:
+        """
+        为一个角色补齐缺失或失效的预生成内容
+        返回: 发起的 LLM 生成次数
+        """
+        from .random_event_system import RandomEventSystem
+        from .choice_dilemma_system import ChoiceDilemmaSystem
+
+        game_day = character.get("game_day", 1)
+
+        # (类型, 预测推进天数, 生成函数)
+        jobs = [("dilemma", 0, ChoiceDilemmaSystem.generate_dynamic_dilemma)]
+        if game_day + 1 <= EventPregenerator.LAST_DAY:
+            jobs.insert(0, ("event", 1, RandomEventSystem.generate_dynamic_event))
+
+        history = None
+        started = 0
+        for kind, day_offset, generate in jobs:
+            if started >= budget:
+                break
+
+            key = (user_id, chat_id, kind)
+            fingerprint = EventPregenerator.fingerprint(character, day_offset)
+            if not EventPregenerator._needs_refill(key, fingerprint):
+                continue
+
+            if history is None:
+                history = await PromptBuilder.get_recent_history(user_id, chat_id, limit=3)
+
+            target = dict(character, game_day=game_day + day_offset)
+            EventPregenerator._inflight.add(key)
+            started += 1
+            try:
+                # 绕过生成内容缓存：预生成的内容不写入缓存，也不取缓存中的旧内容
+                payload = await generate(character=target, history=history, use_cache=False)
+            except Exception as e:
+                logger.warning(f"预生成失败 {kind} {user_id}: {e}")
+                payload = None
+            finally:
+                EventPregenerator._inflight.discard(key)
+
+            if payload:
+                EventPregenerator._slots[key] = {
+                    "fingerprint": fingerprint,
+                    "payload": payload,
+                    "created_at": time.time(),
+                }
+                EventPregenerator._stats["generated"] += 1
+            else:
+                EventPregenerator._stats["failed"] += 1
+
+        return started
+
+    @staticmethod
+    async def run_once() -> int:
+        """
+        扫描一轮空闲角色并补齐预生成内容
+        返回: 本轮发起的 LLM 生成次数
+        """
+        EventPregenerator._prune()
+
+        remaining = EventPregenerator.CONFIG["max_per_round"]
+        for user_id, chat_id, character in CharacterCache.get_idle(EventPregenerator.CONFIG["idle_seconds"]):
+            if remaining <= 0:
+                break
+            remaining -= await EventPregenerator.pregenerate(user_id, chat_id, character, budget=remaining)
+
+        return EventPregenerator.CONFIG["max_per_round"] - remaining
+
+    @staticmethod
+    def _prune():
+        """丢弃过期内容"""
+        for key in [key for key, slot in EventPregenerator._slots.items() if EventPregenerator._is_expired(slot)]:
+            EventPregenerator._slots.pop(key, None)
+
+    @staticmethod
+    def start_background(loop=None):
+        """启动后台预生成任务"""
+        if not EventPregenerator.CONFIG["enabled"] or EventPregenerator._task is not None:
+            return
+
+        async def run_forever():
+            interval = EventPregenerator.CONFIG["interval_seconds"]
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await EventPregenerator.run_once()
+                except Exception as e:
+                    logger.error(f"事件预生成失败: {e}", exc_info=True)
+
+        loop = loop or asyncio.get_event_loop()
+        EventPregenerator._task = loop.create_task(run_forever())
+        logger.info(f"事件预生成任务已启动，每{EventPregenerator.CONFIG['interval_seconds']}秒扫描一次")
+
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """获取预生成统计"""
+        return {**EventPregenerator._stats, "slots": len(EventPregenerator._slots)}
@@ -10,9 +10,10 @@
 
 from typing import Dict, Tuple, Optional, List
 import random
-import json
 from src.common.logger import get_logger
 
+from ...utils.condition_compiler import ConditionCompiler
+
 logger = get_logger("dt_random_events")
 
 
@@ -469,10 +470,9 @@ class RandomEventSystem:
         # 收集所有可能触发的事件
         possible_events = []
 
-        for event_id, event_data in RandomEventSystem.EVENTS.items():
-            # 检查触发条件
-            if not RandomEventSystem._check_trigger_conditions(character, event_data):
-                continue
+        # 一次判定所有事件的触发条件
+        for event_id in RandomEventSystem._TRIGGER_RULES.matching(character):
+            event_data = RandomEventSystem.EVENTS[event_id]
 
             # 检查概率
             if random.random() < event_data["trigger_chance"]:
@@ -486,26 +486,6 @@ class RandomEventSystem:
 
         return None
 
-    @staticmethod
-    def _check_trigger_conditions(character: Dict, event_data: Dict) -> bool:
-        """检查事件触发条件"""
-        conditions = event_data.get("trigger_conditions", {})
-
-        for condition_key, condition_value in conditions.items():
-            char_value = character.get(condition_key, 0)
-
-            if isinstance(condition_value, tuple):
-                # 范围条件
-                min_val, max_val = condition_value
-                if not (min_val <= char_value <= max_val):
-                    return False
-            else:
-                # 精确匹配
-                if char_value != condition_value:
-                    return False
-
-        return True
-
     @staticmethod
     def check_choice_requirements(character: Dict, choice: Dict) -> bool:
         """检查选择的前置条件"""
@@ -623,7 +603,8 @@ class RandomEventSystem:
             如果生成失败返回 None
         """
         try:
-            from src.plugin_system.apis import llm_api
+            from ...utils.llm_gateway import LLMGateway
+            from ..events.event_content import EventContent
             from ..events.event_generation_prompt import EventGenerationPrompt
 
             # 获取事件元信息
@@ -631,65 +612,34 @@ class RandomEventSystem:
             event_name = event_data.get("name", "未知事件")
             num_choices = len(event_data.get("choices", []))
 
-            # 构建 Prompt
-            prompt = EventGenerationPrompt.build_event_prompt(
-                event_category=event_category,
-                event_name=event_name,
-                character=character,
-                history=history,
-                num_choices=num_choices
-            )
-
-            # 调用 LLM
-            models = llm_api.get_available_models()
-            replyer_model = models.get("replyer")
-
-            if not replyer_model:
-                logger.error("未找到 'replyer' 模型配置")
-                return None
-
-            success, ai_response, reasoning, model_name = await llm_api.generate_with_model(
-                prompt=prompt,
-                model_config=replyer_model,
-                request_type="desire_theatre.generate_event"
-            )
-
-            if not success or not ai_response:
-                logger.error(f"LLM生成事件失败: {ai_response}")
-                return None
-
-            # 解析 LLM 返回的 JSON
-            # 尝试提取 JSON 内容（可能被包裹在 ```json ... ``` 中）
-            response_text = ai_response.strip()
-
-            # 如果有代码块标记，提取其中的内容
-            if "```json" in response_text:
-                start = response_text.find("```json") + len("```json")
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + len("```")
-                end = response_text.rfind("```")
-                response_text = response_text[start:end].strip()
-
-            # 解析 JSON
-            generated_content = json.loads(response_text)
-
-            # 验证格式
-            if not isinstance(generated_content, dict):
-                logger.error("LLM返回的不是字典格式")
-                return None
+            async def generate() -> Optional[Dict]:
+                # 构建 Prompt
+                prompt = EventGenerationPrompt.build_event_prompt(
+                    event_category=event_category,
+                    event_name=event_name,
+                    character=character,
+                    history=history,
+                    num_choices=num_choices
+                )
+
+                # 调用 LLM
+                success, ai_response, reasoning, model_name = await LLMGateway.generate(
+                    prompt=prompt,
+                    request_type="desire_theatre.generate_event"
+                )
+
+                if not success or not ai_response:
+                    logger.error(f"LLM生成事件失败: {ai_response}")
+                    return None
 
-            if "story_text" not in generated_content or "choices" not in generated_content:
-                logger.error("LLM返回缺少必要字段")
-                return None
+                return EventContent.parse("event", ai_response)
 
-            logger.info(f"成功生成事件内容: {event_id} - {event_name}")
+            # 同一档位的角色状态复用已生成的内容
+            generated_content = await EventContent.get_or_generate(f"event:{event_id}", character, generate)
+            if generated_content:
+                logger.info(f"成功生成事件内容: {event_id} - {event_name}")
             return generated_content
 
-        except json.JSONDecodeError as e:
-            logger.error(f"解析LLM返回的JSON失败: {e}\n原始内容: {ai_response}")
-            return None
         except Exception as e:
             logger.error(f"生成事件内容失败: {e}", exc_info=True)
             return None
@@ -735,7 +685,8 @@ class RandomEventSystem:
     @staticmethod
     async def generate_dynamic_event(
         character: Dict,
-        history: List[Dict] = None
+        history: List[Dict] = None,
+        use_cache: bool = True
     ) -> Optional[Dict]:
         """
         生成完全动态的随机事件（包括事件类型、选项、效果）
@@ -743,66 +694,43 @@ class RandomEventSystem:
         Args:
             character: 角色数据
             history: 对话历史
+            use_cache: 是否经过生成内容缓存（预生成传 False，结果只放入自己的槽位）
 
         Returns:
             完整的事件数据字典，包含所有字段
             如果生成失败返回 None
         """
         try:
-            from src.plugin_system.apis import llm_api
+            from ...utils.llm_gateway import LLMGateway
+            from ..events.event_content import EventContent
             from ..events.event_generation_prompt import EventGenerationPrompt
 
-            # 构建动态事件生成 Prompt
-            prompt = EventGenerationPrompt.build_dynamic_event_prompt(
-                character=character,
-                history=history
-            )
-
-            # 调用 LLM
-            models = llm_api.get_available_models()
-            replyer_model = models.get("replyer")
-
-            if not replyer_model:
-                logger.error("未找到 'replyer' 模型配置")
-                return None
+            async def generate() -> Optional[Dict]:
+                # 构建动态事件生成 Prompt
+                prompt = EventGenerationPrompt.build_dynamic_event_prompt(
+                    character=character,
+                    history=history
+                )
+
+                # 调用 LLM
+                success, ai_response, reasoning, model_name = await LLMGateway.generate(
+                    prompt=prompt,
+                    request_type="desire_theatre.generate_dynamic_event"
+                )
+
+                if not success or not ai_response:
+                    logger.error(f"LLM生成动态事件失败: {ai_response}")
+                    return None
 
-            success, ai_response, reasoning, model_name = await llm_api.generate_with_model(
-                prompt=prompt,
-                model_config=replyer_model,
-                request_type="desire_theatre.generate_dynamic_event"
-            )
+                return EventContent.parse("dynamic_event", ai_response)
 
-            if not success or not ai_response:
-                logger.error(f"LLM生成动态事件失败: {ai_response}")
-                return None
-
-            # 解析 LLM 返回的 JSON
-            response_text = ai_response.strip()
-
-            # 提取 JSON 内容
-            if "```json" in response_text:
-                start = response_text.find("```json") + len("```json")
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + len("```")
-                end = response_text.rfind("```")
-                response_text = response_text[start:end].strip()
-
-            # 解析 JSON
-            generated_event = json.loads(response_text)
-
-            # 验证格式
-            if not isinstance(generated_event, dict):
-                logger.error("LLM返回的不是字典格式")
+            if use_cache:
+                generated_event = await EventContent.get_or_generate("dynamic_event", character, generate)
+            else:
+                generated_event = await generate()
+            if not generated_event:
                 return None
 
-            required_fields = ["event_name", "event_category", "event_emoji", "story_text", "choices"]
-            for field in required_fields:
-                if field not in generated_event:
-                    logger.error(f"LLM返回缺少必要字段: {field}")
-                    return None
-
             # 补充一些元信息
             generated_event["name"] = generated_event["event_name"]
             generated_event["category"] = generated_event["event_category"]
@@ -811,9 +739,12 @@ class RandomEventSystem:
             logger.info(f"成功生成动态事件: {generated_event['event_name']} ({generated_event['event_category']})")
             return generated_event
 
-        except json.JSONDecodeError as e:
-            logger.error(f"解析LLM返回的JSON失败: {e}\n原始内容: {ai_response}")
-            return None
         except Exception as e:
             logger.error(f"生成动态事件失败: {e}", exc_info=True)
             return None
+
+# 事件触发条件在加载时编译一次（元组为闭区间，其他值精确匹配）
+RandomEventSystem._TRIGGER_RULES = ConditionCompiler.compile_rules(
+    {event_id: event_data.get("trigger_conditions", {}) for event_id, event_data in RandomEventSystem.EVENTS.items()},
+    "event"
+)
@@ -0,0 +1,169 @@
+"""
+延迟后果调度器 - 基于最小堆的定时调度
+
+核心机制：
+- 启动时从 DTEvent 一次性加载所有 pending 的延迟后果
+- 每个 (user_id, chat_id) 维护一个按触发时间排序的最小堆，
+  "是否有到期后果" 只需查看堆顶，O(1)
+- 到期事件在同一个事务中从 pending 改为 triggered，
+  只有真正被本次更新认领的行才会触发，重启或并发时不会重复触发
+- 处于工作单元中时，认领随命令的事务一起提交；回滚时事件重新入堆，
+  下次仍会触发
+"""
+
+import heapq
+import time
+from typing import Dict, List, Tuple
+
+from src.common.logger import get_logger
+
+from ...core.models import DTEvent, dt_db
+from ...core.db_executor import DBExecutor
+from ...core.unit_of_work import UnitOfWork
+
+logger = get_logger("dt_consequence_scheduler")
+
+
+class ConsequenceScheduler:
+    """延迟后果调度器"""
+
+    # 调度堆 {(user_id, chat_id): [(触发时间, event_id), ...]}
+    _heaps: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+
+    # 是否已从数据库加载
+    _loaded: bool = False
+
+    @staticmethod
+    def load():
+        """从数据库加载所有待触发的延迟后果（启动时调用一次）"""
+        ConsequenceScheduler._heaps = {}
+
+        rows = (
+            DTEvent.select(DTEvent.event_id, DTEvent.user_id, DTEvent.chat_id, DTEvent.timestamp)
+            .where(
+                (DTEvent.event_type == "delayed_consequence")
+                & (DTEvent.outcome == "pending")
+            )
+        )
+
+        count = 0
+        for row in rows:
+            heap = ConsequenceScheduler._heaps.setdefault((row.user_id, row.chat_id), [])
+            heap.append((row.timestamp, row.event_id))
+            count += 1
+
+        for heap in ConsequenceScheduler._heaps.values():
+            heapq.heapify(heap)
+
+        ConsequenceScheduler._loaded = True
+        logger.info(f"延迟后果调度器加载完成: {count}个待触发")
+
+    @staticmethod
+    def _ensure_loaded():
+        if not ConsequenceScheduler._loaded:
+            ConsequenceScheduler.load()
+
+    @staticmethod
+    def schedule(user_id: str, chat_id: str, trigger_time: float, event_id: str):
+        """登记一个新的延迟后果（数据库行写入后调用）"""
+        ConsequenceScheduler._ensure_loaded()
+        heap = ConsequenceScheduler._heaps.setdefault((user_id, chat_id), [])
+        heapq.heappush(heap, (trigger_time, event_id))
+
+    @staticmethod
+    def has_due(user_id: str, chat_id: str, now: float = None) -> bool:
+        """检查该用户是否有到期的延迟后果"""
+        ConsequenceScheduler._ensure_loaded()
+        heap = ConsequenceScheduler._heaps.get((user_id, chat_id))
+        if not heap:
+            return False
+        return heap[0][0] <= (now if now is not None else time.time())
+
+    @staticmethod
+    async def claim_due(user_id: str, chat_id: str, now: float = None) -> List[Dict]:
+        """
+        认领所有到期的延迟后果
+        在一个事务中把 pending 批量更新为 triggered，只返回本次认领成功的事件
+        """
+        due = ConsequenceScheduler._pop_due(user_id, chat_id, now)
+        if not due:
+            return []
+
+        due_ids = [event_id for _, event_id in due]
+
+        uow = UnitOfWork.current()
+        if uow is None:
+            return await DBExecutor.write(ConsequenceScheduler._claim_rows, due_ids)
+
+        # 工作单元中：条件更新随命令事务提交，回滚时重新入堆
+        rows = await DBExecutor.read(ConsequenceScheduler._pending_rows, due_ids)
+        if rows:
+            uow.add(ConsequenceScheduler._mark_triggered, [row["event_id"] for row in rows])
+            uow.on_rollback(lambda: ConsequenceScheduler._requeue(user_id, chat_id, due))
+
+        for row in rows:
+            row["outcome"] = "triggered"
+
+        return rows
+
+    @staticmethod
+    def _pop_due(user_id: str, chat_id: str, now: float = None) -> List[Tuple[float, str]]:
+        """从调度堆中弹出所有到期项 [(触发时间, event_id)]"""
+        now = now if now is not None else time.time()
+        key = (user_id, chat_id)
+        heap = ConsequenceScheduler._heaps.get(key)
+
+        due = []
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap))
+        if heap is not None and not heap:
+            del ConsequenceScheduler._heaps[key]
+
+        return due
+
+    @staticmethod
+    def _requeue(user_id: str, chat_id: str, due: List[Tuple[float, str]]):
+        """把未能提交的到期项放回调度堆"""
+        heap = ConsequenceScheduler._heaps.setdefault((user_id, chat_id), [])
+        for item in due:
+            heapq.heappush(heap, item)
+
+    @staticmethod
+    def _claim_rows(event_ids: List[str]) -> List[Dict]:
+        """把仍为 pending 的事件标记为 triggered 并返回（在数据库写线程中执行）"""
+        # IMMEDIATE 事务先拿写锁，避免多个进程同时读到同一批 pending 行
+        with dt_db.atomic(lock_type="IMMEDIATE"):
+            rows = ConsequenceScheduler._pending_rows(event_ids)
+            if rows:
+                ConsequenceScheduler._mark_triggered([row["event_id"] for row in rows])
+
+        for row in rows:
+            row["outcome"] = "triggered"
+
+        return rows
+
+    @staticmethod
+    def _pending_rows(event_ids: List[str]) -> List[Dict]:
+        """查询仍为 pending 的事件"""
+        return list(
+            DTEvent.select()
+            .where(
+                (DTEvent.event_id.in_(event_ids))
+                & (DTEvent.outcome == "pending")
+            )
+            .order_by(DTEvent.timestamp)
+            .dicts()
+        )
+
+    @staticmethod
+    def _mark_triggered(event_ids: List[str]):
+        """把仍为 pending 的事件标记为 triggered"""
+        DTEvent.update(outcome="triggered").where(
+            (DTEvent.event_id.in_(event_ids))
+            & (DTEvent.outcome == "pending")
+        ).execute()
+
+    @staticmethod
+    def forget(user_id: str, chat_id: str):
+        """丢弃该用户的调度（重开游戏时调用）"""
+        ConsequenceScheduler._heaps.pop((user_id, chat_id), None)
@@ -9,10 +9,11 @@ import json
 import random
 from typing import Dict, List, Tuple, Optional
 
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
 from ...core.models import DTEvent
+from ...core.unit_of_work import UnitOfWork
+from .consequence_scheduler import ConsequenceScheduler
 
 logger = get_logger("dt_delayed_consequence")
 
@@ -108,7 +109,7 @@ class DelayedConsequenceSystem:
         # 创建事件记录
         event_id = f"delayed_{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
 
-        await database_api.db_save(
+        await UnitOfWork.save(
             DTEvent,
             data={
                 "event_id": event_id,
@@ -130,6 +131,13 @@ class DelayedConsequenceSystem:
             key_value=event_id
         )
 
+        # 事件提交后再加入调度堆
+        uow = UnitOfWork.current()
+        if uow is not None:
+            uow.on_commit(lambda: ConsequenceScheduler.schedule(user_id, chat_id, trigger_time, event_id))
+        else:
+            ConsequenceScheduler.schedule(user_id, chat_id, trigger_time, event_id)
+
         logger.info(f"安排延迟后果: {consequence_type}, {delay_days}天后触发")
 
     @staticmethod
@@ -142,50 +150,31 @@ class DelayedConsequenceSystem:
 
         返回: 应该触发的后果列表
         """
-        # 获取所有pending的延迟后果事件
-        pending_events = await database_api.db_get(
-            DTEvent,
-            filters={
-                "user_id": user_id,
-                "chat_id": chat_id,
-                "event_type": "delayed_consequence",
-                "outcome": "pending"
-            }
-        )
-
-        if not pending_events:
+        # 调度堆堆顶未到期时直接返回，不访问数据库
+        if not ConsequenceScheduler.has_due(user_id, chat_id):
             return []
 
-        # 筛选出时间已到的事件
-        current_time = time.time()
+        # 批量认领到期事件（同一事务内标记为已触发）
+        due_events = await ConsequenceScheduler.claim_due(user_id, chat_id)
+
         triggered_consequences = []
 
-        for event in pending_events:
-            if event["timestamp"] <= current_time:
-                # 解析事件数据
-                event_data = json.loads(event.get("event_data", "{}"))
-                consequence_type = event["event_name"]
-
-                if consequence_type in DelayedConsequenceSystem.CONSEQUENCE_TYPES:
-                    consequence_def = DelayedConsequenceSystem.CONSEQUENCE_TYPES[consequence_type]
-
-                    triggered_consequences.append({
-                        "event_id": event["event_id"],
-                        "type": consequence_type,
-                        "name": consequence_def["name"],
-                        "message": random.choice(consequence_def["messages"]),
-                        "consequence": event_data.get("consequence", {}),
-                        "trigger_action": event_data.get("trigger_action", ""),
-                    })
-
-                    # 标记为已触发
-                    event["outcome"] = "triggered"
-                    await database_api.db_save(
-                        DTEvent,
-                        data=event,
-                        key_field="event_id",
-                        key_value=event["event_id"]
-                    )
+        for event in due_events:
+            # 解析事件数据
+            event_data = json.loads(event.get("event_data", "{}"))
+            consequence_type = event["event_name"]
+
+            if consequence_type in DelayedConsequenceSystem.CONSEQUENCE_TYPES:
+                consequence_def = DelayedConsequenceSystem.CONSEQUENCE_TYPES[consequence_type]
+
+                triggered_consequences.append({
+                    "event_id": event["event_id"],
+                    "type": consequence_type,
+                    "name": consequence_def["name"],
+                    "message": random.choice(consequence_def["messages"]),
+                    "consequence": event_data.get("consequence", {}),
+                    "trigger_action": event_data.get("trigger_action", ""),
+                })
 
         return triggered_consequences
 
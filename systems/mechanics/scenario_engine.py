@@ -7,6 +7,8 @@ import random
 from typing import Dict, List
 from datetime import datetime
 
+from ...utils.condition_compiler import ConditionCompiler
+
 
 class ScenarioEngine:
     """情境触发引擎"""
@@ -121,27 +123,9 @@ class ScenarioEngine:
         """检查可触发的情境"""
         triggered = []
 
-        for scenario_id, scenario_def in ScenarioEngine.SCENARIOS.items():
-            # 检查基础条件
-            conditions_met = True
-            conditions = scenario_def.get("conditions", {})
-
-            for attr, required in conditions.items():
-                if isinstance(required, str) and required.startswith("<"):
-                    # 小于条件
-                    threshold = int(required[1:])
-                    if character.get(attr, 0) >= threshold:
-                        conditions_met = False
-                        break
-                else:
-                    # 大于等于条件
-                    threshold = int(required)
-                    if character.get(attr, 0) < threshold:
-                        conditions_met = False
-                        break
-
-            if not conditions_met:
-                continue
+        # 一次判定所有情境的基础条件
+        for scenario_id in ScenarioEngine._CONDITION_RULES.matching(character):
+            scenario_def = ScenarioEngine.SCENARIOS[scenario_id]
 
             # 检查时间条件
             if "time_condition" in scenario_def:
@@ -163,3 +147,10 @@ class ScenarioEngine:
                 })
 
         return triggered
+
+
+# 情境基础条件在加载时编译一次
+ScenarioEngine._CONDITION_RULES = ConditionCompiler.compile_rules(
+    {scenario_id: scenario_def.get("conditions", {}) for scenario_id, scenario_def in ScenarioEngine.SCENARIOS.items()},
+    "threshold"
+)
@@ -9,10 +9,11 @@ import json
 from typing import List, Dict, Tuple, Optional
 import re
 
-from src.plugin_system.apis import database_api
 from src.common.logger import get_logger
 
 from ...core.models import DTMemory, DTEvent
+from ...core.unit_of_work import UnitOfWork
+from ...core.db_executor import DBExecutor
 
 logger = get_logger("dt_memory_engine")
 
@@ -77,7 +78,7 @@ class MemoryEngine:
 
         memory_id = f"mem_{int(time.time() * 1000000)}_{random.randint(1000, 9999)}"
 
-        await database_api.db_save(
+        await UnitOfWork.save(
             DTMemory,
             data={
                 "memory_id": memory_id,
@@ -142,7 +143,7 @@ class MemoryEngine:
         返回: (是否违背, 违背的承诺, 惩罚效果)
         """
         # 获取所有承诺记忆
-        promises = await database_api.db_get(
+        promises = await DBExecutor.db_get(
             DTMemory,
             filters={"user_id": user_id, "chat_id": chat_id, "memory_type": "promise"},
             order_by="-timestamp",
@@ -204,13 +205,20 @@ class MemoryEngine:
         连续3次同样的行为 = 形成习惯
         """
         # 获取最近的行为记录
-        recent_actions = await database_api.db_get(
+        recent_actions = await DBExecutor.db_get(
             DTEvent,
             filters={"user_id": user_id, "chat_id": chat_id, "event_type": "interaction"},
             order_by="-timestamp",
             limit=10
         )
 
+        # 合并本次命令中尚未提交的互动事件
+        pending_actions = UnitOfWork.pending_rows(
+            DTEvent, user_id=user_id, chat_id=chat_id, event_type="interaction"
+        )
+        if pending_actions:
+            recent_actions = (pending_actions + list(recent_actions or []))[:10]
+
         if not recent_actions:
             return
 
@@ -220,7 +228,7 @@ class MemoryEngine:
         # 形成习惯
         if action_count >= 3:
             # 检查是否已经记录过这个习惯
-            existing_habit = await database_api.db_get(
+            existing_habit = await DBExecutor.db_get(
                 DTMemory,
                 filters={
                     "user_id": user_id,
@@ -236,7 +244,9 @@ class MemoryEngine:
             if existing_habit and action_name in existing_habit.get("content", ""):
                 # 更新习惯强度
                 existing_habit["importance"] = min(10, existing_habit.get("importance", 5) + 1)
-                await database_api.db_save(
+                # 强化视同一次回忆：保留期限从最近一次强化算起，仍在持续的习惯不会过期
+                existing_habit["last_recalled"] = time.time()
+                await UnitOfWork.save(
                     DTMemory,
                     data=existing_habit,
                     key_field="memory_id",
@@ -269,7 +279,7 @@ class MemoryEngine:
         返回: (是否期待落空, 期待内容)
         """
         # 获取习惯记忆
-        habits = await database_api.db_get(
+        habits = await DBExecutor.db_get(
             DTMemory,
             filters={"user_id": user_id, "chat_id": chat_id, "memory_type": "habit"},
             order_by="-importance",
@@ -280,7 +290,7 @@ class MemoryEngine:
             return False, None
 
         # 获取最近的互动
-        recent_events = await database_api.db_get(
+        recent_events = await DBExecutor.db_get(
             DTEvent,
             filters={"user_id": user_id, "chat_id": chat_id, "event_type": "interaction"},
             order_by="-timestamp",
@@ -316,7 +326,7 @@ class MemoryEngine:
         """获取相关记忆（强化版）"""
         filters = {"user_id": user_id, "chat_id": chat_id}
 
-        memories = await database_api.db_get(
+        memories = await DBExecutor.db_get(
             DTMemory,
             filters=filters,
             limit=limit * 3,  # 获取更多候选
@@ -351,7 +361,7 @@ class MemoryEngine:
     @staticmethod
     async def recall_memory(memory_id: str):
         """回忆记忆（更新统计）"""
-        memory = await database_api.db_get(
+        memory = await DBExecutor.db_get(
             DTMemory,
             filters={"memory_id": memory_id},
             single_result=True
@@ -361,7 +371,7 @@ class MemoryEngine:
             memory["recall_count"] = memory.get("recall_count", 0) + 1
             memory["last_recalled"] = time.time()
 
-            await database_api.db_save(
+            await DBExecutor.db_save(
                 DTMemory,
                 data=memory,
                 key_field="memory_id",
@@ -376,28 +386,28 @@ class MemoryEngine:
         返回: 格式化的记忆摘要字符串
         """
         # 获取不同类型的关键记忆
-        promises = await database_api.db_get(
+        promises = await DBExecutor.db_get(
             DTMemory,
             filters={"user_id": user_id, "chat_id": chat_id, "memory_type": "promise"},
             order_by="-timestamp",
             limit=3
         )
 
-        contradictions = await database_api.db_get(
+        contradictions = await DBExecutor.db_get(
             DTMemory,
             filters={"user_id": user_id, "chat_id": chat_id, "memory_type": "contradiction"},
             order_by="-timestamp",
             limit=2
         )
 
-        habits = await database_api.db_get(
+        habits = await DBExecutor.db_get(
             DTMemory,
             filters={"user_id": user_id, "chat_id": chat_id, "memory_type": "habit"},
             order_by="-importance",
             limit=2
         )
 
-        traumas = await database_api.db_get(
+        traumas = await DBExecutor.db_get(
             DTMemory,
             filters={"user_id": user_id, "chat_id": chat_id, "memory_type": "trauma"},
             order_by="-timestamp",
@@ -0,0 +1,341 @@
+"""
+数据保留引擎 - 控制 DTEvent/DTMemory 的增长
+
+核心机制：
+- 记忆按类型过期：TTL 由 MemoryEngine.MEMORY_TYPES 的 decay_rate 推导，
+  decay_rate 为 0 的记忆（里程碑、创伤）永久保留
+- 旧的 interaction 事件压缩为按日汇总（DTInteractionDaily），
+  每个角色始终保留最近若干条原始事件，供历史记忆和习惯追踪使用
+- 已触发的延迟后果在一段时间后清理，已过期的持久化冷却直接删除
+- 被删除的行先写入 gzip 压缩的 JSONL 归档文件
+- 后台定时执行，结束后 ANALYZE，可回收空间足够多时 VACUUM
+"""
+
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import time
+from typing import Dict, List
+
+from src.common.logger import get_logger
+
+from ...core.models import DTEvent, DTMemory, DTInteractionDaily, dt_db, DB_PATH, PLUGIN_DIR
+from ...core.db_executor import DBExecutor
+from ..time.cooldown_store import SQLiteCooldownStore
+from .memory_engine import MemoryEngine
+
+logger = get_logger("dt_retention")
+
+
+class RetentionEngine:
+    """数据保留引擎"""
+
+    # 默认配置（可通过 configure() 覆盖，对应 config.toml 的 [retention]）
+    CONFIG = {
+        "enabled": True,
+        "interval_hours": 6,
+        # 记忆TTL = memory_ttl_base_days / decay_rate
+        "memory_ttl_base_days": 3,
+        # 超过该天数的 interaction 事件压缩为日汇总
+        "interaction_rollup_days": 7,
+        # 每个角色始终保留的最近原始互动数
+        "keep_recent_interactions": 20,
+        # 已触发的延迟后果保留天数
+        "triggered_consequence_days": 7,
+        "archive_enabled": True,
+        # 空闲页占比超过该值时执行 VACUUM
+        "vacuum_free_ratio": 0.2,
+    }
+
+    ARCHIVE_DIR = os.path.join(PLUGIN_DIR, "archive")
+
+    # 每批删除的行数（避免 SQLite 变量数上限）
+    DELETE_BATCH = 500
+
+    _task = None
+    _last_report: Dict = {}
+
+    @staticmethod
+    def configure(**options):
+        """覆盖默认配置"""
+        for key, value in options.items():
+            if key in RetentionEngine.CONFIG and value is not None:
+                RetentionEngine.CONFIG[key] = value
+
+    @staticmethod
+    def get_memory_ttl_days(memory_type: str) -> float:
+        """
+        根据记忆类型的衰减率计算保留天数
+        返回: 天数，0 表示永久保留
+        """
+        decay_rate = MemoryEngine.MEMORY_TYPES.get(memory_type, {}).get("decay_rate", 0.0)
+        if decay_rate <= 0:
+            return 0
+        return RetentionEngine.CONFIG["memory_ttl_base_days"] / decay_rate
+
+    @staticmethod
+    def start_background(loop=None):
+        """启动后台定时任务"""
+        if not RetentionEngine.CONFIG["enabled"] or RetentionEngine._task is not None:
+            return
+
+        async def run_forever():
+            interval = RetentionEngine.CONFIG["interval_hours"] * 3600
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await DBExecutor.write(RetentionEngine.run_once)
+                except Exception as e:
+                    logger.error(f"数据保留任务失败: {e}", exc_info=True)
+
+        loop = loop or asyncio.get_event_loop()
+        RetentionEngine._task = loop.create_task(run_forever())
+        logger.info(f"数据保留任务已启动，每{RetentionEngine.CONFIG['interval_hours']}小时执行一次")
+
+    @staticmethod
+    def run_once(now: float = None) -> Dict:
+        """
+        执行一次完整的保留流程（同步，应在数据库写线程中调用）
+        返回: 统计报告
+        """
+        now = now if now is not None else time.time()
+        started = time.perf_counter()
+        size_before = RetentionEngine._db_size()
+
+        report = {
+            "memories_expired": RetentionEngine.expire_memories(now),
+            "events_rolled_up": RetentionEngine.rollup_interactions(now),
+            "consequences_pruned": RetentionEngine.prune_triggered_consequences(now),
+            "cooldowns_pruned": SQLiteCooldownStore.delete_expired_rows(now),
+        }
+
+        report["vacuumed"] = RetentionEngine.optimize()
+
+        size_after = RetentionEngine._db_size()
+        report.update({
+            "db_bytes_before": size_before,
+            "db_bytes_after": size_after,
+            "bytes_reclaimed": max(0, size_before - size_after),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "finished_at": now,
+        })
+
+        RetentionEngine._last_report = report
+        logger.info(
+            f"数据保留完成: 过期记忆{report['memories_expired']}条, "
+            f"压缩互动{report['events_rolled_up']}条, "
+            f"清理后果{report['consequences_pruned']}条, "
+            f"清理冷却{report['cooldowns_pruned']}条, "
+            f"回收{report['bytes_reclaimed'] / 1024:.1f}KB, 耗时{report['duration_ms']}ms"
+        )
+        return report
+
+    @staticmethod
+    def get_last_report() -> Dict:
+        """获取最近一次执行的统计报告"""
+        return dict(RetentionEngine._last_report)
+
+    @staticmethod
+    def expire_memories(now: float) -> int:
+        """按记忆类型 TTL 删除过期记忆（从创建或最近一次回忆/习惯强化算起）"""
+        expired_total = 0
+
+        for memory_type in MemoryEngine.MEMORY_TYPES:
+            ttl_days = RetentionEngine.get_memory_ttl_days(memory_type)
+            if ttl_days <= 0:
+                continue
+
+            cutoff = now - ttl_days * 86400
+            rows = list(
+                DTMemory.select()
+                .where(
+                    (DTMemory.memory_type == memory_type)
+                    & (DTMemory.timestamp < cutoff)
+                    # 近期被回忆过的记忆继续保留
+                    & ((DTMemory.last_recalled.is_null()) | (DTMemory.last_recalled < cutoff))
+                )
+                .dicts()
+            )
+            if not rows:
+                continue
+
+            RetentionEngine._archive("dt_memory", rows, now)
+            RetentionEngine._delete_ids(DTMemory, [row["id"] for row in rows])
+            expired_total += len(rows)
+
+        return expired_total
+
+    @staticmethod
+    def rollup_interactions(now: float) -> int:
+        """把旧的 interaction 事件压缩为按日汇总"""
+        cutoff = now - RetentionEngine.CONFIG["interaction_rollup_days"] * 86400
+        keep_recent = RetentionEngine.CONFIG["keep_recent_interactions"]
+
+        owners = (
+            DTEvent.select(DTEvent.user_id, DTEvent.chat_id)
+            .where((DTEvent.event_type == "interaction") & (DTEvent.timestamp < cutoff))
+            .group_by(DTEvent.user_id, DTEvent.chat_id)
+            .tuples()
+        )
+
+        rolled_total = 0
+        for user_id, chat_id in list(owners):
+            owner_filter = (
+                (DTEvent.user_id == user_id)
+                & (DTEvent.chat_id == chat_id)
+                & (DTEvent.event_type == "interaction")
+            )
+
+            # 最近 keep_recent 条始终保留
+            owner_cutoff = cutoff
+            if keep_recent > 0:
+                newest = (
+                    DTEvent.select(DTEvent.timestamp)
+                    .where(owner_filter)
+                    .order_by(DTEvent.timestamp.desc())
+                    .offset(keep_recent - 1)
+                    .limit(1)
+                    .scalar()
+                )
+                if newest is None:
+                    continue
+                owner_cutoff = min(cutoff, newest)
+
+            rows = list(
+                DTEvent.select()
+                .where(owner_filter & (DTEvent.timestamp < owner_cutoff))
+                .dicts()
+            )
+            if not rows:
+                continue
+
+            with dt_db.atomic():
+                RetentionEngine._merge_daily(user_id, chat_id, rows)
+                RetentionEngine._archive("dt_event", rows, now)
+                RetentionEngine._delete_ids(DTEvent, [row["id"] for row in rows])
+            rolled_total += len(rows)
+
+        return rolled_total
+
+    @staticmethod
+    def prune_triggered_consequences(now: float) -> int:
+        """清理早已触发的延迟后果事件"""
+        cutoff = now - RetentionEngine.CONFIG["triggered_consequence_days"] * 86400
+        rows = list(
+            DTEvent.select()
+            .where(
+                (DTEvent.event_type == "delayed_consequence")
+                & (DTEvent.outcome == "triggered")
+                & (DTEvent.timestamp < cutoff)
+            )
+            .dicts()
+        )
+        if not rows:
+            return 0
+
+        RetentionEngine._archive("dt_event", rows, now)
+        RetentionEngine._delete_ids(DTEvent, [row["id"] for row in rows])
+        return len(rows)
+
+    @staticmethod
+    def optimize() -> bool:
+        """
+        ANALYZE 更新统计信息，空闲页足够多时 VACUUM
+        返回: 是否执行了 VACUUM
+        """
+        dt_db.execute_sql("ANALYZE")
+
+        page_count = dt_db.execute_sql("PRAGMA page_count").fetchone()[0]
+        freelist_count = dt_db.execute_sql("PRAGMA freelist_count").fetchone()[0]
+        if page_count <= 0 or freelist_count / page_count < RetentionEngine.CONFIG["vacuum_free_ratio"]:
+            return False
+
+        dt_db.execute_sql("VACUUM")
+        return True
+
+    @staticmethod
+    def _merge_daily(user_id: str, chat_id: str, rows: List[Dict]):
+        """把事件合并进日汇总表"""
+        buckets: Dict[tuple, Dict] = {}
+        for row in rows:
+            day = datetime.datetime.fromtimestamp(row["timestamp"]).strftime("%Y-%m-%d")
+            bucket = buckets.setdefault((day, row["event_name"]), {
+                "count": 0,
+                "attribute_changes": {},
+                "first_timestamp": row["timestamp"],
+                "last_timestamp": row["timestamp"],
+            })
+            bucket["count"] += 1
+            bucket["first_timestamp"] = min(bucket["first_timestamp"], row["timestamp"])
+            bucket["last_timestamp"] = max(bucket["last_timestamp"], row["timestamp"])
+
+            try:
+                changes = json.loads(row.get("attribute_changes") or "{}")
+            except (TypeError, ValueError):
+                changes = {}
+            for attr, value in changes.items():
+                if isinstance(value, (int, float)):
+                    bucket["attribute_changes"][attr] = bucket["attribute_changes"].get(attr, 0) + value
+
+        for (day, event_name), bucket in buckets.items():
+            existing = DTInteractionDaily.get_or_none(
+                (DTInteractionDaily.user_id == user_id)
+                & (DTInteractionDaily.chat_id == chat_id)
+                & (DTInteractionDaily.day == day)
+                & (DTInteractionDaily.event_name == event_name)
+            )
+
+            if existing:
+                merged = json.loads(existing.attribute_changes or "{}")
+                for attr, value in bucket["attribute_changes"].items():
+                    merged[attr] = merged.get(attr, 0) + value
+                existing.count += bucket["count"]
+                existing.attribute_changes = json.dumps(merged, ensure_ascii=False)
+                existing.first_timestamp = min(existing.first_timestamp, bucket["first_timestamp"])
+                existing.last_timestamp = max(existing.last_timestamp, bucket["last_timestamp"])
+                existing.save()
+            else:
+                DTInteractionDaily.create(
+                    user_id=user_id,
+                    chat_id=chat_id,
+                    day=day,
+                    event_name=event_name,
+                    count=bucket["count"],
+                    attribute_changes=json.dumps(bucket["attribute_changes"], ensure_ascii=False),
+                    first_timestamp=bucket["first_timestamp"],
+                    last_timestamp=bucket["last_timestamp"],
+                )
+
+    @staticmethod
+    def _archive(table_name: str, rows: List[Dict], now: float):
+        """把即将删除的行追加到压缩归档文件"""
+        if not RetentionEngine.CONFIG["archive_enabled"] or not rows:
+            return
+
+        os.makedirs(RetentionEngine.ARCHIVE_DIR, exist_ok=True)
+        month = datetime.datetime.fromtimestamp(now).strftime("%Y%m")
+        archive_path = os.path.join(RetentionEngine.ARCHIVE_DIR, f"{table_name}_{month}.jsonl.gz")
+
+        # gzip 追加写入会生成多个成员，标准 gzip 读取时会自动拼接
+        with gzip.open(archive_path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _delete_ids(model, ids: List[int]):
+        """分批按主键删除"""
+        for offset in range(0, len(ids), RetentionEngine.DELETE_BATCH):
+            batch = ids[offset:offset + RetentionEngine.DELETE_BATCH]
+            model.delete().where(model.id.in_(batch)).execute()
+
+    @staticmethod
+    def _db_size() -> int:
+        """数据库文件大小（含 WAL）"""
+        total = 0
+        for suffix in ("", "-wal"):
+            path = DB_PATH + suffix
+            if os.path.exists(path):
+                total += os.path.getsize(path)
+        return total
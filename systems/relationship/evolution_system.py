@@ -7,6 +7,8 @@ import json
 
 from src.common.logger import get_logger
 
+from ...utils.condition_compiler import ConditionCompiler
+
 logger = get_logger("dt_evolution_system")
 
 
@@ -124,22 +126,10 @@ class EvolutionSystem:
             return False, None, None  # 已达最高阶段
 
         stage_info = EvolutionSystem.EVOLUTION_STAGES[next_stage]
-        requirements = stage_info["requirements"]
-
-        # 检查是否满足所有要求
-        for attr, required in requirements.items():
-            char_value = EvolutionSystem._get_char_value(character, attr, 0)
 
-            if isinstance(required, str) and required.startswith("<"):
-                # 小于条件
-                threshold = int(required[1:])
-                if char_value >= threshold:
-                    return False, None, None
-            else:
-                # 大于等于条件
-                threshold = int(required)
-                if char_value < threshold:
-                    return False, None, None
+        # 检查是否满足所有要求（预编译的阶段条件）
+        if not EvolutionSystem._STAGE_RULES.check(next_stage, character):
+            return False, None, None
 
         # 满足所有条件
         return True, next_stage, stage_info
@@ -212,20 +202,11 @@ class EvolutionSystem:
         if next_stage > 5:
             return 1.0, "████████████ 100%"
 
-        requirements = EvolutionSystem.EVOLUTION_STAGES[next_stage]["requirements"]
+        requirements = EvolutionSystem._STAGE_RULES.get(next_stage)
 
         # 计算满足的条件数
-        met_count = 0
-        total_count = len(requirements)
-
-        for attr, required in requirements.items():
-            char_value = EvolutionSystem._get_char_value(character, attr, 0)
-            if isinstance(required, str) and required.startswith("<"):
-                if char_value < int(required[1:]):
-                    met_count += 1
-            else:
-                if char_value >= int(required):
-                    met_count += 1
+        met_count = requirements.count_met(character)
+        total_count = len(requirements.clauses)
 
         progress = met_count / total_count if total_count > 0 else 1.0
         bar_length = 12
@@ -293,3 +274,10 @@ class EvolutionSystem:
         hint_text += f"\n\n解锁内容: {', '.join(stage_info['unlocks'])}"
 
         return hint_text
+
+
+# 各进化阶段的要求在加载时编译一次
+EvolutionSystem._STAGE_RULES = ConditionCompiler.compile_rules(
+    {stage: stage_info["requirements"] for stage, stage_info in EvolutionSystem.EVOLUTION_STAGES.items()},
+    "threshold"
+)
@@ -3,17 +3,40 @@
 """
 
 import time
-from typing import Dict, Optional, Tuple
+from typing import Optional, Tuple
 from src.common.logger import get_logger
 
+from .cooldown_store import MemoryCooldownStore, SQLiteCooldownStore, SharedMemoryCooldownStore
+
 logger = get_logger("dt_cooldown")
 
 
 class CooldownManager:
     """动作冷却管理器"""
 
-    # 存储冷却状态 {user_id_chat_id_action: timestamp}
-    _cooldowns: Dict[str, float] = {}
+    # 冷却存储后端（默认进程内存储，可通过 configure() 切换）
+    _store = MemoryCooldownStore()
+
+    # 设置冷却时未指定时长时的保留时间（秒）
+    DEFAULT_TTL = 86400
+
+    @staticmethod
+    def configure(backend: str = "memory", shared_name: str = "dt_cooldowns", shared_slots: int = 65536):
+        """
+        切换冷却存储后端
+        backend: memory(进程内) / sqlite(持久化) / shared(多进程共享内存)
+        """
+        if backend == "sqlite":
+            store = SQLiteCooldownStore()
+        elif backend == "shared":
+            store = SharedMemoryCooldownStore(name=shared_name, slots=shared_slots)
+        else:
+            if backend != "memory":
+                logger.warning(f"未知的冷却存储后端: {backend}，使用 memory")
+            store = MemoryCooldownStore()
+
+        CooldownManager._store = store
+        logger.info(f"冷却存储后端: {type(store).__name__}")
 
     @staticmethod
     def check_cooldown(
@@ -29,10 +52,12 @@ class CooldownManager:
         if cooldown_seconds <= 0:
             return True, None  # 无冷却限制
 
-        key = f"{user_id}_{chat_id}_{action_name}"
-        last_use = CooldownManager._cooldowns.get(key, 0)
+        now = time.time()
+        last_use = CooldownManager._store.get((user_id, chat_id, action_name), now)
+        if last_use is None:
+            return True, None
 
-        time_passed = time.time() - last_use
+        time_passed = now - last_use
         remaining = cooldown_seconds - time_passed
 
         if remaining > 0:
@@ -43,19 +68,18 @@ class CooldownManager:
             return True, None
 
     @staticmethod
-    def set_cooldown(user_id: str, chat_id: str, action_name: str):
-        """设置动作冷却"""
-        key = f"{user_id}_{chat_id}_{action_name}"
-        CooldownManager._cooldowns[key] = time.time()
-        logger.debug(f"设置冷却: {key}")
+    def set_cooldown(user_id: str, chat_id: str, action_name: str, cooldown_seconds: int = None):
+        """设置动作冷却（冷却结束后记录自动过期）"""
+        now = time.time()
+        ttl = cooldown_seconds if cooldown_seconds and cooldown_seconds > 0 else CooldownManager.DEFAULT_TTL
+        CooldownManager._store.set((user_id, chat_id, action_name), now, now + ttl)
+        logger.debug(f"设置冷却: {user_id}_{chat_id}_{action_name}")
 
     @staticmethod
     def clear_cooldown(user_id: str, chat_id: str, action_name: str):
         """清除动作冷却"""
-        key = f"{user_id}_{chat_id}_{action_name}"
-        if key in CooldownManager._cooldowns:
-            del CooldownManager._cooldowns[key]
-            logger.debug(f"清除冷却: {key}")
+        CooldownManager._store.delete((user_id, chat_id, action_name))
+        logger.debug(f"清除冷却: {user_id}_{chat_id}_{action_name}")
 
     @staticmethod
     def format_time(seconds: int) -> str:
@@ -75,14 +99,9 @@ class CooldownManager:
                 return f"{hours}小时"
 
     @staticmethod
-    def cleanup_expired(max_age_seconds: int = 86400):
-        """清理过期的冷却记录（默认1天）"""
-        now = time.time()
-        expired_keys = [
-            key for key, timestamp in CooldownManager._cooldowns.items()
-            if now - timestamp > max_age_seconds
-        ]
-        for key in expired_keys:
-            del CooldownManager._cooldowns[key]
-        if expired_keys:
-            logger.info(f"清理过期冷却记录: {len(expired_keys)}个")
+    def cleanup_expired() -> int:
+        """立即清理所有过期的冷却记录（各后端平时也会自动过期）"""
+        removed = CooldownManager._store.cleanup(time.time())
+        if removed:
+            logger.info(f"清理过期冷却记录: {removed}个")
+        return removed
@@ -0,0 +1,268 @@
+"""
+冷却存储后端
+
+所有后端提供相同的接口：
+- get(key, now)  -> 最近一次使用时间，没有或已过期时返回 None
+- set(key, last_use, expires_at)
+- delete(key)
+- cleanup(now)   -> 清理的条目数
+
+后端：
+- MemoryCooldownStore: 进程内字典 + 过期时间最小堆，检查 O(1)，过期条目自动移除
+- SQLiteCooldownStore: 在内存存储之上持久化到 dt_cooldown 表，重启后恢复
+- SharedMemoryCooldownStore: 共享内存中的定长开放寻址哈希表，供多个进程共享
+"""
+
+import asyncio
+import hashlib
+import heapq
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+from ...core.models import DTCooldown
+from ...core.db_executor import DBExecutor
+from ...core.unit_of_work import UnitOfWork
+
+logger = get_logger("dt_cooldown_store")
+
+# 冷却键 (user_id, chat_id, action_name)
+CooldownKey = Tuple[str, str, str]
+
+
+class MemoryCooldownStore:
+    """进程内冷却存储"""
+
+    # 每次读写时顺带清理的最大过期条目数（摊还 O(1)）
+    EXPIRE_BUDGET = 64
+
+    def __init__(self):
+        # {key: (最近使用时间, 过期时间)}
+        self._entries: Dict[CooldownKey, Tuple[float, float]] = {}
+        # [(过期时间, key)]，重复设置留下的旧项在弹出时跳过
+        self._expiry_heap: List[Tuple[float, CooldownKey]] = []
+
+    def get(self, key: CooldownKey, now: float) -> Optional[float]:
+        self._expire(now, self.EXPIRE_BUDGET)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[0]
+
+    def set(self, key: CooldownKey, last_use: float, expires_at: float):
+        self._entries[key] = (last_use, expires_at)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        self._expire(last_use, self.EXPIRE_BUDGET)
+
+    def delete(self, key: CooldownKey):
+        self._entries.pop(key, None)
+
+    def cleanup(self, now: float) -> int:
+        return self._expire(now, None)
+
+    def _expire(self, now: float, budget: Optional[int]) -> int:
+        """弹出堆顶已过期的条目"""
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and (budget is None or budget > 0):
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # 只有堆项与当前条目一致时才删除（条目可能已被重新设置）
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+                removed += 1
+            if budget is not None:
+                budget -= 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCooldownStore(MemoryCooldownStore):
+    """持久化冷却存储：读取走内存，写入同步到 dt_cooldown 表"""
+
+    def __init__(self):
+        super().__init__()
+        self.load()
+
+    def load(self):
+        """从数据库恢复未过期的冷却"""
+        now = time.time()
+        rows = DTCooldown.select().where(DTCooldown.expires_at > now)
+
+        count = 0
+        for row in rows:
+            super().set((row.user_id, row.chat_id, row.action_name), row.last_use, row.expires_at)
+            count += 1
+
+        logger.info(f"冷却存储加载完成: {count}条")
+
+    def set(self, key: CooldownKey, last_use: float, expires_at: float):
+        super().set(key, last_use, expires_at)
+        self._persist(SQLiteCooldownStore._upsert_row, key, last_use, expires_at)
+
+    def delete(self, key: CooldownKey):
+        super().delete(key)
+        self._persist(SQLiteCooldownStore._delete_row, key)
+
+    def cleanup(self, now: float) -> int:
+        removed = super().cleanup(now)
+        self._persist(SQLiteCooldownStore.delete_expired_rows, now)
+        return removed
+
+    @staticmethod
+    def _persist(func, *args):
+        """写入数据库：工作单元中随事务提交，否则交给写线程"""
+        uow = UnitOfWork.current()
+        if uow is not None:
+            uow.add(func, *args)
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            func(*args)
+            return
+
+        task = loop.create_task(DBExecutor.write(func, *args))
+        task.add_done_callback(SQLiteCooldownStore._log_failure)
+
+    @staticmethod
+    def _log_failure(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"冷却写入失败: {task.exception()}")
+
+    @staticmethod
+    def _upsert_row(key: CooldownKey, last_use: float, expires_at: float):
+        user_id, chat_id, action_name = key
+        DTCooldown.insert(
+            user_id=user_id,
+            chat_id=chat_id,
+            action_name=action_name,
+            last_use=last_use,
+            expires_at=expires_at,
+        ).on_conflict(
+            conflict_target=[DTCooldown.user_id, DTCooldown.chat_id, DTCooldown.action_name],
+            update={DTCooldown.last_use: last_use, DTCooldown.expires_at: expires_at},
+        ).execute()
+
+    @staticmethod
+    def _delete_row(key: CooldownKey):
+        user_id, chat_id, action_name = key
+        DTCooldown.delete().where(
+            (DTCooldown.user_id == user_id)
+            & (DTCooldown.chat_id == chat_id)
+            & (DTCooldown.action_name == action_name)
+        ).execute()
+
+    @staticmethod
+    def delete_expired_rows(now: float) -> int:
+        """删除已过期的冷却行"""
+        return DTCooldown.delete().where(DTCooldown.expires_at <= now).execute()
+
+
+class SharedMemoryCooldownStore:
+    """
+    多进程共享冷却存储
+
+    共享内存中的定长开放寻址哈希表，每个槽位为 (键哈希, 最近使用时间, 过期时间)。
+    过期的槽位可被复用，探测长度超过上限时覆盖最早过期的槽位。
+    进程间不加锁：并发写同一槽位时冷却可能短暂不准确，对冷却判断可以接受。
+    """
+
+    SLOT = struct.Struct("<Qdd")
+
+    # 最大线性探测长度
+    MAX_PROBE = 32
+
+    def __init__(self, name: str = "dt_cooldowns", slots: int = 65536):
+        from multiprocessing import shared_memory
+
+        size = slots * self.SLOT.size
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            logger.info(f"创建共享冷却存储: {name} ({slots}槽)")
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+            logger.info(f"连接共享冷却存储: {name}")
+
+        # 共享内存由所有进程共用，不随单个进程退出而删除
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+
+        self._buf = self._shm.buf
+        self._slots = min(slots, self._shm.size // self.SLOT.size)
+
+    @staticmethod
+    def _hash(key: CooldownKey) -> int:
+        digest = hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=8).digest()
+        # 0 表示空槽位
+        return int.from_bytes(digest, "little") or 1
+
+    def _read(self, index: int) -> Tuple[int, float, float]:
+        return self.SLOT.unpack_from(self._buf, index * self.SLOT.size)
+
+    def _write(self, index: int, key_hash: int, last_use: float, expires_at: float):
+        self.SLOT.pack_into(self._buf, index * self.SLOT.size, key_hash, last_use, expires_at)
+
+    def _probe(self, key_hash: int):
+        start = key_hash % self._slots
+        for offset in range(self.MAX_PROBE):
+            yield (start + offset) % self._slots
+
+    def get(self, key: CooldownKey, now: float) -> Optional[float]:
+        key_hash = self._hash(key)
+        for index in self._probe(key_hash):
+            slot_hash, last_use, expires_at = self._read(index)
+            if slot_hash == 0:
+                return None
+            if slot_hash == key_hash:
+                return last_use if expires_at > now else None
+        return None
+
+    def set(self, key: CooldownKey, last_use: float, expires_at: float):
+        key_hash = self._hash(key)
+        reusable = None
+        oldest = None
+
+        for index in self._probe(key_hash):
+            slot_hash, _, slot_expires = self._read(index)
+            if slot_hash == key_hash:
+                self._write(index, key_hash, last_use, expires_at)
+                return
+            if slot_hash == 0:
+                if reusable is None:
+                    reusable = index
+                break
+            if reusable is None and slot_expires <= last_use:
+                reusable = index
+            if oldest is None or slot_expires < oldest[1]:
+                oldest = (index, slot_expires)
+
+        target = reusable if reusable is not None else oldest[0]
+        self._write(target, key_hash, last_use, expires_at)
+
+    def delete(self, key: CooldownKey):
+        key_hash = self._hash(key)
+        for index in self._probe(key_hash):
+            slot_hash, _, _ = self._read(index)
+            if slot_hash == 0:
+                return
+            if slot_hash == key_hash:
+                # 保留哈希作为墓碑，不打断其他键的探测链
+                self._write(index, key_hash, 0.0, 0.0)
+                return
+
+    def cleanup(self, now: float) -> int:
+        # 过期槽位在写入时直接复用，无需清理
+        return 0
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - 复合索引基准测试
+在临时数据库中逐级扩大 DTEvent/DTMemory 规模，验证热点查询耗时保持平稳
+
+用法: python benchmark_query_indexes.py [最大行数，默认1000000]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.desire_theatre.core.models import (
+    init_dt_database, verify_query_plans, INDEX_PROBE_QUERIES, DTEvent, DTMemory, dt_db
+)
+
+USERS = 200
+BATCH = 5000
+REPEAT = 200
+
+EVENT_TYPES = ["interaction", "interaction", "interaction", "random", "delayed_consequence"]
+MEMORY_TYPES = ["promise", "habit", "contradiction", "milestone", "dialogue"]
+
+
+def fill_rows(start: int, end: int):
+    """批量写入 [start, end) 范围的事件与记忆"""
+    now = time.time()
+    with dt_db.atomic():
+        for offset in range(start, end, BATCH):
+            count = min(BATCH, end - offset)
+            DTEvent.insert_many([
+                {
+                    "event_id": f"bench_evt_{offset + i}",
+                    "user_id": f"user_{(offset + i) % USERS}",
+                    "chat_id": "bench_chat",
+                    "event_type": random.choice(EVENT_TYPES),
+                    "event_name": "摸头",
+                    "timestamp": now - random.random() * 86400 * 42,
+                    "outcome": "pending",
+                }
+                for i in range(count)
+            ]).execute()
+            DTMemory.insert_many([
+                {
+                    "memory_id": f"bench_mem_{offset + i}",
+                    "user_id": f"user_{(offset + i) % USERS}",
+                    "chat_id": "bench_chat",
+                    "timestamp": now - random.random() * 86400 * 42,
+                    "memory_type": random.choice(MEMORY_TYPES),
+                    "content": "bench",
+                    "importance": random.randint(1, 10),
+                }
+                for i in range(count)
+            ]).execute()
+
+
+def time_queries() -> dict:
+    """测量每条热点查询的平均耗时（毫秒）"""
+    timings = {}
+    for index_name, sql in INDEX_PROBE_QUERIES.items():
+        sql = sql.replace("'u'", "'user_7'").replace("'c'", "'bench_chat'")
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            dt_db.execute_sql(sql).fetchall()
+        timings[index_name] = (time.perf_counter() - started) * 1000 / REPEAT
+    return timings
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [size for size in (10_000, 100_000, 1_000_000, 10_000_000) if size <= max_rows]
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    dt_db.init(db_path)
+    init_dt_database()
+
+    print("=" * 60)
+    print("欲望剧场插件 - 复合索引基准测试")
+    print("=" * 60)
+
+    filled = 0
+    for size in sizes:
+        fill_rows(filled, size)
+        filled = size
+        dt_db.execute_sql("ANALYZE")
+
+        plans = verify_query_plans()
+        print(f"\n📊 每表 {size:,} 行")
+        for index_name, ms in time_queries().items():
+            used = plans[index_name]
+            mark = "⏭️" if used is None else ("✅" if used else "❌")
+            print(f"  {mark} {index_name:<45} {ms:.3f} ms")
+
+    dt_db.close()
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
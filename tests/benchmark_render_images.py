@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - 图片渲染基准测试
+对比逐行画线的旧渐变与当前渐变背景的耗时，并测量 1920 宽状态图的完整渲染耗时
+（直接调用 _render_* 绕过渲染缓存；状态图分别测量静态层未缓存和已缓存、数值每次变化的情况）
+
+用法: python benchmark_render_images.py [重复次数，默认20]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image, ImageDraw
+
+from plugins.desire_theatre.utils.help_image_generator import HelpImageGenerator
+
+WIDTH = 1920
+HEIGHTS = (600, 1200, 2400)
+
+STATUS_CONTENT = {
+    "基础属性": {"好感": "65/100", "亲密": "40/100", "信任": "55/100", "顺从": "30/100"},
+    "欲望属性": {"欲望": "45/100", "堕落": "20/100", "兴奋": "35/100", "抵抗": "60/100", "羞耻": "70/100"},
+    "状态": {"关系阶段": "朋友", "心情": "开心", "爱心币": "320", "游戏日": "第 12 天"},
+}
+
+
+def status_content(i: int) -> dict:
+    """数值每次都变化的状态内容（排版结构不变）"""
+    return {**STATUS_CONTENT, "状态": {**STATUS_CONTENT["状态"], "爱心币": str(i)}}
+
+
+def legacy_gradient(width: int, height: int) -> Image.Image:
+    """旧实现：逐行画线（每行新建 ImageDraw）"""
+    base = Image.new('RGB', (width, height), HelpImageGenerator.BG_START_COLOR)
+    for y in range(height):
+        r1, g1, b1 = HelpImageGenerator.BG_START_COLOR
+        r2, g2, b2 = HelpImageGenerator.BG_END_COLOR
+        ratio = y / height
+        r = int(r1 + (r2 - r1) * ratio)
+        g = int(g1 + (g2 - g1) * ratio)
+        b = int(b1 + (b2 - b1) * ratio)
+        draw = ImageDraw.Draw(base)
+        draw.line([(0, y), (width, y)], fill=(r, g, b))
+    return base
+
+
+def time_call(func, repeat: int) -> float:
+    """平均耗时（毫秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print("=" * 60)
+    print(f"渐变背景 (宽 {WIDTH}, 重复 {repeat} 次)")
+    print("=" * 60)
+    for height in HEIGHTS:
+        legacy_ms = time_call(lambda: legacy_gradient(WIDTH, height), repeat)
+        gradient_ms = time_call(lambda: HelpImageGenerator._gradient_image(WIDTH, height), repeat)
+
+        # 新渐变必须与逐行画线逐像素一致
+        identical = legacy_gradient(WIDTH, height).tobytes() == HelpImageGenerator._gradient_image(WIDTH, height).tobytes()
+
+        HelpImageGenerator._background_cache.clear()
+        cold_ms = time_call(lambda: (HelpImageGenerator._background_cache.clear(),
+                                     HelpImageGenerator._create_gradient_background(WIDTH, height)), repeat)
+        warm_ms = time_call(lambda: HelpImageGenerator._create_gradient_background(WIDTH, height), repeat)
+
+        print(f"高 {height:5d}: 逐行画线 {legacy_ms:8.2f}ms | 列拉伸 {gradient_ms:7.2f}ms "
+              f"({'一致' if identical else '不一致!'}) | 背景(未缓存) {cold_ms:7.2f}ms | 背景(缓存) {warm_ms:6.2f}ms")
+
+    print()
+    print("=" * 60)
+    print(f"状态图完整渲染 (宽 {WIDTH})")
+    print("=" * 60)
+    HelpImageGenerator._background_cache.clear()
+    HelpImageGenerator._status_templates.clear()
+    first_ms = time_call(lambda: HelpImageGenerator._render_status_image("角色状态", STATUS_CONTENT, WIDTH), 1)
+
+    counter = iter(range(10 ** 9))
+    cold_ms = time_call(lambda: (HelpImageGenerator._status_templates.clear(),
+                                 HelpImageGenerator._render_status_image("角色状态", status_content(next(counter)), WIDTH)), repeat)
+    warm_ms = time_call(lambda: HelpImageGenerator._render_status_image("角色状态", status_content(next(counter)), WIDTH), repeat)
+    cached_ms = time_call(lambda: HelpImageGenerator.generate_status_image("角色状态", STATUS_CONTENT, WIDTH), repeat)
+    print(f"首次 {first_ms:.2f}ms | 静态层未缓存 {cold_ms:.2f}ms | 静态层已缓存 {warm_ms:.2f}ms | 渲染缓存命中 {cached_ms:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - 延迟后果结算测试
+验证到期后果在动作的工作单元之外认领：动作回滚后，后果不会重新入队并再次展示
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.desire_theatre.core.models import init_dt_database, dt_db, DTEvent
+from plugins.desire_theatre.core.character_cache import CharacterCache
+from plugins.desire_theatre.core.db_executor import DBExecutor
+from plugins.desire_theatre.core.unit_of_work import UnitOfWork
+from plugins.desire_theatre.systems.actions import action_handler
+from plugins.desire_theatre.systems.actions.action_handler import ActionHandler
+from plugins.desire_theatre.systems.mechanics.consequence_scheduler import ConsequenceScheduler
+
+print("=" * 60)
+print("欲望剧场插件 - 延迟后果结算测试")
+print("=" * 60)
+
+results = {"passed": 0, "failed": 0}
+
+USER_ID = "consequence_user"
+CHAT_ID = "consequence_chat"
+
+
+def test(name: str):
+    """测试装饰器"""
+    def decorator(func):
+        def wrapper():
+            print(f"\n测试: {name}")
+            try:
+                asyncio.run(func())
+                results["passed"] += 1
+                print(f"✅ {name} - 通过")
+            except Exception as e:
+                results["failed"] += 1
+                print(f"❌ {name} - 失败: {e!r}")
+        return wrapper
+    return decorator
+
+
+db_dir = tempfile.TemporaryDirectory()
+dt_db.init(os.path.join(db_dir.name, "consequence_test.db"))
+init_dt_database()
+
+
+@test("动作回滚后已展示的延迟后果不再重复触发")
+async def test_rollback_does_not_requeue():
+    DBExecutor._run(CharacterCache._write_row, USER_ID, CHAT_ID, {"personality_type": "tsundere", "trust": 50})
+    DBExecutor._run(DTEvent.create, **{
+        "event_id": "delayed_test",
+        "user_id": USER_ID,
+        "chat_id": CHAT_ID,
+        "event_type": "delayed_consequence",
+        "event_name": "forced_action",
+        "timestamp": time.time() - 1,
+        "event_data": json.dumps({"trigger_action": "强迫", "consequence": {"trust": -20}}),
+        "outcome": "pending",
+    })
+    DBExecutor._run(ConsequenceScheduler.load)
+
+    sent = []
+
+    async def text_to_stream(text, stream_id, storage_message=True):
+        sent.append(text)
+
+    async def failing_action(action_name, action_params, user_id, chat_id, message_obj):
+        """模拟 LLM 生成失败：放弃本次动作的全部写入"""
+        UnitOfWork.current().set_rollback_only()
+        return False, "生成回复失败", False
+
+    original_send_api = action_handler.send_api
+    original_execute = ActionHandler._execute_action
+    action_handler.send_api = SimpleNamespace(text_to_stream=text_to_stream)
+    ActionHandler._execute_action = staticmethod(failing_action)
+    message = SimpleNamespace(chat_stream=SimpleNamespace(stream_id=CHAT_ID))
+    try:
+        for _ in range(2):
+            await ActionHandler._execute_in_unit_of_work("摸头", "", USER_ID, CHAT_ID, message)
+    finally:
+        action_handler.send_api = original_send_api
+        ActionHandler._execute_action = original_execute
+
+    shown = [text for text in sent if "延迟后果" in text]
+    assert len(shown) == 1, sent
+    assert not ConsequenceScheduler.has_due(USER_ID, CHAT_ID)
+
+    # 后果的认领和属性变化已提交，不受动作回滚影响
+    event = await DBExecutor.read(lambda: DTEvent.get(DTEvent.event_id == "delayed_test").outcome)
+    assert event == "triggered", event
+    row = await DBExecutor.read(CharacterCache._read_row, USER_ID, CHAT_ID)
+    assert row["trust"] == 30, row["trust"]
+
+
+test_rollback_does_not_requeue()
+
+DBExecutor.shutdown()
+dt_db.close()
+db_dir.cleanup()
+
+print("\n" + "=" * 60)
+print(f"✅ 通过: {results['passed']}  ❌ 失败: {results['failed']}")
+print("=" * 60)
+
+sys.exit(0 if results["failed"] == 0 else 1)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - LLM 网关测试
+使用本地桩模型验证限流、截止时间、兜底、重试、对冲和流式分句发送，不需要真实的 LLM
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.desire_theatre.utils.llm_gateway import FallbackText, LLMGateway
+from plugins.desire_theatre.utils.stream_reply import SentenceChunker, StreamReply
+
+print("=" * 60)
+print("欲望剧场插件 - LLM 网关测试")
+print("=" * 60)
+
+results = {"passed": 0, "failed": 0}
+
+
+class StubModel:
+    """本地桩模型：按预设的 (延迟秒数, 是否成功) 依次应答，用完后重复最后一个"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_available_models(self):
+        return {"replyer": {"name": "stub"}}
+
+    async def generate_with_model(self, prompt, model_config, request_type, **kwargs):
+        delay, ok = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        if not ok:
+            return False, "stub error", "", "stub"
+        return True, f"回复{self.calls}", "", "stub"
+
+
+class StubStreamModel(StubModel):
+    """支持流式输出的桩模型：按预设的 (延迟秒数, 文本段) 依次产出"""
+
+    def __init__(self, deltas):
+        super().__init__([(0, True)])
+        self.deltas = deltas
+
+    async def generate_with_model_stream(self, prompt, model_config, request_type, **kwargs):
+        for delay, delta in self.deltas:
+            await asyncio.sleep(delay)
+            yield delta
+
+
+def reset(stub: StubModel, **policy):
+    """换上桩模型并设置测试用的短时限策略"""
+    LLMGateway.use_backend(stub)
+    LLMGateway._metrics.clear()
+    LLMGateway._semaphores.clear()
+    LLMGateway.RETRY_BASE_DELAY = 0.01
+    for name in LLMGateway.POLICIES:
+        LLMGateway.POLICIES[name].update({"timeout": 1.0, "retries": 1, "concurrency": 2, "hedge_percentile": 0.0})
+        LLMGateway.POLICIES[name].update(policy)
+
+
+def test(name: str):
+    """测试装饰器"""
+    def decorator(func):
+        def wrapper():
+            print(f"\n测试: {name}")
+            try:
+                asyncio.run(func())
+                results["passed"] += 1
+                print(f"✅ {name} - 通过")
+            except Exception as e:
+                results["failed"] += 1
+                print(f"❌ {name} - 失败: {e!r}")
+        return wrapper
+    return decorator
+
+
+@test("正常调用与统计")
+async def test_success():
+    stub = StubModel([(0.01, True)])
+    reset(stub)
+    success, content, _, _ = await LLMGateway.generate("你好", "desire_theatre.chat")
+    assert success and content == "回复1", content
+    stats = LLMGateway.get_stats()["desire_theatre.chat"]
+    assert stats["succeeded"] == 1 and stats["prompt_tokens"] == 2, stats
+
+
+@test("超时：角色回复返回兜底文本，事件生成返回失败")
+async def test_timeout():
+    stub = StubModel([(5, True)])
+    reset(stub, timeout=0.2)
+    success, content, _, model = await LLMGateway.generate("p", "desire_theatre.response")
+    assert success and LLMGateway.is_fallback(model) and content == LLMGateway.POLICIES["reply"]["fallback"], content
+
+    success, _, _, _ = await LLMGateway.generate("p", "desire_theatre.generate_dynamic_event")
+    assert not success
+    assert LLMGateway.get_stats()["desire_theatre.generate_dynamic_event"]["timeouts"] == 1
+
+
+@test("失败后重试成功")
+async def test_retry():
+    stub = StubModel([(0.01, False), (0.01, True)])
+    reset(stub)
+    success, content, _, _ = await LLMGateway.generate("p", "desire_theatre.use_item")
+    assert success and content == "回复2", content
+    assert LLMGateway.get_stats()["desire_theatre.use_item"]["retries"] == 1
+
+
+@test("同类请求并发不超过信号量")
+async def test_concurrency():
+    stub = StubModel([(0.05, True)])
+    reset(stub, concurrency=2)
+    outcomes = await asyncio.gather(*[LLMGateway.generate("p", "desire_theatre.chat") for _ in range(6)])
+    assert all(success for success, *_ in outcomes)
+    assert stub.max_in_flight == 2, stub.max_in_flight
+
+
+@test("慢请求触发对冲，先返回的结果胜出")
+async def test_hedge():
+    samples = [(0.01, True)] * LLMGateway.HEDGE_MIN_SAMPLES
+    stub = StubModel(samples + [(0.5, True), (0.01, True)])
+    reset(stub, hedge_percentile=0.95)
+    for _ in samples:
+        await LLMGateway.generate("p", "desire_theatre.response")
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    success, content, _, _ = await LLMGateway.generate("p", "desire_theatre.response")
+    elapsed = loop.time() - started
+
+    stats = LLMGateway.get_stats()["desire_theatre.response"]
+    assert success and stats["hedges"] == 1 and stats["hedge_wins"] == 1, stats
+    assert elapsed < 0.3, elapsed
+
+
+@test("按句子切分增量文本")
+async def test_chunker():
+    chunker = SentenceChunker()
+    chunks = []
+    for delta in ["嗯……你、你在干什么啦", "！我才没有", "期待呢。", "「哼」", "，笨蛋"]:
+        chunks.extend(chunker.feed(delta))
+    tail = chunker.flush()
+    assert chunks == ["嗯……你、你在干什么啦！"], chunks
+    assert tail == "我才没有期待呢。「哼」，笨蛋", tail
+
+
+@test("流式回复：首句在整段生成完之前发送")
+async def test_stream():
+    deltas = [(0.01, "第一句话已经提前生成好了。"), (0.2, "第二句话要等很久才出来。"), (0.01, "最后一句")]
+    stub = StubStreamModel(deltas)
+    reset(stub)
+    assert LLMGateway.supports_streaming()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sent = []
+
+    async def send(chunk):
+        sent.append((round(loop.time() - started, 2), chunk))
+
+    StreamReply.QUEUE_SIZE = 1
+    content = await StreamReply.pump(LLMGateway.stream("p", "desire_theatre.chat"), send)
+    assert content == "".join(delta for _, delta in deltas), content
+    assert [chunk for _, chunk in sent] == ["第一句话已经提前生成好了。", "第二句话要等很久才出来。", "最后一句"], sent
+    assert sent[0][0] < 0.18, sent
+
+
+@test("流式回复：输出前超时返回兜底文本")
+async def test_stream_timeout():
+    stub = StubStreamModel([(5, "太慢了。")])
+    reset(stub, timeout=0.2)
+    parts = [delta async for delta in LLMGateway.stream("p", "desire_theatre.response")]
+    assert parts == [LLMGateway.POLICIES["reply"]["fallback"]], parts
+    # 调用方据此区分兜底文本和模型输出
+    assert isinstance(parts[0], FallbackText), type(parts[0])
+
+
+test_success()
+test_timeout()
+test_retry()
+test_concurrency()
+test_hedge()
+test_chunker()
+test_stream()
+test_stream_timeout()
+
+print("\n" + "=" * 60)
+print(f"✅ 通过: {results['passed']}  ❌ 失败: {results['failed']}")
+print("=" * 60)
+
+sys.exit(0 if results["failed"] == 0 else 1)
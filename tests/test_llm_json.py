@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - LLM JSON 解析与事件内容缓存测试
+验证代码块提取、多余逗号和截断修复、结构校验，以及同一玩家同档位复用生成内容
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.desire_theatre.utils.llm_json import LLMJson, NUMBER
+from plugins.desire_theatre.systems.events.event_content import EventContent
+
+print("=" * 60)
+print("欲望剧场插件 - LLM JSON 解析测试")
+print("=" * 60)
+
+results = {"passed": 0, "failed": 0}
+
+
+def test(name: str):
+    """测试装饰器"""
+    def decorator(func):
+        def wrapper():
+            print(f"\n测试: {name}")
+            try:
+                result = func()
+                if asyncio.iscoroutine(result):
+                    asyncio.run(result)
+                results["passed"] += 1
+                print(f"✅ {name} - 通过")
+            except Exception as e:
+                results["failed"] += 1
+                print(f"❌ {name} - 失败: {e!r}")
+        return wrapper
+    return decorator
+
+
+DILEMMA_TEXT = """好的，这是生成的困境：
+```json
+{
+  "description": "她拉住你的袖子，声音很轻：「今晚……能不能别走？」现在，你必须做出选择：",
+  "choices": [
+    {"text": "留下来陪她", "description": "满足她的请求", "consequence_text": "她松了口气。", "long_term": "依赖加深",},
+    {"text": "温柔地拒绝", "description": "尊重彼此的界限", "consequence_text": "她低下头。", "long_term": "信任上升"},
+  ],
+}
+```
+希望你喜欢！"""
+
+
+@test("代码块提取与多余逗号修复")
+def test_fence_and_commas():
+    data, repaired = LLMJson.extract(DILEMMA_TEXT)
+    assert repaired
+    assert len(data["choices"]) == 2 and data["choices"][1]["text"] == "温柔地拒绝", data
+
+
+@test("截断的输出补全到最近的完整成员")
+def test_truncated():
+    text = '{"story_text": "雨下得很大", "choices": [{"text": "撑伞", "result_text": "她靠了过来"}, {"text": "跑回去", "result_t'
+    data, repaired = LLMJson.extract(text)
+    assert repaired
+    assert data["story_text"] == "雨下得很大"
+    assert data["choices"][0] == {"text": "撑伞", "result_text": "她靠了过来"}, data
+    assert data["choices"][1] == {"text": "跑回去"}, data
+
+
+@test("数字前的加号和数字字符串")
+def test_numbers():
+    text = '{"effects": {"affection": +5, "trust": "-3", "shame": "+2"}}'
+    data, _ = LLMJson.extract(text)
+    errors = LLMJson.validate(data, {"effects": {"*": NUMBER}})
+    assert not errors, errors
+    assert data["effects"] == {"affection": 5, "trust": -3, "shame": 2}, data
+
+
+@test("结构校验报告缺失字段和类型错误")
+def test_validate():
+    schema = EventContent.SCHEMAS["dynamic_event"]
+    data = {"event_name": "雨夜", "event_category": "romance", "story_text": 1, "choices": [{"text": "撑伞"}]}
+    errors = LLMJson.validate(data, schema)
+    assert "$.event_emoji: 缺少字段" in errors, errors
+    assert "$.story_text: 类型应为 str" in errors, errors
+    assert "$.choices[0].result_text: 缺少字段" in errors, errors
+
+    assert EventContent.parse("dilemma", DILEMMA_TEXT) is not None
+    assert EventContent.parse("dilemma", "抱歉，我无法生成") is None
+
+
+@test("同一玩家同档位复用生成内容")
+async def test_cache():
+    EventContent.clear()
+    EventContent.configure(variants_per_key=1, max_uses=3)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return {"description": f"版本{len(calls)}", "choices": [{"text": "好"}]}
+
+    character = {
+        "user_id": "u1", "chat_id": "c1", "game_day": 3,
+        "personality_type": "tsundere", "career": "高中生", "intimacy": 30, "corruption": 10,
+    }
+    similar = dict(character, intimacy=45, corruption=20)
+    different = dict(character, intimacy=85)
+
+    first = await EventContent.get_or_generate("dilemma:x", character, generate)
+    assert len(calls) == 1 and first["description"] == "版本1"
+
+    # 同档位直接命中缓存，调用方修改返回值不影响缓存
+    for _ in range(2):
+        payload = await EventContent.get_or_generate("dilemma:x", similar, generate)
+        assert payload["description"] == "版本1", payload
+        payload["description"] = "调用方修改"
+    assert len(calls) == 1, len(calls)
+
+    # 版本用满 3 次后淘汰并重新生成
+    payload = await EventContent.get_or_generate("dilemma:x", character, generate)
+    assert len(calls) == 2 and payload["description"] == "版本2", payload
+
+    # 关系阶段不同则重新生成
+    await EventContent.get_or_generate("dilemma:x", different, generate)
+    assert len(calls) == 3, len(calls)
+
+    # 生成内容带有玩家的互动历史，不同玩家、不同游戏日都不复用
+    await EventContent.get_or_generate("dilemma:x", dict(character, user_id="u2"), generate)
+    assert len(calls) == 4, len(calls)
+    await EventContent.get_or_generate("dilemma:x", dict(character, game_day=4), generate)
+    assert len(calls) == 5, len(calls)
+
+
+test_fence_and_commas()
+test_truncated()
+test_numbers()
+test_validate()
+test_cache()
+
+print("\n" + "=" * 60)
+print(f"✅ 通过: {results['passed']}  ❌ 失败: {results['failed']}")
+print("=" * 60)
+
+sys.exit(0 if results["failed"] == 0 else 1)
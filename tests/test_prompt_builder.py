@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - Prompt 构建器测试
+验证静态段落预编译、config.toml 热加载和提示词大小统计
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.desire_theatre.utils import prompt_builder
+from plugins.desire_theatre.utils.prompt_builder import PromptBuilder
+
+print("=" * 60)
+print("欲望剧场插件 - Prompt 构建器测试")
+print("=" * 60)
+
+results = {"passed": 0, "failed": 0}
+
+CHARACTER = {
+    "personality_type": "tsundere",
+    "affection": 40, "intimacy": 55, "trust": 30, "submission": 20, "desire": 50,
+    "corruption": 45, "arousal": 75, "resistance": 25, "shame": 25,
+    "personality_traits": '["嘴硬心软"]',
+}
+
+
+def test(name: str):
+    """测试装饰器"""
+    def decorator(func):
+        def wrapper():
+            print(f"\n测试: {name}")
+            try:
+                func()
+                results["passed"] += 1
+                print(f"✅ {name} - 通过")
+            except Exception as e:
+                results["failed"] += 1
+                print(f"❌ {name} - 失败: {e!r}")
+        return wrapper
+    return decorator
+
+
+def build(character=CHARACTER, **kwargs) -> str:
+    options = dict(
+        action_type="gentle", scenario_desc="牵手散步", intensity=3,
+        effects={"affection": 2}, new_traits=[], triggered_scenarios=[],
+    )
+    options.update(kwargs)
+    return PromptBuilder.build_response_prompt(character, **options)
+
+
+def write_config(path: Path, text: str):
+    """写入配置并推后修改时间，确保与上一次写入可区分"""
+    path.write_text(text, encoding="utf-8")
+    stamp = time.time() + write_config.offset
+    write_config.offset += 10
+    os.utime(path, (stamp, stamp))
+
+
+write_config.offset = 10
+
+config_dir = tempfile.TemporaryDirectory()
+config_path = Path(config_dir.name) / "config.toml"
+write_config(config_path, "[custom_prompts]\nenabled = false\n")
+prompt_builder.CONFIG_PATH = config_path
+PromptBuilder.CONFIG_CHECK_INTERVAL = 0
+
+
+@test("静态段落按人格和进化阶段只编译一次")
+def test_compile_once():
+    PromptBuilder._compiled.clear()
+    prompt = build()
+    assert "你正在扮演一个" in prompt and "**已解锁特质**：嘴硬心软" in prompt
+    assert "**效果**：好感+2" in prompt and prompt.endswith("- 保持回复在一个完整段落内")
+
+    build(dict(CHARACTER, affection=90))
+    assert len(PromptBuilder._compiled) == 1, PromptBuilder._compiled.keys()
+
+    build(dict(CHARACTER, personality_type="shy"))
+    build(dict(CHARACTER, corruption=85, submission=75))
+    assert len(PromptBuilder._compiled) == 3, PromptBuilder._compiled.keys()
+
+
+@test("config.toml 修改后自动重新加载自定义提示词")
+def test_hot_reload():
+    assert "# 额外角色设定" not in build()
+
+    write_config(config_path, '[custom_prompts]\nenabled = true\nextra_character_setup = "说话带点关西腔"\n')
+    prompt = build()
+    assert "# 额外角色设定\n说话带点关西腔" in prompt, prompt[-300:]
+    assert prompt.index("# 额外角色设定") < prompt.index("**立即生成回复**")
+
+    write_config(
+        config_path,
+        '[custom_prompts]\nenabled = true\nfull_custom_template = "{personality_name}/{stage_name}/{affection}"\n'
+    )
+    assert build() == "傲娇/关系深化/40", build()
+    assert PromptBuilder.get_stats()["config_reloads"] >= 2
+
+
+@test("配置文件损坏时沿用上一次的配置")
+def test_broken_config():
+    write_config(config_path, "[custom_prompts\nenabled = ")
+    assert build() == "傲娇/关系深化/40"
+    write_config(config_path, "[custom_prompts]\nenabled = false\n")
+
+
+@test("统计各段落的 token 估算")
+def test_stats():
+    PromptBuilder.STATS_SAMPLE_EVERY = 1
+    build(history=[{"event_name": "摸头", "event_data": '{"ai_response": "哼，才、才没有很开心呢"}'}])
+    stats = PromptBuilder.get_stats()
+    assert stats["max_tokens"] > 0 and stats["p50_tokens"] <= stats["max_tokens"], stats
+    for name in ("角色设定", "属性状态", "互动历史", "回复要求", "生成指令"):
+        assert stats["sections"].get(name, 0) > 0, (name, stats["sections"])
+
+
+test_compile_once()
+test_hot_reload()
+test_broken_config()
+test_stats()
+
+config_dir.cleanup()
+
+print("\n" + "=" * 60)
+print(f"✅ 通过: {results['passed']}  ❌ 失败: {results['failed']}")
+print("=" * 60)
+
+sys.exit(0 if results["failed"] == 0 else 1)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+欲望剧场插件 - 用户锁测试
+验证修改角色的命令与动作共用同一把用户锁：/确认重开 与正在进行的动作并发时，
+动作写回的旧角色数据不会把刚删除的角色重新插入
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins.desire_theatre.core.models import init_dt_database, dt_db
+from plugins.desire_theatre.core.character_cache import CharacterCache
+from plugins.desire_theatre.core.db_executor import DBExecutor
+from plugins.desire_theatre.systems.actions.action_handler import ActionHandler
+from plugins.desire_theatre.systems.mechanics.confirmation_manager import ConfirmationManager
+from plugins.desire_theatre.commands.actions.action_commands import DTRestartCommand
+
+print("=" * 60)
+print("欲望剧场插件 - 用户锁测试")
+print("=" * 60)
+
+results = {"passed": 0, "failed": 0}
+
+USER_ID = "lock_user"
+CHAT_ID = "lock_chat"
+
+
+def test(name: str):
+    """测试装饰器"""
+    def decorator(func):
+        def wrapper():
+            print(f"\n测试: {name}")
+            try:
+                asyncio.run(func())
+                results["passed"] += 1
+                print(f"✅ {name} - 通过")
+            except Exception as e:
+                results["failed"] += 1
+                print(f"❌ {name} - 失败: {e!r}")
+        return wrapper
+    return decorator
+
+
+def make_message(text: str):
+    return SimpleNamespace(
+        processed_plain_text=text,
+        message_info=SimpleNamespace(user_info=SimpleNamespace(user_id=USER_ID)),
+        chat_stream=SimpleNamespace(stream_id=CHAT_ID),
+    )
+
+
+class QuietRestartCommand(DTRestartCommand):
+    """不真正发送消息的重开命令"""
+
+    async def send_text(self, text: str):
+        self.sent = getattr(self, "sent", []) + [text]
+
+
+db_dir = tempfile.TemporaryDirectory()
+dt_db.init(os.path.join(db_dir.name, "lock_test.db"))
+init_dt_database()
+
+
+@test("/确认重开 与进行中的动作并发时角色保持删除")
+async def test_restart_during_action():
+    DBExecutor._run(CharacterCache._write_row, USER_ID, CHAT_ID, {"personality_type": "tsundere", "affection": 10})
+    CharacterCache.invalidate(USER_ID, CHAT_ID)
+    ConfirmationManager.create_confirmation(USER_ID, CHAT_ID, "restart")
+
+    action_started = asyncio.Event()
+
+    async def slow_action(action_name, action_params, user_id, chat_id, message_obj):
+        """读取角色后等待一段时间再写回，模拟 LLM 调用期间的动作"""
+        character = await CharacterCache.get(user_id, chat_id)
+        if not character:
+            return False, "角色未创建", False
+        action_started.set()
+        await asyncio.sleep(0.05)
+        character["affection"] += 5
+        await CharacterCache.save(user_id, chat_id, character)
+        return True, "执行动作", True
+
+    original = ActionHandler._execute_in_unit_of_work
+    ActionHandler._execute_in_unit_of_work = staticmethod(slow_action)
+    try:
+        action = asyncio.ensure_future(ActionHandler.execute_action(
+            action_name="摸头", action_params="", user_id=USER_ID, chat_id=CHAT_ID,
+            message_obj=make_message("/摸头"),
+        ))
+        await action_started.wait()
+
+        restart = QuietRestartCommand(make_message("/确认重开"))
+        restart_result = await restart.execute()
+        action_result = await action
+    finally:
+        ActionHandler._execute_in_unit_of_work = original
+
+    assert action_result[0], action_result
+    assert restart_result[0], restart_result
+
+    # 动作先于重开完成写回，重开随后删除；不能被动作的旧数据重新插入
+    row = await DBExecutor.read(CharacterCache._read_row, USER_ID, CHAT_ID)
+    assert row is None, row
+    assert await CharacterCache.get(USER_ID, CHAT_ID) is None
+
+
+test_restart_during_action()
+
+DBExecutor.shutdown()
+dt_db.close()
+db_dir.cleanup()
+
+print("\n" + "=" * 60)
+print(f"✅ 通过: {results['passed']}  ❌ 失败: {results['failed']}")
+print("=" * 60)
+
+sys.exit(0 if results["failed"] == 0 else 1)
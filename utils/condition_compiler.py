@@ -0,0 +1,178 @@
+"""
+条件编译器 - 把各系统的声明式属性条件预编译为谓词
+
+各系统沿用自己的条件写法（方言），编译后统一为子句 (属性, 比较函数, 阈值)：
+- range:     {"affection": (60, 100)}                闭区间（结局）
+- event:     {"affection": (60, 100), "mood": "x"}   元组为闭区间，其他值精确匹配（随机事件）
+- operator:  {"affection": (">=", 60)}               (运算符, 阈值)（选择困境）
+- threshold: {"affection": 60, "shame": "<50"}       数值为 >=，"<N" 为 <，元组为闭区间，
+             也接受 ">=N" / "<=N" / ">N" / "==N" 字符串（商店、进化、情境、成就、双重结局）
+
+RuleSet 把一类规则编译在一起：先一次性取出所有涉及的属性值，
+再依次判定每条规则，一次调用得到该类别下所有满足条件的规则。
+"""
+
+import json
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_condition_compiler")
+
+# 子句 (属性, 比较函数, 阈值)
+Clause = Tuple[str, Callable[[Any, Any], bool], Any]
+
+_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+# 字符串阈值按长度优先匹配运算符前缀
+_STRING_PREFIXES = (">=", "<=", "==", ">", "<")
+
+
+def get_value(character, attr: str, default=0):
+    """读取属性值，兼容字典和 Peewee 模型对象"""
+    if isinstance(character, dict):
+        return character.get(attr, default)
+    if hasattr(character, "__data__"):
+        return character.__data__.get(attr, default)
+    return getattr(character, attr, default)
+
+
+class CompiledCondition:
+    """编译后的单条条件"""
+
+    __slots__ = ("clauses", "attrs")
+
+    def __init__(self, clauses: List[Clause]):
+        self.clauses = tuple(clauses)
+        self.attrs = tuple(dict.fromkeys(attr for attr, _, _ in clauses))
+
+    def check(self, character) -> bool:
+        """判定角色是否满足条件"""
+        for attr, compare, threshold in self.clauses:
+            if not compare(get_value(character, attr), threshold):
+                return False
+        return True
+
+    def count_met(self, character) -> int:
+        """统计满足的子句数（用于进度显示）"""
+        return sum(
+            1 for attr, compare, threshold in self.clauses
+            if compare(get_value(character, attr), threshold)
+        )
+
+    def check_values(self, values: Dict[str, Any]) -> bool:
+        """用已取出的属性值判定"""
+        for attr, compare, threshold in self.clauses:
+            if not compare(values[attr], threshold):
+                return False
+        return True
+
+
+class RuleSet:
+    """一类规则的编译结果"""
+
+    def __init__(self, rules: Dict[str, CompiledCondition]):
+        self._rules = list(rules.items())
+        self._by_id = dict(rules)
+        self._attrs = tuple(dict.fromkeys(attr for _, rule in self._rules for attr in rule.attrs))
+
+    def values(self, character) -> Dict[str, Any]:
+        """一次性取出所有规则涉及的属性值"""
+        return {attr: get_value(character, attr) for attr in self._attrs}
+
+    def matching(self, character) -> List[str]:
+        """返回满足条件的规则ID（按定义顺序）"""
+        values = self.values(character)
+        return [rule_id for rule_id, rule in self._rules if rule.check_values(values)]
+
+    def get(self, rule_id: str) -> Optional[CompiledCondition]:
+        """获取单条规则"""
+        return self._by_id.get(rule_id)
+
+    def check(self, rule_id: str, character) -> bool:
+        """判定单条规则，规则不存在时返回 False"""
+        rule = self._by_id.get(rule_id)
+        return rule is not None and rule.check(character)
+
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+class ConditionCompiler:
+    """条件编译器"""
+
+    @staticmethod
+    def compile(conditions: Optional[Dict], dialect: str) -> CompiledCondition:
+        """编译单条条件"""
+        parser = {
+            "range": ConditionCompiler._parse_range,
+            "event": ConditionCompiler._parse_event,
+            "operator": ConditionCompiler._parse_operator,
+            "threshold": ConditionCompiler._parse_threshold,
+        }[dialect]
+
+        clauses: List[Clause] = []
+        for attr, value in (conditions or {}).items():
+            clauses.extend(parser(attr, value))
+        return CompiledCondition(clauses)
+
+    @staticmethod
+    def compile_rules(rules: Dict[str, Optional[Dict]], dialect: str) -> RuleSet:
+        """编译一类规则 {规则ID: 条件}"""
+        return RuleSet({
+            rule_id: ConditionCompiler.compile(conditions, dialect)
+            for rule_id, conditions in rules.items()
+        })
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile_json(raw: Optional[str], dialect: str) -> CompiledCondition:
+        """编译数据库中以 JSON 字符串保存的条件（按原始字符串缓存，只解析一次）"""
+        try:
+            conditions = json.loads(raw or "{}")
+        except (TypeError, ValueError):
+            logger.warning(f"无法解析条件: {raw}")
+            conditions = {}
+        return ConditionCompiler.compile(conditions, dialect)
+
+    @staticmethod
+    def _parse_range(attr: str, value) -> List[Clause]:
+        min_val, max_val = value
+        return [(attr, operator.ge, min_val), (attr, operator.le, max_val)]
+
+    @staticmethod
+    def _parse_event(attr: str, value) -> List[Clause]:
+        if isinstance(value, tuple):
+            return ConditionCompiler._parse_range(attr, value)
+        return [(attr, operator.eq, value)]
+
+    @staticmethod
+    def _parse_operator(attr: str, value) -> List[Clause]:
+        op, threshold = value
+        compare = _OPERATORS.get(op)
+        if compare is None:
+            # 未知运算符不构成限制
+            return []
+        return [(attr, compare, threshold)]
+
+    @staticmethod
+    def _parse_threshold(attr: str, value) -> List[Clause]:
+        if isinstance(value, tuple):
+            return ConditionCompiler._parse_range(attr, value)
+        if isinstance(value, str):
+            for prefix in _STRING_PREFIXES:
+                if value.startswith(prefix):
+                    return [(attr, _OPERATORS[prefix], int(value[len(prefix):]))]
+            return [(attr, operator.ge, int(value))]
+        return [(attr, operator.ge, value)]
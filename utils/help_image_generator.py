@@ -4,10 +4,15 @@
 
 import os
 import io
-import base64
-from typing import Tuple
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFont
 
+from .render_cache import RenderCache
+from .text_layout import TextLayout
+
 
 class HelpImageGenerator:
     """生成帮助图片"""
@@ -47,9 +52,85 @@ class HelpImageGenerator:
     BACKGROUND_IMAGE = "background.png"  # 背景图片文件名(放在 utils 文件夹)
     BACKGROUND_OPACITY = 0.3  # 背景图片透明度(0.0-1.0)
 
+    # 渲染版本（绘制逻辑变化时递增，使渲染缓存失效）
+    RENDER_VERSION = 3
+
+    # 背景缓存 {(宽, 高, 渲染签名): 背景图}
+    BACKGROUND_CACHE_SIZE = 16
+    _background_cache: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+    _background_lock = threading.Lock()
+
+    # 背景图片原图 (渲染签名, 图片)
+    _background_source: tuple = (None, None)
+
+    # 状态图静态层缓存 {(排版结构, 渲染签名): 图片}
+    # 排版结构随节日/进化提示和换行行数变化，常见组合不超过十种
+    STATUS_TEMPLATE_CACHE_SIZE = 8
+    _status_templates: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+    _status_template_lock = threading.Lock()
+
+    # 状态图 PNG 压缩级别（默认 6 的编码耗时约为 1 的 4~5 倍，体积只小两成左右）
+    STATUS_PNG_COMPRESS_LEVEL = 1
+
+    @staticmethod
+    def _render_signature() -> str:
+        """渲染签名：渲染版本 + 背景图片版本"""
+        bg_image_path = os.path.join(os.path.dirname(__file__), HelpImageGenerator.BACKGROUND_IMAGE)
+        try:
+            stat = os.stat(bg_image_path)
+            background = f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            background = "none"
+        return f"v{HelpImageGenerator.RENDER_VERSION}:{background}"
+
+    @staticmethod
+    def generate_status_image(title: str, content_dict: dict, width: int = 1920) -> Tuple[bytes, str]:
+        """生成状态图片（只缓存在内存中）"""
+        return RenderCache.get_or_render(
+            "status", title, content_dict, width,
+            HelpImageGenerator._render_signature(),
+            HelpImageGenerator._render_status_image,
+        )
+
+    @staticmethod
+    def generate_list_image(title: str, sections: list, width: int = 1920) -> Tuple[bytes, str]:
+        """生成列表图片（只缓存在内存中）"""
+        return RenderCache.get_or_render(
+            "list", title, sections, width,
+            HelpImageGenerator._render_signature(),
+            HelpImageGenerator._render_list_image,
+        )
+
+    @staticmethod
+    def generate_help_image(title: str, sections: list, width: int = 1920, persist: bool = True) -> Tuple[bytes, str]:
+        """
+        生成帮助图片
+        persist=True 时写入磁盘并在启动时预渲染，内容随用户数据变化的页面应传 False
+        """
+        return RenderCache.get_or_render(
+            "help", title, sections, width,
+            HelpImageGenerator._render_signature(),
+            HelpImageGenerator._render_help_image,
+            persist=persist,
+        )
+
     @staticmethod
+    def get_cached_image(kind: str, title: str, payload, width: int = 1920) -> Optional[Tuple[bytes, str]]:
+        """已渲染过的图片（只查内存缓存），未命中返回 None"""
+        return RenderCache.peek(kind, title, payload, width, HelpImageGenerator._render_signature())
+
+    @staticmethod
+    def prerender() -> Dict[str, int]:
+        """预渲染已持久化的帮助页（启动时在后台线程调用）"""
+        return RenderCache.prerender(
+            {"help": HelpImageGenerator._render_help_image},
+            HelpImageGenerator._render_signature(),
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
     def _get_font(size: int) -> ImageFont.FreeTypeFont:
-        """获取字体"""
+        """获取字体（每个字号只加载一次）"""
         font_paths = [
             "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
             "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
@@ -100,15 +181,78 @@ class HelpImageGenerator:
 
     @staticmethod
     def _create_gradient_background(width: int, height: int) -> Image.Image:
-        """创建渐变背景（支持背景图片）"""
-        # 尝试加载背景图片
+        """创建渐变背景（支持背景图片）；按尺寸缓存，返回副本供调用方绘制"""
+        key = (width, height, HelpImageGenerator._render_signature())
+
+        with HelpImageGenerator._background_lock:
+            cached = HelpImageGenerator._background_cache.get(key)
+            if cached is not None:
+                HelpImageGenerator._background_cache.move_to_end(key)
+                return cached.copy()
+
+        background = HelpImageGenerator._build_background(width, height)
+
+        with HelpImageGenerator._background_lock:
+            HelpImageGenerator._background_cache[key] = background
+            while len(HelpImageGenerator._background_cache) > HelpImageGenerator.BACKGROUND_CACHE_SIZE:
+                HelpImageGenerator._background_cache.popitem(last=False)
+
+        return background.copy()
+
+    @staticmethod
+    def _gradient_image(width: int, height: int, max_alpha: int = None) -> Image.Image:
+        """
+        纵向渐变：先算出 1 像素宽的颜色列，再用最近邻横向拉伸，
+        结果与逐行画线完全一致（max_alpha 不为空时生成 RGBA，透明度随高度线性增加）
+        """
+        r1, g1, b1 = HelpImageGenerator.BG_START_COLOR
+        r2, g2, b2 = HelpImageGenerator.BG_END_COLOR
+
+        colors = []
+        for y in range(height):
+            ratio = y / height
+            color = (
+                int(r1 + (r2 - r1) * ratio),
+                int(g1 + (g2 - g1) * ratio),
+                int(b1 + (b2 - b1) * ratio),
+            )
+            if max_alpha is not None:
+                color += (int(max_alpha * ratio),)
+            colors.append(color)
+
+        column = Image.new('RGBA' if max_alpha is not None else 'RGB', (1, height))
+        column.putdata(colors)
+        return column.resize((width, height), Image.Resampling.NEAREST)
+
+    @staticmethod
+    def _load_background_source():
+        """加载背景图片原图（文件不变时只读取一次），不存在时返回 None"""
         bg_image_path = os.path.join(os.path.dirname(__file__), HelpImageGenerator.BACKGROUND_IMAGE)
+        signature = HelpImageGenerator._render_signature()
 
+        cached_signature, source = HelpImageGenerator._background_source
+        if cached_signature == signature:
+            return source
+
+        source = None
         if os.path.exists(bg_image_path):
-            try:
-                # 加载背景图片
-                bg_img = Image.open(bg_image_path).convert('RGB')
+            with Image.open(bg_image_path) as f:
+                source = f.convert('RGB')
+
+        HelpImageGenerator._background_source = (signature, source)
+        return source
 
+    @staticmethod
+    def _build_background(width: int, height: int) -> Image.Image:
+        """生成指定尺寸的背景"""
+        try:
+            bg_img = HelpImageGenerator._load_background_source()
+        except Exception:
+            # 加载失败，降级到纯渐变
+            bg_img = None
+
+        if bg_img is not None:
+            try:
                 # 缩放背景图片以适应目标尺寸（保持宽高比，裁剪多余部分）
                 bg_ratio = bg_img.width / bg_img.height
                 target_ratio = width / height
@@ -122,139 +266,139 @@ class HelpImageGenerator:
                     new_width = width
                     new_height = int(width / bg_ratio)
 
-                bg_img = bg_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-                # 居中裁剪
+                # 居中裁剪（resize 只计算裁剪区域内的像素）
                 left = (new_width - width) // 2
                 top = (new_height - height) // 2
-                bg_img = bg_img.crop((left, top, left + width, top + height))
+                scale_x = bg_img.width / new_width
+                scale_y = bg_img.height / new_height
+                resized = bg_img.resize(
+                    (width, height),
+                    Image.Resampling.LANCZOS,
+                    box=(left * scale_x, top * scale_y, (left + width) * scale_x, (top + height) * scale_y),
+                )
 
                 # 应用透明度（通过叠加半透明的纯色层）
-                overlay = Image.new('RGB', (width, height), HelpImageGenerator.BG_START_COLOR)
                 opacity = int(255 * (1 - HelpImageGenerator.BACKGROUND_OPACITY))
-                overlay.putalpha(opacity)
-
-                # 创建带alpha通道的背景图
-                bg_img_rgba = bg_img.convert('RGBA')
                 overlay_rgba = Image.new('RGBA', (width, height), HelpImageGenerator.BG_START_COLOR + (opacity,))
-
-                # 叠加
-                result = Image.alpha_composite(bg_img_rgba, overlay_rgba)
+                result = Image.alpha_composite(resized.convert('RGBA'), overlay_rgba)
 
                 # 在上面叠加渐变效果（增强层次感）
-                gradient = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-                gradient_draw = ImageDraw.Draw(gradient)
-
-                for y in range(height):
-                    r1, g1, b1 = HelpImageGenerator.BG_START_COLOR
-                    r2, g2, b2 = HelpImageGenerator.BG_END_COLOR
-                    ratio = y / height
-                    r = int(r1 + (r2 - r1) * ratio)
-                    g = int(g1 + (g2 - g1) * ratio)
-                    b = int(b1 + (b2 - b1) * ratio)
-                    alpha = int(80 * ratio)  # 渐变透明度
-                    gradient_draw.line([(0, y), (width, y)], fill=(r, g, b, alpha))
-
+                gradient = HelpImageGenerator._gradient_image(width, height, max_alpha=80)
                 result = Image.alpha_composite(result, gradient)
                 return result.convert('RGB')
 
-            except Exception as e:
-                # 加载失败，降级到纯渐变
+            except Exception:
+                # 处理失败，降级到纯渐变
                 pass
 
         # 没有背景图或加载失败，使用纯渐变背景
-        base = Image.new('RGB', (width, height), HelpImageGenerator.BG_START_COLOR)
-
-        for y in range(height):
-            r1, g1, b1 = HelpImageGenerator.BG_START_COLOR
-            r2, g2, b2 = HelpImageGenerator.BG_END_COLOR
-
-            ratio = y / height
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-
-            draw = ImageDraw.Draw(base)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-        return base
+        return HelpImageGenerator._gradient_image(width, height)
 
     @staticmethod
     def _wrap_text(text: str, max_width: int, font: ImageFont.FreeTypeFont) -> list:
-        """文本自动换行"""
-        lines = []
-        for line in text.split('\n'):
-            if not line:
-                lines.append('')
-                continue
-
-            current_line = ''
-            for char in line:
-                test_line = current_line + char
-                bbox = font.getbbox(test_line)
-                w = bbox[2] - bbox[0]
-
-                if w <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = char
-
-            if current_line:
-                lines.append(current_line)
-
-        return lines
+        """文本自动换行（字形宽度缓存 + 二分断行 + 中文标点规则）"""
+        return TextLayout.wrap(text, max_width, font)
 
     @staticmethod
-    def generate_status_image(title: str, content_dict: dict, width: int = 1920) -> Tuple[bytes, str]:
-        """生成状态图片（键值对显示 - 横屏双列布局 - 动态高度）"""
+    def _status_layout(title: str, content_dict: dict, width: int) -> dict:
+        """
+        计算状态图排版：总高度、每张卡片的位置和换行后的文本行
+        structure 只包含决定静态层外观的部分（标题、章节名、每项行数），用作模板缓存键
+        """
         font_title = HelpImageGenerator._get_font(HelpImageGenerator.TITLE_SIZE)
         font_subtitle = HelpImageGenerator._get_font(HelpImageGenerator.SUBTITLE_SIZE)
         font_text = HelpImageGenerator._get_font(HelpImageGenerator.TEXT_SIZE)
 
-        # 第一步：计算所需高度
+        # 双列布局
         num_columns = 2
         column_width = (width - HelpImageGenerator.PADDING * 2 - HelpImageGenerator.COLUMN_SPACING * (num_columns - 1)) // num_columns
         max_text_width = column_width - HelpImageGenerator.CARD_PADDING * 2
 
-        # 计算标题区域高度
+        text_bbox = font_text.getbbox('A')
+        line_height = (text_bbox[3] - text_bbox[1]) + HelpImageGenerator.LINE_SPACING
+
+        # 标题区域高度（总高度按 header_height 计算，卡片从 cards_top 开始绘制）
         title_bbox = font_title.getbbox(title)
-        header_height = HelpImageGenerator.PADDING + (title_bbox[3] - title_bbox[1]) + 15 + 10 + HelpImageGenerator.SECTION_SPACING + 10
+        cards_top = HelpImageGenerator.PADDING + (title_bbox[3] - title_bbox[1]) + 15 + HelpImageGenerator.SECTION_SPACING + 10
+        header_height = cards_top + 10
 
-        # 分配sections到各列并计算每列高度
+        # 分配sections到各列
         sections_list = list(content_dict.items())
         sections_per_column = (len(sections_list) + num_columns - 1) // num_columns
         columns = [sections_list[i:i + sections_per_column] for i in range(0, len(sections_list), sections_per_column)]
 
+        cards = []
+        structure = []
         max_column_height = 0
-        for column_sections in columns:
-            column_height = 0
+        for col_idx, column_sections in enumerate(columns):
+            x_offset = HelpImageGenerator.PADDING + col_idx * (column_width + HelpImageGenerator.COLUMN_SPACING)
+            y = cards_top
+
             for section_title, items in column_sections:
-                card_height = HelpImageGenerator.CARD_PADDING
                 subtitle_bbox = font_subtitle.getbbox(section_title)
-                card_height += (subtitle_bbox[3] - subtitle_bbox[1]) + HelpImageGenerator.LINE_SPACING + 5
+                subtitle_height = (subtitle_bbox[3] - subtitle_bbox[1]) + HelpImageGenerator.LINE_SPACING + 5
+
+                item_lines = [
+                    HelpImageGenerator._wrap_text(f"{key}: {value}", max_text_width, font_text)
+                    for key, value in items.items()
+                ]
+                line_count = sum(len(lines) for lines in item_lines)
+                card_height = HelpImageGenerator.CARD_PADDING * 2 + subtitle_height + line_count * line_height
+
+                cards.append({
+                    "x": x_offset,
+                    "y": y,
+                    "height": card_height,
+                    "section": section_title,
+                    "subtitle_height": subtitle_height,
+                    "lines": [line for lines in item_lines for line in lines],
+                })
+                structure.append((section_title, tuple(len(lines) for lines in item_lines)))
 
-                for key, value in items.items():
-                    text_line = f"{key}: {value}"
-                    wrapped_lines = HelpImageGenerator._wrap_text(text_line, max_text_width, font_text)
-                    for _ in wrapped_lines:
-                        text_bbox = font_text.getbbox('A')
-                        card_height += (text_bbox[3] - text_bbox[1]) + HelpImageGenerator.LINE_SPACING
+                y += card_height + HelpImageGenerator.SECTION_SPACING
 
-                card_height += HelpImageGenerator.CARD_PADDING
-                column_height += card_height + HelpImageGenerator.SECTION_SPACING
+            max_column_height = max(max_column_height, y - cards_top)
 
-            max_column_height = max(max_column_height, column_height)
+        return {
+            "height": header_height + max_column_height + HelpImageGenerator.PADDING,
+            "column_width": column_width,
+            "line_height": line_height,
+            "cards": cards,
+            "structure": (title, width, tuple(structure)),
+        }
 
-        # 计算总高度
-        height = header_height + max_column_height + HelpImageGenerator.PADDING
+    @staticmethod
+    def _status_template(title: str, layout: dict, width: int) -> Image.Image:
+        """状态图静态层（背景、标题、卡片、章节名）；按排版结构缓存，返回共享图片，调用方需先 copy"""
+        key = (layout["structure"], HelpImageGenerator._render_signature())
+
+        with HelpImageGenerator._status_template_lock:
+            cached = HelpImageGenerator._status_templates.get(key)
+            if cached is not None:
+                HelpImageGenerator._status_templates.move_to_end(key)
+                return cached
+
+        template = HelpImageGenerator._render_status_template(title, layout, width)
+
+        with HelpImageGenerator._status_template_lock:
+            HelpImageGenerator._status_templates[key] = template
+            while len(HelpImageGenerator._status_templates) > HelpImageGenerator.STATUS_TEMPLATE_CACHE_SIZE:
+                HelpImageGenerator._status_templates.popitem(last=False)
+
+        return template
+
+    @staticmethod
+    def _render_status_template(title: str, layout: dict, width: int) -> Image.Image:
+        """绘制状态图静态层"""
+        font_title = HelpImageGenerator._get_font(HelpImageGenerator.TITLE_SIZE)
+        font_subtitle = HelpImageGenerator._get_font(HelpImageGenerator.SUBTITLE_SIZE)
+        height = layout["height"]
+        column_width = layout["column_width"]
 
-        # 第二步：创建图片
         # 创建渐变背景
         img = HelpImageGenerator._create_gradient_background(width, height)
 
-        # 创建RGBA层用于半透明元素
+        # 半透明元素画在同一个RGBA层上，最后一次合并（卡片互不重叠，与逐张合并结果一致）
         overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
         draw_overlay = ImageDraw.Draw(overlay)
         draw = ImageDraw.Draw(img)
@@ -284,106 +428,73 @@ class HelpImageGenerator:
         line_y = y + 10
         draw.line([(width//2 - 100, line_y), (width//2 + 100, line_y)],
                   fill=HelpImageGenerator.ACCENT_COLOR, width=3)
-        y += HelpImageGenerator.SECTION_SPACING + 10
-
-        # 双列布局
-        num_columns = 2
-        column_width = (width - HelpImageGenerator.PADDING * 2 - HelpImageGenerator.COLUMN_SPACING * (num_columns - 1)) // num_columns
-        max_text_width = column_width - HelpImageGenerator.CARD_PADDING * 2
-
-        # 分配sections到各列
-        sections_list = list(content_dict.items())
-        sections_per_column = (len(sections_list) + num_columns - 1) // num_columns
-        columns = [sections_list[i:i + sections_per_column] for i in range(0, len(sections_list), sections_per_column)]
-
-        # 绘制各列
-        start_y = y
-        for col_idx, column_sections in enumerate(columns):
-            x_offset = HelpImageGenerator.PADDING + col_idx * (column_width + HelpImageGenerator.COLUMN_SPACING)
-            y = start_y
-
-            for section_title, items in column_sections:
-                # 计算卡片高度
-                card_height = HelpImageGenerator.CARD_PADDING
-                subtitle_bbox = font_subtitle.getbbox(section_title)
-                card_height += (subtitle_bbox[3] - subtitle_bbox[1]) + HelpImageGenerator.LINE_SPACING + 5
-
-                for key, value in items.items():
-                    text_line = f"{key}: {value}"
-                    wrapped_lines = HelpImageGenerator._wrap_text(text_line, max_text_width, font_text)
-                    for _ in wrapped_lines:
-                        text_bbox = font_text.getbbox('A')
-                        card_height += (text_bbox[3] - text_bbox[1]) + HelpImageGenerator.LINE_SPACING
 
-                card_height += HelpImageGenerator.CARD_PADDING
+        for card in layout["cards"]:
+            x_offset, card_top, card_height = card["x"], card["y"], card["height"]
+
+            # 绘制卡片阴影
+            shadow_offset = 4
+            HelpImageGenerator._draw_rounded_rectangle(
+                draw_overlay,
+                (x_offset + shadow_offset,
+                 card_top + shadow_offset,
+                 x_offset + column_width + shadow_offset,
+                 card_top + card_height + shadow_offset),
+                HelpImageGenerator.CARD_RADIUS,
+                fill=HelpImageGenerator.SHADOW_COLOR
+            )
 
-                # 绘制卡片阴影
-                shadow_offset = 4
-                HelpImageGenerator._draw_rounded_rectangle(
-                    draw_overlay,
-                    (x_offset + shadow_offset,
-                     y + shadow_offset,
-                     x_offset + column_width + shadow_offset,
-                     y + card_height + shadow_offset),
-                    HelpImageGenerator.CARD_RADIUS,
-                    fill=HelpImageGenerator.SHADOW_COLOR
-                )
+            # 绘制卡片背景
+            HelpImageGenerator._draw_rounded_rectangle(
+                draw_overlay,
+                (x_offset, card_top,
+                 x_offset + column_width, card_top + card_height),
+                HelpImageGenerator.CARD_RADIUS,
+                fill=HelpImageGenerator.CARD_BG_COLOR,
+                outline=HelpImageGenerator.CARD_BORDER_COLOR,
+                width=2
+            )
 
-                # 绘制卡片背景
-                HelpImageGenerator._draw_rounded_rectangle(
-                    draw_overlay,
-                    (x_offset, y,
-                     x_offset + column_width, y + card_height),
-                    HelpImageGenerator.CARD_RADIUS,
-                    fill=HelpImageGenerator.CARD_BG_COLOR,
-                    outline=HelpImageGenerator.CARD_BORDER_COLOR,
-                    width=2
-                )
+        img.paste(overlay, (0, 0), overlay)
 
-                # 合并overlay到主图
-                img.paste(overlay, (0, 0), overlay)
-                overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-                draw_overlay = ImageDraw.Draw(overlay)
+        # 章节标题画在卡片之上
+        for card in layout["cards"]:
+            draw.text(
+                (card["x"] + HelpImageGenerator.CARD_PADDING, card["y"] + HelpImageGenerator.CARD_PADDING),
+                f"▸ {card['section']}",
+                fill=HelpImageGenerator.SUBTITLE_COLOR,
+                font=font_subtitle
+            )
 
-                # 绘制章节标题
-                card_y = y + HelpImageGenerator.CARD_PADDING
-                draw.text(
-                    (x_offset + HelpImageGenerator.CARD_PADDING, card_y),
-                    f"▸ {section_title}",
-                    fill=HelpImageGenerator.SUBTITLE_COLOR,
-                    font=font_subtitle
-                )
-                card_y += (subtitle_bbox[3] - subtitle_bbox[1]) + HelpImageGenerator.LINE_SPACING + 5
+        return img
 
-                # 绘制内容
-                for key, value in items.items():
-                    text_line = f"{key}: {value}"
-                    wrapped_lines = HelpImageGenerator._wrap_text(text_line, max_text_width, font_text)
-                    for wrapped_line in wrapped_lines:
-                        draw.text(
-                            (x_offset + HelpImageGenerator.CARD_PADDING + 15, card_y),
-                            wrapped_line,
-                            fill=HelpImageGenerator.TEXT_COLOR,
-                            font=font_text
-                        )
-                        text_bbox = font_text.getbbox('A')
-                        card_y += (text_bbox[3] - text_bbox[1]) + HelpImageGenerator.LINE_SPACING
+    @staticmethod
+    def _render_status_image(title: str, content_dict: dict, width: int = 1920) -> bytes:
+        """
+        生成状态图片（键值对显示 - 横屏双列布局 - 动态高度）
+        静态层按排版结构缓存，每次只在副本上绘制各项文本
+        """
+        font_text = HelpImageGenerator._get_font(HelpImageGenerator.TEXT_SIZE)
 
-                y += card_height + HelpImageGenerator.SECTION_SPACING
+        layout = HelpImageGenerator._status_layout(title, content_dict, width)
+        img = HelpImageGenerator._status_template(title, layout, width).copy()
+        draw = ImageDraw.Draw(img)
 
-        # 最终合并overlay
-        img.paste(overlay, (0, 0), overlay)
+        # 绘制内容
+        for card in layout["cards"]:
+            text_x = card["x"] + HelpImageGenerator.CARD_PADDING + 15
+            card_y = card["y"] + HelpImageGenerator.CARD_PADDING + card["subtitle_height"]
+            for line in card["lines"]:
+                draw.text((text_x, card_y), line, fill=HelpImageGenerator.TEXT_COLOR, font=font_text)
+                card_y += layout["line_height"]
 
-        # 转换为字节和base64
+        # 转换为PNG字节（状态图查看频繁，用低压缩级别换编码速度）
         img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format='PNG')
-        img_bytes = img_byte_arr.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-
-        return img_bytes, img_base64
+        img.save(img_byte_arr, format='PNG', compress_level=HelpImageGenerator.STATUS_PNG_COMPRESS_LEVEL)
+        return img_byte_arr.getvalue()
 
     @staticmethod
-    def generate_list_image(title: str, sections: list, width: int = 1920) -> Tuple[bytes, str]:
+    def _render_list_image(title: str, sections: list, width: int = 1920) -> bytes:
         """生成列表图片（横屏双列布局 - 动态高度）"""
         font_title = HelpImageGenerator._get_font(HelpImageGenerator.TITLE_SIZE)
         font_subtitle = HelpImageGenerator._get_font(HelpImageGenerator.SUBTITLE_SIZE)
@@ -545,16 +656,13 @@ class HelpImageGenerator:
         # 最终合并overlay
         img.paste(overlay, (0, 0), overlay)
 
-        # 转换为字节和base64
+        # 转换为PNG字节
         img_byte_arr = io.BytesIO()
         img.save(img_byte_arr, format='PNG')
-        img_bytes = img_byte_arr.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-
-        return img_bytes, img_base64
+        return img_byte_arr.getvalue()
 
     @staticmethod
-    def generate_help_image(title: str, sections: list, width: int = 1920) -> Tuple[bytes, str]:
+    def _render_help_image(title: str, sections: list, width: int = 1920) -> bytes:
         """生成帮助图片（横屏双列布局 - 动态高度）"""
         font_title = HelpImageGenerator._get_font(HelpImageGenerator.TITLE_SIZE)
         font_subtitle = HelpImageGenerator._get_font(HelpImageGenerator.SUBTITLE_SIZE)
@@ -721,10 +829,7 @@ class HelpImageGenerator:
         # 最终合并overlay
         img.paste(overlay, (0, 0), overlay)
 
-        # 转换为字节和base64
+        # 转换为PNG字节
         img_byte_arr = io.BytesIO()
         img.save(img_byte_arr, format='PNG')
-        img_bytes = img_byte_arr.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-
-        return img_bytes, img_base64
+        return img_byte_arr.getvalue()
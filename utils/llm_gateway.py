@@ -0,0 +1,425 @@
+"""
+LLM 网关 - 插件内所有 LLM 调用的统一入口
+
+核心机制：
+- 每个 request_type 一个信号量，限制同时在途的请求数，慢模型不会拖垮所有聊天
+- 截止时间：排队、重试和对冲共用同一个总时限，超时后返回兜底文本或失败；
+  兜底结果的模型名为 FALLBACK_MODEL，调用方据此按失败处理（发送兜底文本，但不结算效果、不记录为回复）
+- 失败后按指数退避 + 随机抖动重试（截止时间不够时不再重试）
+- 对冲请求：已有足够延迟样本时，请求超过该类型历史延迟的指定分位数仍未返回，
+  且信号量还有空位，就再发一个相同请求，先成功的返回，另一个取消
+- 按 request_type 统计调用次数、失败/超时/兜底次数、延迟分位数和估算的 token 数
+- 后端提供 generate_with_model_stream 时支持流式输出：开始输出前失败可以重试，
+  输出开始后不再重试（已发送的内容无法撤回），相邻两段之间超过空闲时限即截断
+"""
+
+import asyncio
+import random
+from collections import deque
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_llm_gateway")
+
+# 返回值与 llm_api.generate_with_model 一致: (是否成功, 内容, 推理过程, 模型名)
+LLMResult = Tuple[bool, str, str, str]
+
+
+class LLMCallError(RuntimeError):
+    """单次 LLM 调用失败"""
+
+
+class FallbackText(str):
+    """流式输出中产出的兜底文本（与模型输出区分）"""
+
+
+class LLMGateway:
+    """LLM 网关"""
+
+    # 调用策略
+    # concurrency: 同一 request_type 同时在途的请求数
+    # timeout: 总截止时间(秒)，包含排队、重试和对冲
+    # retries: 失败后的重试次数
+    # hedge_percentile: 对冲触发的延迟分位数，0 表示不对冲
+    # fallback: 最终失败时返回的兜底文本，None 表示返回失败由调用方处理
+    POLICIES = {
+        # 角色回复：用户在等，宁可给一句兜底也不要卡住
+        "reply": {
+            "concurrency": 4,
+            "timeout": 30.0,
+            "retries": 1,
+            "hedge_percentile": 0.95,
+            "fallback": "（她似乎走神了，过了好一会儿才轻轻“嗯”了一声……）",
+        },
+        # 事件/困境生成：调用方已有预定义内容兜底，不对冲以免浪费额度
+        "generation": {
+            "concurrency": 2,
+            "timeout": 60.0,
+            "retries": 1,
+            "hedge_percentile": 0.0,
+            "fallback": None,
+        },
+    }
+
+    # 兜底结果的模型名
+    FALLBACK_MODEL = "fallback"
+
+    # request_type -> 策略名（未列出的按 reply 处理）
+    REQUEST_POLICIES = {
+        "desire_theatre.response": "reply",
+        "desire_theatre.chat": "reply",
+        "desire_theatre.use_item": "reply",
+        "desire_theatre.generate_event": "generation",
+        "desire_theatre.generate_dynamic_event": "generation",
+        "desire_theatre.generate_dilemma": "generation",
+        "desire_theatre.generate_dynamic_dilemma": "generation",
+    }
+
+    # 重试退避基准(秒)，第 n 次重试等待 基准 * 2^(n-1) * [0.5, 1.5)
+    RETRY_BASE_DELAY = 0.5
+
+    # 对冲至少需要的延迟样本数
+    HEDGE_MIN_SAMPLES = 20
+
+    # 每个 request_type 保留的延迟样本数
+    SAMPLE_SIZE = 200
+
+    # 流式输出开始后，相邻两段之间的最长等待(秒)
+    STREAM_IDLE_TIMEOUT = 15.0
+
+    # 底层模型调用，None 时使用 llm_api（测试时可替换为本地桩模型）
+    _backend = None
+
+    _semaphores: Dict[str, asyncio.Semaphore] = {}
+    _metrics: Dict[str, Dict] = {}
+
+    @staticmethod
+    def configure(reply: Dict = None, generation: Dict = None, retries: int = None, hedge_percentile: float = None):
+        """覆盖调用策略（对应 config.toml 的 [llm]），需在首次调用前执行"""
+        for name, overrides in (("reply", reply), ("generation", generation)):
+            for key, value in (overrides or {}).items():
+                if key in LLMGateway.POLICIES[name] and value is not None:
+                    LLMGateway.POLICIES[name][key] = value
+
+        if retries is not None:
+            for policy in LLMGateway.POLICIES.values():
+                policy["retries"] = max(0, int(retries))
+
+        # 只调整已启用对冲的策略
+        if hedge_percentile is not None:
+            for policy in LLMGateway.POLICIES.values():
+                if policy["hedge_percentile"] > 0:
+                    policy["hedge_percentile"] = hedge_percentile
+
+        LLMGateway._semaphores.clear()
+
+    @staticmethod
+    def use_backend(backend):
+        """
+        替换底层模型调用
+        backend 需提供 get_available_models() 和 async generate_with_model(prompt, model_config, request_type, **kwargs)
+        传 None 恢复为 llm_api
+        """
+        LLMGateway._backend = backend
+
+    @staticmethod
+    def get_policy(request_type: str) -> Dict:
+        return LLMGateway.POLICIES[LLMGateway.REQUEST_POLICIES.get(request_type, "reply")]
+
+    @staticmethod
+    def is_fallback(model_name: str) -> bool:
+        """返回结果是否为兜底文本（调用方应按生成失败处理）"""
+        return model_name == LLMGateway.FALLBACK_MODEL
+
+    @staticmethod
+    def _get_backend():
+        if LLMGateway._backend is not None:
+            return LLMGateway._backend
+        from src.plugin_system.apis import llm_api
+        return llm_api
+
+    @staticmethod
+    def _get_semaphore(request_type: str) -> asyncio.Semaphore:
+        semaphore = LLMGateway._semaphores.get(request_type)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(LLMGateway.get_policy(request_type)["concurrency"])
+            LLMGateway._semaphores[request_type] = semaphore
+        return semaphore
+
+    @staticmethod
+    def _get_metrics(request_type: str) -> Dict:
+        metrics = LLMGateway._metrics.get(request_type)
+        if metrics is None:
+            metrics = {
+                "calls": 0, "succeeded": 0, "failed": 0, "timeouts": 0, "fallbacks": 0,
+                "retries": 0, "hedges": 0, "hedge_wins": 0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+                "latencies": deque(maxlen=LLMGateway.SAMPLE_SIZE),
+            }
+            LLMGateway._metrics[request_type] = metrics
+        return metrics
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """粗略估算 token 数：中日韩字符按 1 个计，其他字符按 4 个合 1 个计"""
+        if not text:
+            return 0
+        cjk = sum(1 for char in text if ord(char) >= 0x2E80)
+        return cjk + (len(text) - cjk + 3) // 4
+
+    @staticmethod
+    async def generate(prompt: str, request_type: str, model: str = "replyer", **kwargs) -> LLMResult:
+        """
+        调用 LLM 生成文本
+        返回: (是否成功, 内容, 推理过程, 模型名)；失败且策略有兜底文本时返回 (True, 兜底文本, "", FALLBACK_MODEL)
+        """
+        policy = LLMGateway.get_policy(request_type)
+        metrics = LLMGateway._get_metrics(request_type)
+        metrics["calls"] += 1
+
+        backend = LLMGateway._get_backend()
+        model_config = backend.get_available_models().get(model)
+        if not model_config:
+            # 配置错误不用兜底文本掩盖
+            logger.error(f"未找到 '{model}' 模型配置")
+            metrics["failed"] += 1
+            return False, f"未找到 '{model}' 模型配置", "", ""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy["timeout"]
+        semaphore = LLMGateway._get_semaphore(request_type)
+        error = "未知错误"
+
+        for attempt in range(policy["retries"] + 1):
+            if attempt:
+                delay = LLMGateway.RETRY_BASE_DELAY * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                if loop.time() + delay >= deadline:
+                    break
+                metrics["retries"] += 1
+                await asyncio.sleep(delay)
+
+            try:
+                await asyncio.wait_for(semaphore.acquire(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                metrics["timeouts"] += 1
+                error = "排队超时"
+                break
+
+            started = loop.time()
+            try:
+                result = await LLMGateway._call_with_hedge(
+                    backend, prompt, model_config, request_type, policy, deadline, **kwargs
+                )
+            except asyncio.TimeoutError:
+                metrics["timeouts"] += 1
+                error = f"超过截止时间 {policy['timeout']}s"
+                break
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                logger.warning(f"LLM调用失败 {request_type} (第{attempt + 1}次): {error}")
+                continue
+            finally:
+                semaphore.release()
+
+            metrics["succeeded"] += 1
+            metrics["latencies"].append(loop.time() - started)
+            metrics["prompt_tokens"] += LLMGateway.estimate_tokens(prompt)
+            metrics["completion_tokens"] += LLMGateway.estimate_tokens(result[1])
+            return result
+
+        logger.error(f"LLM调用最终失败 {request_type}: {error}")
+        return LLMGateway._fail(request_type, error)
+
+    @staticmethod
+    def supports_streaming() -> bool:
+        """模型后端是否支持流式输出"""
+        return callable(getattr(LLMGateway._get_backend(), "generate_with_model_stream", None))
+
+    @staticmethod
+    async def stream(prompt: str, request_type: str, model: str = "replyer", **kwargs) -> AsyncIterator[str]:
+        """
+        流式调用 LLM，逐段产出文本（不对冲）
+        输出开始前全部失败时：策略有兜底文本则产出 FallbackText，否则抛出 LLMCallError
+        """
+        policy = LLMGateway.get_policy(request_type)
+        metrics = LLMGateway._get_metrics(request_type)
+        metrics["calls"] += 1
+
+        backend = LLMGateway._get_backend()
+        model_config = backend.get_available_models().get(model)
+        if not model_config:
+            logger.error(f"未找到 '{model}' 模型配置")
+            metrics["failed"] += 1
+            raise LLMCallError(f"未找到 '{model}' 模型配置")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy["timeout"]
+        semaphore = LLMGateway._get_semaphore(request_type)
+        error = "未知错误"
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), policy["timeout"])
+        except asyncio.TimeoutError:
+            metrics["timeouts"] += 1
+            error = "排队超时"
+        else:
+            try:
+                for attempt in range(policy["retries"] + 1):
+                    if attempt:
+                        delay = LLMGateway.RETRY_BASE_DELAY * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                        if loop.time() + delay >= deadline:
+                            break
+                        metrics["retries"] += 1
+                        await asyncio.sleep(delay)
+
+                    started = loop.time()
+                    parts = []
+                    interrupted = None
+                    chunks = backend.generate_with_model_stream(
+                        prompt=prompt, model_config=model_config, request_type=request_type, **kwargs
+                    ).__aiter__()
+                    try:
+                        while True:
+                            # 首段受总截止时间约束，之后受空闲时限约束
+                            timeout = deadline - loop.time() if not parts else LLMGateway.STREAM_IDLE_TIMEOUT
+                            try:
+                                delta = await asyncio.wait_for(chunks.__anext__(), max(timeout, 0))
+                            except StopAsyncIteration:
+                                break
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                    except asyncio.TimeoutError:
+                        metrics["timeouts"] += 1
+                        interrupted = "超时"
+                    except Exception as e:
+                        interrupted = str(e) or e.__class__.__name__
+                    finally:
+                        aclose = getattr(chunks, "aclose", None)
+                        if aclose is not None:
+                            await aclose()
+
+                    if parts:
+                        # 输出已经开始：中途出错只能截断在这里，不再重试
+                        if interrupted:
+                            logger.warning(f"LLM流式输出中断 {request_type}: {interrupted}")
+                        metrics["succeeded"] += 1
+                        metrics["latencies"].append(loop.time() - started)
+                        metrics["prompt_tokens"] += LLMGateway.estimate_tokens(prompt)
+                        metrics["completion_tokens"] += LLMGateway.estimate_tokens("".join(parts))
+                        return
+
+                    if interrupted == "超时":
+                        error = f"超过截止时间 {policy['timeout']}s"
+                        break
+                    error = interrupted or "空回复"
+                    logger.warning(f"LLM流式调用失败 {request_type} (第{attempt + 1}次): {error}")
+            finally:
+                semaphore.release()
+
+        logger.error(f"LLM流式调用最终失败 {request_type}: {error}")
+        metrics["failed"] += 1
+        fallback = policy["fallback"]
+        if not fallback:
+            raise LLMCallError(error)
+        metrics["fallbacks"] += 1
+        yield FallbackText(fallback)
+
+    @staticmethod
+    def _fail(request_type: str, error: str) -> LLMResult:
+        metrics = LLMGateway._get_metrics(request_type)
+        metrics["failed"] += 1
+
+        fallback = LLMGateway.get_policy(request_type)["fallback"]
+        if fallback:
+            metrics["fallbacks"] += 1
+            return True, fallback, "", LLMGateway.FALLBACK_MODEL
+        return False, error, "", ""
+
+    @staticmethod
+    async def _attempt(backend, prompt: str, model_config, request_type: str, **kwargs) -> LLMResult:
+        success, content, reasoning, model_name = await backend.generate_with_model(
+            prompt=prompt,
+            model_config=model_config,
+            request_type=request_type,
+            **kwargs
+        )
+        if not success or not content:
+            raise LLMCallError(content or "空回复")
+        return success, content, reasoning, model_name
+
+    @staticmethod
+    def _hedge_delay(request_type: str, policy: Dict) -> Optional[float]:
+        """对冲等待时间（该类型历史延迟的分位数），样本不足或未启用时返回 None"""
+        percentile = policy["hedge_percentile"]
+        latencies = LLMGateway._get_metrics(request_type)["latencies"]
+        if percentile <= 0 or len(latencies) < LLMGateway.HEDGE_MIN_SAMPLES:
+            return None
+        return LLMGateway._percentile(latencies, percentile)
+
+    @staticmethod
+    async def _call_with_hedge(backend, prompt: str, model_config, request_type: str, policy: Dict,
+                               deadline: float, **kwargs) -> LLMResult:
+        """发起请求，超过对冲等待时间仍未返回时追加一个对冲请求，返回先成功的结果"""
+        loop = asyncio.get_running_loop()
+        metrics = LLMGateway._get_metrics(request_type)
+        semaphore = LLMGateway._get_semaphore(request_type)
+
+        primary = asyncio.ensure_future(LLMGateway._attempt(backend, prompt, model_config, request_type, **kwargs))
+        pending = {primary}
+        hedge_delay = LLMGateway._hedge_delay(request_type, policy)
+
+        try:
+            if hedge_delay is not None and loop.time() + hedge_delay < deadline:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+
+                # 对冲请求同样占用信号量，没有空位时不对冲，避免在过载时放大流量
+                if not done and not semaphore.locked():
+                    await semaphore.acquire()
+                    hedge = asyncio.ensure_future(
+                        LLMGateway._attempt(backend, prompt, model_config, request_type, **kwargs)
+                    )
+                    hedge.add_done_callback(lambda _: semaphore.release())
+                    pending.add(hedge)
+                    metrics["hedges"] += 1
+
+            error: Exception = LLMCallError("无结果")
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            metrics["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _percentile(samples, ratio: float) -> float:
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    @staticmethod
+    def get_stats() -> Dict[str, Dict]:
+        """按 request_type 汇总统计（延迟单位: 毫秒）"""
+        stats = {}
+        for request_type, metrics in LLMGateway._metrics.items():
+            latencies = metrics["latencies"]
+            stats[request_type] = {
+                **{key: value for key, value in metrics.items() if key != "latencies"},
+                "p50_ms": LLMGateway._percentile(latencies, 0.5) * 1000 if latencies else 0.0,
+                "p95_ms": LLMGateway._percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+            }
+        return stats
@@ -0,0 +1,253 @@
+"""
+LLM JSON 解析 - 从模型输出中提取并修复 JSON，按结构描述校验
+
+核心机制：
+- JSONExtractor 逐字符扫描，跟踪字符串/转义状态和括号栈：
+  跳过 ```json 代码块标记和前后的说明文字，去掉 } ] 前多余的逗号和数字前的 + 号，
+  遇到最外层括号闭合即停止，不受后面多余文字影响
+- 输出被截断时补全未闭合的字符串和括号；补全后仍无法解析，
+  则回退到最近一个完整成员（逗号或括号处记录的安全点）再补全
+- 结构描述用普通的 dict/list/type 表示，校验返回全部错误路径，数字字符串就地转换为数字
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_llm_json")
+
+# 数字类型（结构描述中使用）
+NUMBER = (int, float)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONExtractor:
+    """增量 JSON 提取器（feed 可以多次调用，适用于流式输出）"""
+
+    # 截断修复时最多尝试回退的安全点个数
+    MAX_BACKTRACK = 8
+
+    def __init__(self):
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._done = False
+        # 安全点: (输出长度, 当时的括号栈)，截断时可以在这里闭合
+        self._safe_points: List[Tuple[int, Tuple[str, ...]]] = []
+        self.repaired = False
+
+    @property
+    def done(self) -> bool:
+        """最外层括号是否已经闭合"""
+        return self._done
+
+    def feed(self, text: str):
+        """追加一段文本"""
+        for char in text:
+            if self._done:
+                return
+            if not self._started:
+                if char in _CLOSERS:
+                    self._started = True
+                    self._open(char)
+                continue
+
+            if self._in_string:
+                self._out.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._out.append(char)
+            elif char in _CLOSERS:
+                self._open(char)
+            elif char in "}]":
+                self._close()
+            elif char == ",":
+                self._safe_points.append((len(self._out), tuple(self._stack)))
+                self._out.append(char)
+            elif char == "+" and not (self._out and self._out[-1] in "eE"):
+                # JSON 不允许数字前的 + 号（模型常写 "affection": +5）
+                self.repaired = True
+            else:
+                self._out.append(char)
+
+    def _open(self, char: str):
+        self._out.append(char)
+        self._stack.append(_CLOSERS[char])
+        self._safe_points.append((len(self._out), tuple(self._stack)))
+
+    def _close(self):
+        if not self._stack:
+            return
+        self._strip_trailing_comma()
+        self._out.append(self._stack.pop())
+        if not self._stack:
+            self._done = True
+        else:
+            self._safe_points.append((len(self._out), tuple(self._stack)))
+
+    def _strip_trailing_comma(self):
+        index = len(self._out) - 1
+        while index >= 0 and self._out[index].isspace():
+            index -= 1
+        if index >= 0 and self._out[index] == ",":
+            del self._out[index]
+            self.repaired = True
+
+    def result(self) -> Optional[Any]:
+        """解析已读入的内容；未闭合时尝试补全，无法解析返回 None"""
+        if not self._started:
+            return None
+
+        text = "".join(self._out)
+        if self._done:
+            return _loads(text)
+
+        # 输出被截断：先原样补全，再依次回退到更早的安全点
+        self.repaired = True
+        suffix = ('"' if self._in_string else "") + "".join(reversed(self._stack))
+        candidates = [text.rstrip().rstrip(",") + suffix]
+        for length, stack in reversed(self._safe_points[-JSONExtractor.MAX_BACKTRACK:]):
+            candidates.append(text[:length].rstrip().rstrip(",") + "".join(reversed(stack)))
+
+        for candidate in candidates:
+            data = _loads(candidate)
+            if data is not None:
+                return data
+        return None
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        # strict=False 允许字符串中出现未转义的换行（模型输出很常见）
+        return json.loads(text, strict=False)
+    except ValueError:
+        return None
+
+
+class LLMJson:
+    """LLM JSON 提取与校验"""
+
+    @staticmethod
+    def extract(text: str) -> Tuple[Optional[Any], bool]:
+        """
+        从模型输出中提取 JSON
+        返回: (解析结果, 是否经过修复)，无法解析时结果为 None
+        """
+        if not text:
+            return None, False
+
+        # 第一个 { 之前的说明文字里可能有 [ 或 {，解析失败时从下一个起点重试
+        start = 0
+        for _ in range(3):
+            start = _find_start(text, start)
+            if start < 0:
+                break
+            extractor = JSONExtractor()
+            extractor.feed(text[start:])
+            data = extractor.result()
+            if data is not None:
+                return data, extractor.repaired
+            start += 1
+
+        return None, False
+
+    @staticmethod
+    def validate(data: Any, schema: Any, path: str = "$") -> List[str]:
+        """
+        按结构描述校验数据，返回错误列表（为空表示通过）
+
+        结构描述:
+        - 类型或类型元组: isinstance 检查（NUMBER 允许数字字符串，校验时就地转换）
+        - dict: 键名以 ? 结尾为可选字段，"*" 描述其余所有值，未描述的多余字段忽略
+        - [item]: 非空列表，每一项符合 item
+        """
+        if isinstance(schema, dict):
+            if not isinstance(data, dict):
+                return [f"{path}: 应为对象"]
+            errors = []
+            for key, sub_schema in schema.items():
+                if key == "*":
+                    for name in list(data):
+                        errors.extend(LLMJson._validate_member(data, name, sub_schema, f"{path}.{name}"))
+                    continue
+                name = key.rstrip("?")
+                if name not in data or data[name] is None:
+                    if not key.endswith("?"):
+                        errors.append(f"{path}.{name}: 缺少字段")
+                    continue
+                errors.extend(LLMJson._validate_member(data, name, sub_schema, f"{path}.{name}"))
+            return errors
+
+        if isinstance(schema, list):
+            if not isinstance(data, list) or not data:
+                return [f"{path}: 应为非空列表"]
+            errors = []
+            for index in range(len(data)):
+                errors.extend(LLMJson._validate_member(data, index, schema[0], f"{path}[{index}]"))
+            return errors
+
+        if not isinstance(data, schema) or (isinstance(data, bool) and bool not in _as_tuple(schema)):
+            return [f"{path}: 类型应为 {'/'.join(t.__name__ for t in _as_tuple(schema))}"]
+        return []
+
+    @staticmethod
+    def _validate_member(container, key, schema: Any, path: str) -> List[str]:
+        value = container[key]
+        if schema is NUMBER and isinstance(value, str):
+            number = _parse_number(value)
+            if number is not None:
+                container[key] = value = number
+        return LLMJson.validate(value, schema, path)
+
+    @staticmethod
+    def parse(text: str, schema: Any, label: str = "JSON") -> Tuple[Optional[Any], bool]:
+        """
+        提取并校验
+        返回: (通过校验的数据，失败时为 None, 是否经过修复)
+        """
+        data, repaired = LLMJson.extract(text)
+        if data is None:
+            logger.error(f"{label}: 无法从LLM输出中解析JSON\n原始内容: {text}")
+            return None, repaired
+
+        errors = LLMJson.validate(data, schema)
+        if errors:
+            logger.error(f"{label}: LLM输出不符合格式: {'; '.join(errors[:5])}")
+            return None, repaired
+
+        if repaired:
+            logger.info(f"{label}: LLM输出的JSON经过修复")
+        return data, repaired
+
+
+def _find_start(text: str, start: int) -> int:
+    positions = [p for p in (text.find("{", start), text.find("[", start)) if p >= 0]
+    return min(positions) if positions else -1
+
+
+def _as_tuple(schema) -> tuple:
+    return schema if isinstance(schema, tuple) else (schema,)
+
+
+def _parse_number(value: str) -> Optional[float]:
+    text = value.strip().lstrip("+")
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return None
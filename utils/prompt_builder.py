@@ -1,44 +1,147 @@
 """
 Prompt构建器 - 为欲望剧场生成回复构建专用提示词
+
+核心机制：
+- 只随人格、进化阶段和自定义提示词配置变化的段落（角色设定、回复要求、格式要求、
+  额外设定、生成指令）按 (人格, 进化阶段, 配置版本) 预编译一次，
+  每次构建只填入属性、情绪、互动、历史等动态段落
+- config.toml 按修改时间热加载：每隔 CONFIG_CHECK_INTERVAL 秒检查一次，
+  变化后重新读取并使预编译段落失效，修改自定义提示词无需重启
+- 每次构建按段落估算 token 数，/LLM统计 中可以看到各段平均占用，便于精简提示词
 """
 
 import json
 import random
+import time
 import tomli
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
 
 from ..systems.personality.personality_system import PersonalitySystem
+from .llm_gateway import LLMGateway
+
+logger = get_logger("dt_prompt_builder")
+
+CONFIG_PATH = Path(__file__).parent.parent / "config.toml"
 
 
 class PromptBuilder:
     """欲望剧场 Prompt 构建器"""
 
+    # 检查 config.toml 是否变化的间隔(秒)
+    CONFIG_CHECK_INTERVAL = 2.0
+
+    # 每隔多少次构建统计一次段落大小（token 估算逐字符计算，不必每次都做）
+    STATS_SAMPLE_EVERY = 10
+
+    STAGE_NAMES = ["初识", "初步接触", "关系深化", "深度开发", "完全堕落"]
+
+    # 各进化阶段的回复风格
+    STAGE_RULES = {
+        1: "6. 【Stage 1】初识阶段，保持警惕和矜持，互动较为保守",
+        2: "6. 【Stage 2】初步接触，开始接受亲密互动，但仍有一定抵抗",
+        3: "6. 【Stage 3】关系深化，对亲密行为的接受度提高，可能主动一些",
+        4: "6. 【Stage 4】深度开发，已经习惯各种互动，抵抗减少，顺从性增强",
+        5: "6. 【Stage 5】完全堕落，羞耻心和抵抗力大幅降低，可能表现出主动和渴望",
+    }
+
+    # 根据动作类型调整
+    ACTION_HINTS = {
+        "gentle": "这是温柔的互动，回复要温馨自然",
+        "intimate": "这是亲密的互动，回复要体现身体接触带来的感受",
+        "seductive": "这是诱惑性的互动，回复可以带些暧昧和挑逗",
+        "intense": "这是强烈的互动，回复要体现强烈的情绪和身体反应",
+        "corrupting": "这是腐化性的互动，回复要体现道德底线的挣扎或突破",
+        "dominant": "这是支配性的互动，回复要体现服从或抗拒的心理"
+    }
+
+    DIVERSITY_PROMPTS = [
+        "不要重复使用之前的表达方式。每次回复都要有新鲜感",
+        "尝试从不同角度回应：有时关注感受，有时关注想法，有时关注身体反应",
+        "偶尔加入出人意料的细节描写，让回复更生动",
+        "不要总是按固定模式回复，要根据具体情况灵活变化",
+        "可以偶尔在回复中展现内心的矛盾和挣扎",
+        "有时可以直接，有时可以含蓄，根据情绪灵活调整",
+        "不要每次都用相似的句式，尝试改变表达结构",
+        "偶尔可以不按套路出牌，做出意外的反应"
+    ]
+
+    BREATH_VARIATIONS = ["呼吸急促", "喘息", "气息不稳", "轻声呻吟", "声音发颤"]
+    BOLD_VARIATIONS = ["大胆的言语", "主动的暗示", "露骨的表达", "毫不掩饰的欲望"]
+    CORRUPTED_VARIATIONS = ["淫靡的话语", "堕落的想法", "越界的请求", "放荡的暗示"]
+
+    EXPRESSION_STYLES = [
+        "可以用省略号(...)表现迟疑或余韵",
+        "可以用叹词(啊、呜、嗯)增强真实感",
+        "可以通过语气词体现情绪起伏",
+    ]
+
     _config_cache: Optional[Dict] = None
+    # config.toml 的 (修改时间, 大小)，变化时重新加载
+    _config_stamp: Optional[Tuple[int, int]] = None
+    _config_checked_at: float = 0.0
+    _config_version: int = 0
+
+    # 预编译的静态段落 {(人格, 进化阶段, 配置版本): 段落}
+    _compiled: Dict[Tuple[str, int, int], Dict] = {}
+
+    # 提示词大小统计（token 为估算值）
+    _stats: Dict[str, int] = {"builds": 0, "config_reloads": 0}
+    _prompt_tokens: deque = deque(maxlen=200)
+    _section_tokens: Dict[str, List[int]] = {}
 
     @staticmethod
     def _load_config() -> Dict:
-        """加载配置文件（带缓存）"""
-        if PromptBuilder._config_cache is not None:
+        """加载配置文件（带缓存，文件变化后自动重新加载）"""
+        now = time.monotonic()
+        if (
+            PromptBuilder._config_cache is not None
+            and now - PromptBuilder._config_checked_at < PromptBuilder.CONFIG_CHECK_INTERVAL
+        ):
+            return PromptBuilder._config_cache
+        PromptBuilder._config_checked_at = now
+
+        try:
+            stat = CONFIG_PATH.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+
+        if PromptBuilder._config_cache is not None and stamp == PromptBuilder._config_stamp:
             return PromptBuilder._config_cache
 
-        config_path = Path(__file__).parent.parent / "config.toml"
         try:
-            with open(config_path, "rb") as f:
+            with open(CONFIG_PATH, "rb") as f:
                 config = tomli.load(f)
-                PromptBuilder._config_cache = config
-                return config
-        except Exception:
-            # 如果加载失败，返回空配置
+        except Exception as e:
+            # 加载失败时沿用上一次的配置，从未加载成功则返回空配置
+            if PromptBuilder._config_cache is not None:
+                logger.warning(f"重新加载 config.toml 失败，沿用之前的配置: {e}")
+                PromptBuilder._config_stamp = stamp
+                return PromptBuilder._config_cache
             return {"custom_prompts": {"enabled": False}}
 
+        if PromptBuilder._config_cache is not None:
+            PromptBuilder._stats["config_reloads"] += 1
+            logger.info("config.toml 已变化，重新加载自定义提示词")
+
+        PromptBuilder._config_cache = config
+        PromptBuilder._config_stamp = stamp
+        PromptBuilder._config_version += 1
+        PromptBuilder._compiled.clear()
+        return config
+
     @staticmethod
     async def get_recent_history(user_id: str, chat_id: str, limit: int = 3) -> List[Dict]:
         """获取最近N次互动历史"""
-        from src.plugin_system.apis import database_api
+        from ..core.db_executor import DBExecutor
         from ..core.models import DTEvent
 
-        events = await database_api.db_get(
+        events = await DBExecutor.db_get(
             DTEvent,
             filters={"user_id": user_id, "chat_id": chat_id, "event_type": "interaction"},
             order_by="-timestamp",  # 按时间戳降序排列
@@ -48,6 +151,86 @@ class PromptBuilder:
         # db_get 已经限制了数量，直接反转顺序（从旧到新）
         return list(reversed(events)) if events else []
 
+    @staticmethod
+    def compile(personality_type: str, evolution_stage: int) -> Dict:
+        """
+        获取 (人格, 进化阶段, 当前配置) 对应的预编译静态段落
+        返回的各段均为行列表，直接拼入 prompt
+        """
+        config = PromptBuilder._load_config()
+        key = (personality_type, evolution_stage, PromptBuilder._config_version)
+        compiled = PromptBuilder._compiled.get(key)
+        if compiled is not None:
+            return compiled
+
+        personality = PersonalitySystem.get_personality(personality_type)
+        custom_prompts = config.get("custom_prompts", {})
+        custom_enabled = custom_prompts.get("enabled", False)
+
+        # === 9. 自定义提示词（默认提示词 + 额外设定） ===
+        custom = []
+        for title, field in (
+            ("# 额外角色设定", "extra_character_setup"),
+            ("# 额外回复要求", "extra_response_requirements"),
+            ("# 额外格式要求", "extra_format_requirements"),
+        ):
+            text = custom_prompts.get(field, "").strip() if custom_enabled else ""
+            if text:
+                custom.extend([title, text, ""])
+
+        compiled = {
+            "personality": personality,
+            "stage_name": PromptBuilder.STAGE_NAMES[evolution_stage - 1],
+            # 完全自定义的提示词模板，设置后替换整个默认提示词
+            "full_custom": custom_prompts.get("full_custom_template", "").strip() if custom_enabled else "",
+            # === 1. 角色设定 / 2. 当前状态 ===
+            "header": (
+                "# 角色设定",
+                f"你正在扮演一个{personality['name']}人格的角色。",
+                f"人格特点：{personality['description']}",
+                "",
+                "# 当前状态",
+                f"**进化阶段**：Stage {evolution_stage}/5 - {PromptBuilder.STAGE_NAMES[evolution_stage - 1]}",
+            ),
+            # === 7. 回复要求（强度一行为动态内容） ===
+            "requirements": (
+                "# 回复要求",
+                f"1. 保持{personality['name']}人格的核心特点：{', '.join(personality['dialogue_traits'])}",
+                "2. 根据当前的属性状态和情绪状态来回复",
+                "3. 自然地体现情绪变化，不要刻意提及属性数值",
+                "4. 如果新解锁了特质，要在回复中体现人格的微妙变化",
+            ),
+            "stage_rule": PromptBuilder.STAGE_RULES.get(evolution_stage),
+            "format": (
+                "",
+                "# 📝 格式要求",
+                "1. **回复长度**：根据情境自然发挥，不要刻意限制长度",
+                "2. **禁止啰嗦**：不要使用括号、不要旁白、不要解说、不要重复动作描述",
+                "3. **风格**：第一人称对话，像真人在聊天",
+                "4. **内容层次**：可以包含语言、表情、动作或感受描写",
+            ),
+            "custom": tuple(custom),
+            # === 10. 生成指令 ===
+            "footer": (
+                "---",
+                "**立即生成回复**：",
+                "- 直接输出自然的回复内容（根据情境决定长度）",
+                "- 不要添加任何前缀、标签或说明",
+                "- 保持回复在一个完整段落内",
+            ),
+        }
+        PromptBuilder._compiled[key] = compiled
+        return compiled
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse_traits(raw: Optional[str]) -> Tuple[str, ...]:
+        """解析已解锁特质（按原始字符串缓存）"""
+        try:
+            return tuple(json.loads(raw or "[]"))
+        except (TypeError, ValueError):
+            return ()
+
     @staticmethod
     def build_response_prompt(
         character: Dict,
@@ -81,25 +264,47 @@ class PromptBuilder:
             str: 构建好的 prompt
         """
         personality_type = character.get("personality_type", "tsundere")
-        personality = PersonalitySystem.get_personality(personality_type)
         evolution_stage = PersonalitySystem.get_evolution_stage(character)
-        current_traits = json.loads(character.get("personality_traits", "[]"))
+        compiled = PromptBuilder.compile(personality_type, evolution_stage)
+        personality = compiled["personality"]
+
+        if compiled["full_custom"]:
+            # 使用完全自定义的提示词模板，替换变量
+            custom_prompt = compiled["full_custom"].format(
+                personality_name=personality['name'],
+                personality_description=personality['description'],
+                evolution_stage=evolution_stage,
+                stage_name=compiled["stage_name"],
+                affection=character['affection'],
+                intimacy=character['intimacy'],
+                trust=character['trust'],
+                submission=character['submission'],
+                desire=character['desire'],
+                corruption=character['corruption'],
+                arousal=character['arousal'],
+                resistance=character['resistance'],
+                shame=character['shame'],
+                scenario_desc=scenario_desc,
+                intensity=intensity,
+                action_type=action_type,
+                user_message=user_message if user_message else "（无）"
+            )
+            if PromptBuilder._should_sample():
+                PromptBuilder._record([("自定义模板", custom_prompt)])
+            return custom_prompt
 
-        # 构建 prompt 各部分
-        prompt_parts = []
+        current_traits = PromptBuilder._parse_traits(character.get("personality_traits"))
 
-        # === 1. 角色设定 ===
-        prompt_parts.append("# 角色设定")
-        prompt_parts.append(f"你正在扮演一个{personality['name']}人格的角色。")
-        prompt_parts.append(f"人格特点：{personality['description']}")
-        prompt_parts.append("")
+        # 构建 prompt 各部分，sections 记录各段落的起始位置用于统计大小
+        prompt_parts = []
+        sections = []
 
-        # === 2. 当前状态 ===
-        prompt_parts.append("# 当前状态")
+        def section(name: str):
+            sections.append((name, len(prompt_parts)))
 
-        # 进化阶段
-        stage_names = ["初识", "初步接触", "关系深化", "深度开发", "完全堕落"]
-        prompt_parts.append(f"**进化阶段**：Stage {evolution_stage}/5 - {stage_names[evolution_stage-1]}")
+        # === 1. 角色设定 / 2. 当前状态 ===
+        section("角色设定")
+        prompt_parts.extend(compiled["header"])
 
         # 已解锁特质
         if current_traits:
@@ -113,6 +318,7 @@ class PromptBuilder:
         prompt_parts.append("")
 
         # === 3. 属性状态 ===
+        section("属性状态")
         prompt_parts.append("# 属性状态")
         prompt_parts.append(f"好感度：{character['affection']}/100")
         prompt_parts.append(f"亲密度：{character['intimacy']}/100")
@@ -126,6 +332,7 @@ class PromptBuilder:
         prompt_parts.append("")
 
         # === 4. 情绪状态分析 ===
+        section("情绪分析")
         prompt_parts.append("# 情绪状态分析")
         arousal = character.get("arousal", 0)
         shame = character.get("shame", 100)
@@ -160,6 +367,7 @@ class PromptBuilder:
 
         # === 4.5. 当前情绪状态 (新增) ===
         if mood_info:
+            section("当前情绪")
             prompt_parts.append("# 💭 当前情绪状态")
             prompt_parts.append(f"**情绪**：{mood_info.get('mood_name', '平静')}")
             prompt_parts.append(f"**描述**：{mood_info.get('mood_description', '')}")
@@ -177,6 +385,7 @@ class PromptBuilder:
             prompt_parts.append("")
 
         # === 5. 当前互动场景 ===
+        section("当前互动")
         prompt_parts.append("# 当前互动")
         prompt_parts.append(f"**场景**：{scenario_desc}")
         prompt_parts.append(f"**强度**：Level {intensity}/10")
@@ -200,6 +409,7 @@ class PromptBuilder:
 
         # === 6. 特殊事件 ===
         if triggered_scenarios:
+            section("特殊事件")
             scenario = random.choice(triggered_scenarios)
             prompt_parts.append("# 特殊事件触发")
             prompt_parts.append(f"✨ **{scenario['scenario_name']}**")
@@ -208,6 +418,7 @@ class PromptBuilder:
 
         # === 6.5. 最近互动历史 ===
         if history:
+            section("互动历史")
             prompt_parts.append("# 最近互动历史")
             prompt_parts.append("（这是最近的互动记录，有助于保持回复的连贯性）")
             prompt_parts.append("")
@@ -219,151 +430,105 @@ class PromptBuilder:
                 prompt_parts.append("")
 
         # === 7. 回复要求 ===
-        prompt_parts.append("# 回复要求")
-        prompt_parts.append(f"1. 保持{personality['name']}人格的核心特点：{', '.join(personality['dialogue_traits'])}")
-        prompt_parts.append("2. 根据当前的属性状态和情绪状态来回复")
-        prompt_parts.append("3. 自然地体现情绪变化，不要刻意提及属性数值")
-        prompt_parts.append("4. 如果新解锁了特质，要在回复中体现人格的微妙变化")
+        section("回复要求")
+        prompt_parts.extend(compiled["requirements"])
         prompt_parts.append(f"5. 根据强度Level {intensity}来调整反应程度")
 
         # 根据进化阶段调整回复风格
-        if evolution_stage == 1:
-            prompt_parts.append("6. 【Stage 1】初识阶段，保持警惕和矜持，互动较为保守")
-        elif evolution_stage == 2:
-            prompt_parts.append("6. 【Stage 2】初步接触，开始接受亲密互动，但仍有一定抵抗")
-        elif evolution_stage == 3:
-            prompt_parts.append("6. 【Stage 3】关系深化，对亲密行为的接受度提高，可能主动一些")
-        elif evolution_stage == 4:
-            prompt_parts.append("6. 【Stage 4】深度开发，已经习惯各种互动，抵抗减少，顺从性增强")
-        elif evolution_stage == 5:
-            prompt_parts.append("6. 【Stage 5】完全堕落，羞耻心和抵抗力大幅降低，可能表现出主动和渴望")
+        if compiled["stage_rule"]:
+            prompt_parts.append(compiled["stage_rule"])
 
         # 根据动作类型调整
-        action_hints = {
-            "gentle": "这是温柔的互动，回复要温馨自然",
-            "intimate": "这是亲密的互动，回复要体现身体接触带来的感受",
-            "seductive": "这是诱惑性的互动，回复可以带些暧昧和挑逗",
-            "intense": "这是强烈的互动，回复要体现强烈的情绪和身体反应",
-            "corrupting": "这是腐化性的互动，回复要体现道德底线的挣扎或突破",
-            "dominant": "这是支配性的互动，回复要体现服从或抗拒的心理"
-        }
-        if action_type in action_hints:
-            prompt_parts.append(f"7. {action_hints[action_type]}")
+        if action_type in PromptBuilder.ACTION_HINTS:
+            prompt_parts.append(f"7. {PromptBuilder.ACTION_HINTS[action_type]}")
 
         # === 多样性增强提示 (新增) ===
+        section("多样性要求")
         prompt_parts.append("")
         prompt_parts.append("# 🎯 多样性要求（重要！）")
 
-        # 随机选择一个多样性提示
-        diversity_prompts = [
-            "不要重复使用之前的表达方式。每次回复都要有新鲜感",
-            "尝试从不同角度回应：有时关注感受，有时关注想法，有时关注身体反应",
-            "偶尔加入出人意料的细节描写，让回复更生动",
-            "不要总是按固定模式回复，要根据具体情况灵活变化",
-            "可以偶尔在回复中展现内心的矛盾和挣扎",
-            "有时可以直接，有时可以含蓄，根据情绪灵活调整",
-            "不要每次都用相似的句式，尝试改变表达结构",
-            "偶尔可以不按套路出牌，做出意外的反应"
-        ]
-        selected_diversity = random.sample(diversity_prompts, 2)  # 随机选2条
+        # 随机选择多样性提示
+        selected_diversity = random.sample(PromptBuilder.DIVERSITY_PROMPTS, 2)  # 随机选2条
         for i, hint in enumerate(selected_diversity, 1):
             prompt_parts.append(f"{i}. {hint}")
 
         # 根据当前状态添加特殊提示
         if arousal > 70:
-            breath_variations = ["呼吸急促", "喘息", "气息不稳", "轻声呻吟", "声音发颤"]
-            prompt_parts.append(f"3. ⚡ 高兴奋状态：可以适当体现{random.choice(breath_variations)}等身体反应")
+            prompt_parts.append(f"3. ⚡ 高兴奋状态：可以适当体现{random.choice(PromptBuilder.BREATH_VARIATIONS)}等身体反应")
 
         if shame < 30:
-            bold_variations = ["大胆的言语", "主动的暗示", "露骨的表达", "毫不掩饰的欲望"]
-            prompt_parts.append(f"4. 😈 低羞耻状态：可以使用{random.choice(bold_variations)}")
+            prompt_parts.append(f"4. 😈 低羞耻状态：可以使用{random.choice(PromptBuilder.BOLD_VARIATIONS)}")
 
         if character.get("corruption", 0) > 60:
-            corrupted_variations = ["淫靡的话语", "堕落的想法", "越界的请求", "放荡的暗示"]
-            prompt_parts.append(f"5. 🔥 高堕落状态：可能会说出{random.choice(corrupted_variations)}")
+            prompt_parts.append(f"5. 🔥 高堕落状态：可能会说出{random.choice(PromptBuilder.CORRUPTED_VARIATIONS)}")
 
-        prompt_parts.append("")
-        prompt_parts.append("# 📝 格式要求")
-        prompt_parts.append("1. **回复长度**：根据情境自然发挥，不要刻意限制长度")
-        prompt_parts.append("2. **禁止啰嗦**：不要使用括号、不要旁白、不要解说、不要重复动作描述")
-        prompt_parts.append("3. **风格**：第一人称对话，像真人在聊天")
-        prompt_parts.append("4. **内容层次**：可以包含语言、表情、动作或感受描写")
+        section("格式要求")
+        prompt_parts.extend(compiled["format"])
 
         # 随机添加一个表达风格建议
-        expression_styles = [
-            "可以用省略号(...)表现迟疑或余韵",
-            "可以用叹词(啊、呜、嗯)增强真实感",
-            "可以通过语气词体现情绪起伏",
-        ]
-        prompt_parts.append(f"5. {random.choice(expression_styles)}")
+        prompt_parts.append(f"5. {random.choice(PromptBuilder.EXPRESSION_STYLES)}")
         prompt_parts.append("")
 
         # === 8. 用户消息（如果有） ===
         if user_message:
+            section("用户消息")
             prompt_parts.append("# 用户消息")
             prompt_parts.append(f'"{user_message}"')
             prompt_parts.append("")
 
-        # === 9. 应用自定义提示词 ===
-        config = PromptBuilder._load_config()
-        custom_prompts = config.get("custom_prompts", {})
-
-        if custom_prompts.get("enabled", False):
-            # 检查是否有完全自定义的模板
-            full_custom = custom_prompts.get("full_custom_template", "").strip()
-
-            if full_custom:
-                # 使用完全自定义的提示词模板，替换变量
-                stage_names = ["初识", "初步接触", "关系深化", "深度开发", "完全堕落"]
-                custom_prompt = full_custom.format(
-                    personality_name=personality['name'],
-                    personality_description=personality['description'],
-                    evolution_stage=evolution_stage,
-                    stage_name=stage_names[evolution_stage-1],
-                    affection=character['affection'],
-                    intimacy=character['intimacy'],
-                    trust=character['trust'],
-                    submission=character['submission'],
-                    desire=character['desire'],
-                    corruption=character['corruption'],
-                    arousal=character['arousal'],
-                    resistance=character['resistance'],
-                    shame=character['shame'],
-                    scenario_desc=scenario_desc,
-                    intensity=intensity,
-                    action_type=action_type,
-                    user_message=user_message if user_message else "（无）"
-                )
-                return custom_prompt
-            else:
-                # 使用默认提示词 + 额外设定
-                extra_setup = custom_prompts.get("extra_character_setup", "").strip()
-                if extra_setup:
-                    prompt_parts.append("# 额外角色设定")
-                    prompt_parts.append(extra_setup)
-                    prompt_parts.append("")
-
-                extra_requirements = custom_prompts.get("extra_response_requirements", "").strip()
-                if extra_requirements:
-                    prompt_parts.append("# 额外回复要求")
-                    prompt_parts.append(extra_requirements)
-                    prompt_parts.append("")
-
-                extra_format = custom_prompts.get("extra_format_requirements", "").strip()
-                if extra_format:
-                    prompt_parts.append("# 额外格式要求")
-                    prompt_parts.append(extra_format)
-                    prompt_parts.append("")
+        # === 9. 自定义提示词 ===
+        if compiled["custom"]:
+            section("额外设定")
+            prompt_parts.extend(compiled["custom"])
 
         # === 10. 生成指令 ===
-        prompt_parts.append("---")
-        prompt_parts.append("**立即生成回复**：")
-        prompt_parts.append("- 直接输出自然的回复内容（根据情境决定长度）")
-        prompt_parts.append("- 不要添加任何前缀、标签或说明")
-        prompt_parts.append("- 保持回复在一个完整段落内")
+        section("生成指令")
+        prompt_parts.extend(compiled["footer"])
+
+        if PromptBuilder._should_sample():
+            bounds = sections + [("", len(prompt_parts))]
+            PromptBuilder._record([
+                (name, "\n".join(prompt_parts[start:bounds[i + 1][1]]))
+                for i, (name, start) in enumerate(sections)
+            ])
 
         return "\n".join(prompt_parts)
 
+    @staticmethod
+    def _should_sample() -> bool:
+        """计数本次构建，并判断是否统计段落大小（第 1 次及之后每 STATS_SAMPLE_EVERY 次）"""
+        PromptBuilder._stats["builds"] += 1
+        return (PromptBuilder._stats["builds"] - 1) % max(1, PromptBuilder.STATS_SAMPLE_EVERY) == 0
+
+    @staticmethod
+    def _record(sections: List[Tuple[str, str]]):
+        """记录本次构建的各段落 token 估算"""
+        total = 0
+        for name, text in sections:
+            tokens = LLMGateway.estimate_tokens(text)
+            total += tokens
+            entry = PromptBuilder._section_tokens.setdefault(name, [0, 0])
+            entry[0] += tokens
+            entry[1] += 1
+
+        PromptBuilder._prompt_tokens.append(total)
+
+    @staticmethod
+    def get_stats() -> Dict:
+        """提示词大小统计：总 token 分位数和各段落平均 token（均为抽样估算值）"""
+        samples = sorted(PromptBuilder._prompt_tokens)
+        return {
+            **PromptBuilder._stats,
+            "templates": len(PromptBuilder._compiled),
+            "p50_tokens": samples[len(samples) // 2] if samples else 0,
+            "p95_tokens": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0,
+            "max_tokens": samples[-1] if samples else 0,
+            "sections": {
+                name: total // count
+                for name, (total, count) in PromptBuilder._section_tokens.items()
+            },
+        }
+
     @staticmethod
     def _translate_attr(attr: str) -> str:
         """翻译属性名称"""
@@ -0,0 +1,239 @@
+"""
+渲染缓存 - 按内容寻址的图片缓存
+
+核心机制：
+- 缓存键 = (渲染类型, 标题, 内容, 宽度, 渲染签名) 的 SHA-256，内容相同即命中
+- 进程内 LRU 保存 (PNG字节, base64)，重复请求只需一次字典查找
+- persist=True 的图片（静态帮助页）同时写入磁盘 PNG，并把渲染参数记入清单
+- 启动时按清单预热：磁盘上已有的 PNG 直接载入内存，渲染签名变化导致缺失的重新渲染
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_render_cache")
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 渲染函数 (标题, 内容, 宽度) -> PNG字节
+Renderer = Callable[[str, object, int], bytes]
+
+
+class RenderCache:
+    """渲染缓存"""
+
+    CACHE_DIR = os.path.join(PLUGIN_DIR, "render_cache")
+    MANIFEST_FILE = os.path.join(CACHE_DIR, "manifest.json")
+
+    # 内存中保留的图片数量上限
+    MAX_ENTRIES = 64
+
+    # {缓存键: (PNG字节, base64)}
+    _memory: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+
+    # 持久化图片的渲染参数 {缓存键: {"kind", "title", "payload", "width"}}
+    _manifest: Optional[Dict[str, Dict]] = None
+
+    _lock = threading.Lock()
+    _stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(kind: str, title: str, payload, width: int, signature: str) -> str:
+        """计算缓存键"""
+        raw = json.dumps([kind, title, payload, width, signature], ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_or_render(
+        kind: str,
+        title: str,
+        payload,
+        width: int,
+        signature: str,
+        render: Renderer,
+        persist: bool = False,
+    ) -> Tuple[bytes, str]:
+        """命中缓存时直接返回，否则渲染并缓存"""
+        key = RenderCache.make_key(kind, title, payload, width, signature)
+
+        cached = RenderCache._get_memory(key)
+        if cached is not None:
+            RenderCache._stats["hits"] += 1
+            return cached
+
+        if persist:
+            png = RenderCache._read_disk(key)
+            if png is not None:
+                RenderCache._stats["disk_hits"] += 1
+                return RenderCache._put_memory(key, png)
+
+        RenderCache._stats["misses"] += 1
+        png = render(title, payload, width)
+        entry = RenderCache._put_memory(key, png)
+
+        if persist:
+            RenderCache._write_disk(key, png, {"kind": kind, "title": title, "payload": payload, "width": width})
+
+        return entry
+
+    @staticmethod
+    def peek(kind: str, title: str, payload, width: int, signature: str) -> Optional[Tuple[bytes, str]]:
+        """只查内存缓存，不渲染"""
+        cached = RenderCache._get_memory(RenderCache.make_key(kind, title, payload, width, signature))
+        if cached is not None:
+            RenderCache._stats["hits"] += 1
+        return cached
+
+    @staticmethod
+    def _get_memory(key: str) -> Optional[Tuple[bytes, str]]:
+        with RenderCache._lock:
+            entry = RenderCache._memory.get(key)
+            if entry is not None:
+                RenderCache._memory.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def _put_memory(key: str, png: bytes) -> Tuple[bytes, str]:
+        entry = (png, base64.b64encode(png).decode("utf-8"))
+        with RenderCache._lock:
+            RenderCache._memory[key] = entry
+            RenderCache._memory.move_to_end(key)
+            while len(RenderCache._memory) > RenderCache.MAX_ENTRIES:
+                RenderCache._memory.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _png_path(key: str) -> str:
+        return os.path.join(RenderCache.CACHE_DIR, f"{key}.png")
+
+    @staticmethod
+    def _read_disk(key: str) -> Optional[bytes]:
+        try:
+            with open(RenderCache._png_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_disk(key: str, png: bytes, params: Dict):
+        try:
+            RenderCache._write_png(key, png)
+
+            with RenderCache._lock:
+                manifest = RenderCache._load_manifest()
+                manifest[key] = params
+                RenderCache._save_manifest(manifest)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"写入渲染缓存失败: {e}")
+
+    @staticmethod
+    def _load_manifest() -> Dict[str, Dict]:
+        if RenderCache._manifest is None:
+            try:
+                with open(RenderCache.MANIFEST_FILE, "r", encoding="utf-8") as f:
+                    RenderCache._manifest = json.load(f)
+            except (OSError, ValueError):
+                RenderCache._manifest = {}
+        return RenderCache._manifest
+
+    @staticmethod
+    def _save_manifest(manifest: Dict[str, Dict]):
+        tmp_path = RenderCache.MANIFEST_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, RenderCache.MANIFEST_FILE)
+
+    @staticmethod
+    def prerender(renderers: Dict[str, Renderer], signature: str) -> Dict[str, int]:
+        """
+        按清单预热持久化图片
+        渲染签名变化的条目用新签名重新渲染，旧 PNG 删除
+        返回: {"loaded": 从磁盘载入数, "rendered": 重新渲染数, "dropped": 丢弃数}
+        """
+        result = {"loaded": 0, "rendered": 0, "dropped": 0}
+
+        with RenderCache._lock:
+            entries = list(RenderCache._load_manifest().items())
+
+        manifest = {}
+        for old_key, params in entries:
+            render = renderers.get(params.get("kind"))
+            if render is None:
+                result["dropped"] += 1
+                RenderCache._remove_png(old_key)
+                continue
+
+            key = RenderCache.make_key(params["kind"], params["title"], params["payload"], params["width"], signature)
+            png = RenderCache._read_disk(key)
+            if png is not None:
+                result["loaded"] += 1
+            else:
+                try:
+                    png = render(params["title"], params["payload"], params["width"])
+                    RenderCache._write_png(key, png)
+                except Exception as e:
+                    logger.warning(f"预渲染失败 {params.get('title')}: {e}")
+                    result["dropped"] += 1
+                    continue
+                result["rendered"] += 1
+
+            if key != old_key:
+                RenderCache._remove_png(old_key)
+
+            RenderCache._put_memory(key, png)
+            manifest[key] = params
+
+        if entries:
+            with RenderCache._lock:
+                RenderCache._manifest = manifest
+                try:
+                    RenderCache._save_manifest(manifest)
+                except OSError as e:
+                    logger.warning(f"保存渲染缓存清单失败: {e}")
+
+        logger.info(
+            f"渲染缓存预热完成: 载入{result['loaded']}张, 重新渲染{result['rendered']}张, 丢弃{result['dropped']}张"
+        )
+        return result
+
+    @staticmethod
+    def _write_png(key: str, png: bytes):
+        os.makedirs(RenderCache.CACHE_DIR, exist_ok=True)
+        # 每次写入使用独立的临时文件，并发写同一个键时不会互相覆盖，最后一次 replace 生效
+        fd, tmp_path = tempfile.mkstemp(dir=RenderCache.CACHE_DIR, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, RenderCache._png_path(key))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _remove_png(key: str):
+        try:
+            os.remove(RenderCache._png_path(key))
+        except OSError:
+            pass
+
+    @staticmethod
+    def clear_memory():
+        """清空内存缓存"""
+        with RenderCache._lock:
+            RenderCache._memory.clear()
+
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """获取缓存统计"""
+        return {**RenderCache._stats, "size": len(RenderCache._memory)}
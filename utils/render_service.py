@@ -0,0 +1,158 @@
+"""
+图片渲染服务 - 把 PIL 渲染移出事件循环
+
+核心机制：
+- 渲染任务提交到有界线程池执行，事件循环只等待结果，不被 CPU 密集的绘制阻塞
+  （PIL 的缩放、合成和 PNG 编码会释放 GIL；渲染缓存、背景缓存和字形缓存都在进程内共享，
+  因此使用线程池而不是进程池）
+- 内存渲染缓存命中时直接返回，不占用队列
+- 排队 + 执行中的任务数达到上限时立即抛出 RenderQueueFull，调用方退回文本输出
+- 记录排队等待和渲染耗时，/渲染统计 可查看
+"""
+
+import asyncio
+import functools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_render_service")
+
+
+class RenderQueueFull(RuntimeError):
+    """渲染队列已满"""
+
+
+class RenderService:
+    """图片渲染服务"""
+
+    # 渲染线程数
+    WORKERS = 2
+
+    # 排队 + 执行中的任务上限
+    MAX_QUEUE = 8
+
+    # 单个任务的最长等待时间（秒），超时后调用方退回文本输出
+    TIMEOUT = 15.0
+
+    # 保留最近多少次任务的耗时用于统计分位数
+    SAMPLE_SIZE = 256
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _pending = 0
+
+    _waits: deque = deque(maxlen=SAMPLE_SIZE)
+    _renders: deque = deque(maxlen=SAMPLE_SIZE)
+    _counters = {"submitted": 0, "completed": 0, "cache_hits": 0, "rejected": 0, "timeouts": 0, "failed": 0}
+
+    @staticmethod
+    def configure(workers: int = None, max_queue: int = None, timeout: float = None):
+        """调整线程数、队列上限和超时（线程池在首次渲染时创建）"""
+        if workers is not None:
+            RenderService.WORKERS = max(1, int(workers))
+        if max_queue is not None:
+            RenderService.MAX_QUEUE = max(1, int(max_queue))
+        if timeout is not None:
+            RenderService.TIMEOUT = float(timeout)
+
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        if RenderService._executor is None:
+            RenderService._executor = ThreadPoolExecutor(
+                max_workers=RenderService.WORKERS, thread_name_prefix="dt_render"
+            )
+        return RenderService._executor
+
+    @staticmethod
+    async def render(kind: str, title: str, payload, width: int = 1920, **kwargs) -> Tuple[bytes, str]:
+        """
+        渲染图片（kind: status / list / help）
+        返回: (PNG字节, base64)；队列已满抛出 RenderQueueFull，超时抛出 asyncio.TimeoutError
+        """
+        from .help_image_generator import HelpImageGenerator
+
+        cached = HelpImageGenerator.get_cached_image(kind, title, payload, width)
+        if cached is not None:
+            RenderService._counters["cache_hits"] += 1
+            return cached
+
+        if RenderService._pending >= RenderService.MAX_QUEUE:
+            RenderService._counters["rejected"] += 1
+            logger.warning(f"渲染队列已满 ({RenderService._pending}/{RenderService.MAX_QUEUE})，退回文本输出: {title}")
+            raise RenderQueueFull(title)
+
+        generate = {
+            "status": HelpImageGenerator.generate_status_image,
+            "list": HelpImageGenerator.generate_list_image,
+            "help": HelpImageGenerator.generate_help_image,
+        }[kind]
+
+        RenderService._pending += 1
+        RenderService._counters["submitted"] += 1
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            RenderService._get_executor(),
+            functools.partial(RenderService._run, time.perf_counter(), generate, title, payload, width, **kwargs),
+        )
+        future.add_done_callback(RenderService._on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), RenderService.TIMEOUT)
+        except asyncio.TimeoutError:
+            RenderService._counters["timeouts"] += 1
+            logger.warning(f"渲染超时 ({RenderService.TIMEOUT}s)，退回文本输出: {title}")
+            raise
+
+    @staticmethod
+    def _run(submitted_at: float, generate, *args, **kwargs) -> Tuple[bytes, str]:
+        """在渲染线程中执行"""
+        started = time.perf_counter()
+        RenderService._waits.append((started - submitted_at) * 1000)
+        try:
+            return generate(*args, **kwargs)
+        finally:
+            RenderService._renders.append((time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _on_done(future):
+        # 在事件循环线程中回调，超时放弃等待的任务也在真正结束后才释放队列名额
+        RenderService._pending -= 1
+        if future.cancelled() or future.exception() is not None:
+            RenderService._counters["failed"] += 1
+        else:
+            RenderService._counters["completed"] += 1
+
+    @staticmethod
+    def _percentile(samples, ratio: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    @staticmethod
+    def get_stats() -> Dict:
+        """获取队列与耗时统计（毫秒）"""
+        waits = list(RenderService._waits)
+        renders = list(RenderService._renders)
+        return {
+            **RenderService._counters,
+            "pending": RenderService._pending,
+            "max_queue": RenderService.MAX_QUEUE,
+            "workers": RenderService.WORKERS,
+            "wait_p50": RenderService._percentile(waits, 0.5),
+            "wait_p95": RenderService._percentile(waits, 0.95),
+            "wait_max": max(waits, default=0.0),
+            "render_p50": RenderService._percentile(renders, 0.5),
+            "render_p95": RenderService._percentile(renders, 0.95),
+        }
+
+    @staticmethod
+    def shutdown():
+        """关闭线程池"""
+        if RenderService._executor is not None:
+            RenderService._executor.shutdown(wait=False)
+            RenderService._executor = None
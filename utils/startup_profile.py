@@ -0,0 +1,101 @@
+"""
+启动性能分析 - 记录插件启动各阶段耗时和命令模块的导入耗时
+
+- 启动阶段（数据库、缓存加载、种子数据等）用 StartupProfile.timed() 计时
+- 命令模块在首次分发时才导入，导入耗时（含传递导入）由 LazyCommandRegistry 记录
+- 启动总耗时超过预算时输出警告，报告可通过 /启动分析 查看
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from src.common.logger import get_logger
+
+logger = get_logger("dt_startup_profile")
+
+
+class StartupProfile:
+    """启动性能分析"""
+
+    # 冷启动预算（毫秒）
+    BUDGET_MS = 500.0
+
+    # 启动阶段 [(阶段, 毫秒, 备注)]
+    _stages: List[Tuple[str, float, str]] = []
+
+    # 命令模块导入记录 [{"module", "elapsed_ms", "new_modules", "at"}]
+    _imports: List[Dict] = []
+
+    @staticmethod
+    def configure(budget_ms: float = None):
+        """设置冷启动预算"""
+        if budget_ms is not None:
+            StartupProfile.BUDGET_MS = float(budget_ms)
+
+    @staticmethod
+    def record(stage: str, elapsed_ms: float, note: str = ""):
+        """记录一个启动阶段"""
+        StartupProfile._stages.append((stage, elapsed_ms, note))
+
+    @staticmethod
+    @contextmanager
+    def timed(stage: str):
+        """计时一个启动阶段"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            StartupProfile.record(stage, (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def record_import(module: str, elapsed_ms: float, new_modules: int):
+        """记录一次延迟导入"""
+        StartupProfile._imports.append({
+            "module": module,
+            "elapsed_ms": elapsed_ms,
+            "new_modules": new_modules,
+            "at": time.time(),
+        })
+        logger.debug(f"延迟导入 {module}: {elapsed_ms:.1f}ms (新增{new_modules}个模块)")
+
+    @staticmethod
+    def get_startup_ms() -> float:
+        """启动阶段总耗时"""
+        return sum(elapsed for _, elapsed, _ in StartupProfile._stages)
+
+    @staticmethod
+    def get_imports() -> List[Dict]:
+        """命令模块导入记录（按耗时降序）"""
+        return sorted(StartupProfile._imports, key=lambda x: x["elapsed_ms"], reverse=True)
+
+    @staticmethod
+    def check_budget() -> Optional[str]:
+        """启动耗时超出预算时返回警告文本"""
+        total = StartupProfile.get_startup_ms()
+        if total <= StartupProfile.BUDGET_MS:
+            return None
+        return f"启动耗时 {total:.1f}ms 超出预算 {StartupProfile.BUDGET_MS:.0f}ms"
+
+    @staticmethod
+    def format_report(pending_modules: List[str] = None) -> str:
+        """生成文本报告"""
+        total = StartupProfile.get_startup_ms()
+        lines = [f"启动耗时: {total:.1f}ms / 预算 {StartupProfile.BUDGET_MS:.0f}ms"]
+
+        for stage, elapsed, note in StartupProfile._stages:
+            lines.append(f"  {stage}: {elapsed:.1f}ms" + (f" ({note})" if note else ""))
+
+        imports = StartupProfile.get_imports()
+        if imports:
+            lines.append(f"已延迟导入的命令模块 ({len(imports)}):")
+            for record in imports:
+                lines.append(
+                    f"  {record['module']}: {record['elapsed_ms']:.1f}ms (新增{record['new_modules']}个模块)"
+                )
+
+        if pending_modules:
+            lines.append(f"尚未导入的命令模块 ({len(pending_modules)}):")
+            lines.extend(f"  {module}" for module in pending_modules)
+
+        return "\n".join(lines)
@@ -0,0 +1,209 @@
+"""
+流式回复 - 边生成边按句子发送到聊天流
+
+核心机制：
+- LLMGateway.stream() 逐段产出文本，SentenceChunker 攒够一句就切出一块
+  （句末标点连同后面的收尾引号/括号归入本句；太短的句子与下一句合并；过长时在逗号处断开）
+- 句末标点恰好落在一段的末尾时，短暂等待下一段（可能还有 ！？」 等），
+  超过 SENTENCE_GRACE 仍没有新内容就直接发出，不让首句等到下一句生成
+- 切出的块放入有界队列，由单独的发送任务依次调用 send_api 发送；
+  发送跟不上时队列写满，生成端在 put 处等待，不再继续拉取模型输出（背压）
+- 生成结束后返回完整文本，调用方照常做内心独白、属性反馈等后处理，作为最后一条消息发送
+- 首条消息延迟从整段生成耗时降为第一句的生成耗时
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from src.common.logger import get_logger
+
+from .llm_gateway import FallbackText, LLMGateway, LLMCallError, LLMResult
+
+logger = get_logger("dt_stream_reply")
+
+# 句末标点
+SENTENCE_END = set("。！？!?…～~\n")
+
+# 紧跟句末标点、应归入本句的收尾符号
+CLOSING = set("”’」』）)】》\"'*")
+
+# 过长时可以断开的位置
+SOFT_BREAK = set("，,、；;：: ")
+
+
+class SentenceChunker:
+    """按句子切分增量文本"""
+
+    # 短于该长度的句子与下一句合并，避免刷屏
+    MIN_CHUNK = 12
+
+    # 超过该长度仍没有句末标点时强制断开
+    MAX_CHUNK = 150
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """追加一段文本，返回已经完整的句块"""
+        self._buffer += delta
+        chunks = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    def has_pending_sentence(self) -> bool:
+        """缓冲区是否以一个完整的句子结尾（只差确认后面没有紧跟的标点）"""
+        text = self._buffer.rstrip()
+        return len(text) >= SentenceChunker.MIN_CHUNK and (text[-1] in SENTENCE_END or text[-1] in CLOSING)
+
+    def flush(self) -> str:
+        """取出剩余文本"""
+        chunk, self._buffer = self._buffer.strip(), ""
+        return chunk
+
+    def _find_cut(self) -> Optional[int]:
+        buffer = self._buffer
+        for index, char in enumerate(buffer):
+            if char not in SENTENCE_END or index + 1 < SentenceChunker.MIN_CHUNK:
+                continue
+
+            end = index + 1
+            while end < len(buffer) and (buffer[end] in SENTENCE_END or buffer[end] in CLOSING):
+                end += 1
+
+            # 标点在末尾时后面可能还有 ！？」 等，等下一段再切
+            return end if end < len(buffer) else None
+
+        if len(buffer) > SentenceChunker.MAX_CHUNK:
+            soft = max(buffer.rfind(char, 0, SentenceChunker.MAX_CHUNK) for char in SOFT_BREAK)
+            return soft + 1 if soft + 1 >= SentenceChunker.MIN_CHUNK else SentenceChunker.MAX_CHUNK
+
+        return None
+
+
+class StreamReply:
+    """流式回复"""
+
+    # 是否启用（对应 config.toml 的 llm.stream_replies）
+    ENABLED = True
+
+    # 待发送句块的队列上限
+    QUEUE_SIZE = 4
+
+    # 句末标点落在段末时等待下一段的时间(秒)
+    SENTENCE_GRACE = 0.1
+
+    _first_chunk_ms: deque = deque(maxlen=200)
+    _stats: Dict[str, int] = {"streams": 0, "chunks": 0}
+
+    @staticmethod
+    def configure(enabled: bool = None):
+        if enabled is not None:
+            StreamReply.ENABLED = bool(enabled)
+
+    @staticmethod
+    def is_available() -> bool:
+        """已启用且模型后端支持流式输出"""
+        return StreamReply.ENABLED and LLMGateway.supports_streaming()
+
+    @staticmethod
+    async def pump(deltas: AsyncIterator[str], send: Callable[[str], Awaitable]) -> str:
+        """
+        消费增量文本，按句子分块交给 send 发送
+        返回: 完整文本
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=StreamReply.QUEUE_SIZE)
+        started = time.perf_counter()
+
+        async def sender():
+            first = True
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                try:
+                    await send(chunk)
+                except Exception as e:
+                    # 发送失败只丢弃这一块，继续消费队列，避免生成端在 put 处永久等待
+                    logger.warning(f"流式回复发送失败: {e}")
+                    continue
+                StreamReply._stats["chunks"] += 1
+                if first:
+                    StreamReply._first_chunk_ms.append((time.perf_counter() - started) * 1000)
+                    first = False
+
+        task = asyncio.ensure_future(sender())
+        chunker = SentenceChunker()
+        parts = []
+        iterator = deltas.__aiter__()
+        try:
+            while True:
+                next_delta = asyncio.ensure_future(iterator.__anext__())
+                if chunker.has_pending_sentence():
+                    done, _ = await asyncio.wait({next_delta}, timeout=StreamReply.SENTENCE_GRACE)
+                    if not done:
+                        await queue.put(chunker.flush())
+
+                try:
+                    delta = await next_delta
+                except StopAsyncIteration:
+                    break
+
+                parts.append(delta)
+                for chunk in chunker.feed(delta):
+                    # 队列满时在这里等待发送端（背压）
+                    await queue.put(chunk)
+
+            tail = chunker.flush()
+            if tail:
+                await queue.put(tail)
+        finally:
+            await queue.put(None)
+            await task
+
+        StreamReply._stats["streams"] += 1
+        return "".join(parts)
+
+    @staticmethod
+    async def generate_to_stream(prompt: str, request_type: str, stream_id: str) -> LLMResult:
+        """
+        流式生成并逐句发送到聊天流
+        返回: 与 LLMGateway.generate 相同的 (是否成功, 完整文本, 推理过程, 模型名)，
+        发出的是兜底文本时模型名为 LLMGateway.FALLBACK_MODEL
+        """
+        from src.plugin_system.apis import send_api
+
+        fallback = False
+
+        async def deltas() -> AsyncIterator[str]:
+            nonlocal fallback
+            async for delta in LLMGateway.stream(prompt, request_type):
+                fallback = fallback or isinstance(delta, FallbackText)
+                yield delta
+
+        async def send(chunk: str):
+            await send_api.text_to_stream(text=chunk, stream_id=stream_id, storage_message=not fallback)
+
+        try:
+            content = await StreamReply.pump(deltas(), send)
+        except LLMCallError as e:
+            return False, str(e), "", ""
+
+        return bool(content), content, "", LLMGateway.FALLBACK_MODEL if fallback else "stream"
+
+    @staticmethod
+    def get_stats() -> Dict:
+        """流式回复统计（首句延迟单位: 毫秒）"""
+        samples = sorted(StreamReply._first_chunk_ms)
+        return {
+            **StreamReply._stats,
+            "first_chunk_p50_ms": samples[len(samples) // 2] if samples else 0.0,
+            "first_chunk_p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0,
+        }
@@ -0,0 +1,162 @@
+"""
+文本排版 - 基于字形宽度的自动换行
+
+核心机制：
+- 每个字体缓存单字符的前进宽度（advance），同一字符只向 FreeType 查询一次
+- 一行文字先算出前缀宽度和，再用二分查找定位能放下的最远断点，整体代价与文本长度线性相关
+- 断行遵守中文标点规则（避头尾）：
+  行首不出现 ，。、）」 等收尾标点，行尾不留 （「【 等开头标点；
+  英文单词和数字尽量不从中间断开
+- 换行结果按 (字体, 宽度, 文本) 缓存，测量和绘制两遍排版只计算一次
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Tuple
+
+# 不能出现在行首的字符（收尾标点）
+LINE_START_FORBIDDEN = set(
+    "，。、；：？！）」』】》〉〕］｝”’…—～·%‰°"
+    ",.;:?!)]}>"
+    "ーぁぃぅぇぉっゃゅょゎァィゥェォッャュョヮヵヶ々〻"
+)
+
+# 不能出现在行尾的字符（开头标点）
+LINE_END_FORBIDDEN = set("（「『【《〈〔［｛“‘([{<")
+
+# 行首禁则字符最多挂在行尾的个数（超出时改为把前一个字符带到下一行）
+MAX_HANGING = 2
+
+
+def _is_word_char(char: str) -> bool:
+    """英文字母、数字等需要整体换行的字符"""
+    return char.isascii() and (char.isalnum() or char in "_-'")
+
+
+class TextLayout:
+    """文本排版"""
+
+    # 换行结果缓存上限
+    WRAP_CACHE_SIZE = 4096
+
+    # 字符宽度缓存 {字体键: {字符: 宽度}}
+    _advances: Dict[Tuple, Dict[str, float]] = {}
+
+    # 换行结果缓存 {(字体键, 最大宽度, 文本): 行列表}
+    _wrap_cache: "OrderedDict[Tuple, Tuple[str, ...]]" = OrderedDict()
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _font_key(font) -> Tuple:
+        path = getattr(font, "path", None)
+        if path is None:
+            return ("id", id(font))
+        return (path, getattr(font, "size", None), getattr(font, "index", 0))
+
+    @staticmethod
+    def _advance_table(font) -> Dict[str, float]:
+        key = TextLayout._font_key(font)
+        table = TextLayout._advances.get(key)
+        if table is None:
+            with TextLayout._lock:
+                table = TextLayout._advances.setdefault(key, {})
+        return table
+
+    @staticmethod
+    def char_widths(text: str, font) -> List[float]:
+        """逐字符宽度（查缓存，未命中时向字体查询一次）"""
+        table = TextLayout._advance_table(font)
+        widths = []
+        for char in text:
+            width = table.get(char)
+            if width is None:
+                width = font.getlength(char)
+                table[char] = width
+            widths.append(width)
+        return widths
+
+    @staticmethod
+    def text_width(text: str, font) -> float:
+        """文本宽度（字符宽度之和）"""
+        return sum(TextLayout.char_widths(text, font))
+
+    @staticmethod
+    def wrap(text: str, max_width: int, font) -> List[str]:
+        """自动换行，空行保留为空字符串"""
+        cache_key = (TextLayout._font_key(font), max_width, text)
+        with TextLayout._lock:
+            cached = TextLayout._wrap_cache.get(cache_key)
+            if cached is not None:
+                TextLayout._wrap_cache.move_to_end(cache_key)
+                return list(cached)
+
+        lines: List[str] = []
+        for paragraph in text.split('\n'):
+            if not paragraph:
+                lines.append('')
+                continue
+            lines.extend(TextLayout._wrap_paragraph(paragraph, max_width, font))
+
+        with TextLayout._lock:
+            TextLayout._wrap_cache[cache_key] = tuple(lines)
+            while len(TextLayout._wrap_cache) > TextLayout.WRAP_CACHE_SIZE:
+                TextLayout._wrap_cache.popitem(last=False)
+        return lines
+
+    @staticmethod
+    def _wrap_paragraph(paragraph: str, max_width: int, font) -> List[str]:
+        # prefix[i] = 前 i 个字符的总宽度
+        prefix = [0.0]
+        prefix.extend(accumulate(TextLayout.char_widths(paragraph, font)))
+
+        lines = []
+        start = 0
+        length = len(paragraph)
+
+        while start < length:
+            # 二分查找：能放进 max_width 的最远位置（至少放一个字符）
+            end = bisect.bisect_right(prefix, prefix[start] + max_width, lo=start + 1) - 1
+            end = max(end, start + 1)
+
+            if end < length:
+                end = TextLayout._adjust_break(paragraph, start, end)
+
+            lines.append(paragraph[start:end])
+            start = end
+
+        return lines
+
+    @staticmethod
+    def _adjust_break(paragraph: str, start: int, end: int) -> int:
+        """按避头尾和单词规则调整断点，返回新的断点（保证 > start）"""
+        # 英文单词/数字不从中间断开：退回到单词开头
+        if _is_word_char(paragraph[end - 1]) and _is_word_char(paragraph[end]):
+            word_start = end - 1
+            while word_start > start and _is_word_char(paragraph[word_start - 1]):
+                word_start -= 1
+            if word_start > start:
+                end = word_start
+
+        # 行首禁则：收尾标点挂到本行末尾（最多 MAX_HANGING 个），否则把前一个字符带到下一行
+        hanging = 0
+        while end < len(paragraph) and paragraph[end] in LINE_START_FORBIDDEN and hanging < MAX_HANGING:
+            end += 1
+            hanging += 1
+        if end < len(paragraph) and paragraph[end] in LINE_START_FORBIDDEN and end - hanging - 1 > start:
+            end = end - hanging - 1
+
+        # 行尾禁则：开头标点移到下一行
+        while end - 1 > start and paragraph[end - 1] in LINE_END_FORBIDDEN:
+            end -= 1
+
+        return max(end, start + 1)
+
+    @staticmethod
+    def clear():
+        """清空缓存（字体变化时调用）"""
+        with TextLayout._lock:
+            TextLayout._advances.clear()
+            TextLayout._wrap_cache.clear()